@@ -14,5 +14,60 @@ class Settings(BaseSettings):
     resend_from_email: str = "corniscan@cornille-sa.com"
     environment: str = "development"
 
+    # Cache des résultats vision (géométrie dérivée uniquement — NFR-S4)
+    vision_cache_enabled: bool = True
+    vision_cache_max_bytes: int = 16 * 1024 * 1024
+    vision_cache_ttl_seconds: float = 900.0
+
+    # Pool de processus vision (0 = pool de threads dans le processus courant)
+    vision_workers: int = 2
+    vision_queue_size: int = 8
+    vision_retry_after_seconds: int = 2
+
+    # Threads OpenCV par tâche vision (thread_governor) : "adaptive" = budget de
+    # cœurs réparti entre les tâches en cours, "single" = 1 thread, "opencv" =
+    # réglage OpenCV par défaut ; budget 0 = cœurs disponibles pour le processus.
+    # Sans effet avec VISION_WORKERS=0 (cv2.setNumThreads est global au processus)
+    vision_opencv_threads: str = "adaptive"
+    vision_cpu_budget: int = 0
+
+    # Suivi carte entre frames live (fenêtre ROI autour du dernier quad)
+    card_tracking_ttl_seconds: float = 30.0
+    card_tracking_refresh_frames: int = 10
+
+    # PDF : lecture directe des tracés vectoriels (exports CAO) avant l'analyse raster
+    pdf_vector_analysis: bool = True
+    pdf_max_pages: int = 50
+
+    # Traitements par lot (pages PDF, fichiers de /process-batch) : éléments en vol
+    # simultanément par requête, nombre de fichiers max par lot
+    vision_batch_concurrency: int = 2
+    vision_batch_max_files: int = 50
+
+    # Jobs d'analyse asynchrones (POST /scan/jobs) : jobs exécutés simultanément,
+    # jobs en attente max, durée de vie après la fin du job, base SQLite pour
+    # survivre aux redémarrages (vide = en mémoire seulement)
+    scan_jobs_concurrency: int = 2
+    scan_jobs_max_queued: int = 32
+    scan_jobs_ttl_seconds: float = 900.0
+    scan_jobs_db_path: str = ""
+
+    # Uploads > 1 Mo écrits dans ce répertoire puis mappés en mémoire par les
+    # workers (vide = répertoire temporaire système ; /dev/shm : sans disque)
+    upload_spool_dir: str = ""
+
+    # Écart max (mm) entre le contour détecté et celui du DXF : moitié pour la
+    # simplification du contour (approxPolyDP), moitié pour l'ajustement d'arcs
+    # et de cercles à l'écriture du DXF
+    contour_tolerance_mm: float = 0.2
+
+    # Durées par étape du pipeline vision dans le header Server-Timing
+    server_timing_enabled: bool = True
+
+    # GET /api/v1/metrics (format Prometheus) : Bearer METRICS_TOKEN exigé ; token
+    # vide = endpoint non exposé (404), les métriques restent collectées
+    metrics_enabled: bool = True
+    metrics_token: str = ""
+
 
 settings = Settings()
@@ -1,10 +1,13 @@
 """Connexion async SQLAlchemy — Story 1.2."""
 
+import time
 from urllib.parse import parse_qs, urlencode, urlparse, urlunparse
 
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.core.config import settings
+from app.core.metrics import db_pool_checkouts, db_pool_wait
 
 # Paramètres libpq/psycopg2 que asyncpg ne comprend pas — à retirer de l'URL.
 _LIBPQ_ONLY_PARAMS = {"sslmode", "channel_binding", "connect_timeout", "options"}
@@ -35,10 +38,23 @@ def _asyncpg_url(raw: str) -> tuple[str, dict]:
     return url, connect_args
 
 
+class _InstrumentedPool(AsyncAdaptedQueuePool):
+    """Pool async standard + métriques : nombre de checkouts et attente d'une connexion libre."""
+
+    def _do_get(self):
+        t0 = time.perf_counter()
+        conn = super()._do_get()
+        db_pool_wait.observe(time.perf_counter() - t0)
+        db_pool_checkouts.inc()
+        return conn
+
+
 # pool_size=2 : contrainte Neon free tier (max 5 connexions simultanées)
 if settings.database_url:
     _url, _ssl = _asyncpg_url(settings.database_url)
-    engine = create_async_engine(_url, pool_size=2, max_overflow=0, connect_args=_ssl)
+    engine = create_async_engine(
+        _url, pool_size=2, max_overflow=0, connect_args=_ssl, poolclass=_InstrumentedPool,
+    )
 else:
     engine = None
 
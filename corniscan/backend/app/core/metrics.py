@@ -0,0 +1,298 @@
+"""
+metrics.py — Métriques applicatives au format texte Prometheus (GET /api/v1/metrics)
+
+Aucune dépendance (prometheus_client non requis) : compteurs, jauges et
+histogrammes minimaux, rendus en text/plain version 0.0.4.
+
+Enregistrement « lock-light » — le chemin /detect-card est appelé toutes les
+500 ms par chaque opérateur :
+  - Chaque thread écrit dans son propre fragment (threading.local) : observe()
+    et inc() ne prennent aucun verrou ; seul le premier enregistrement d'un
+    thread prend le verrou de la métrique pour y inscrire son fragment
+  - Le rendu additionne les fragments au moment du scrape (lecture sans verrou :
+    une observation en cours peut manquer, elle apparaîtra au scrape suivant)
+  - Jauges et compteurs calculés au scrape (collect=callable) : file vision,
+    cache, pool DB… lus à la source plutôt que recopiés à chaque requête
+"""
+
+import bisect
+import threading
+import time
+
+# Secondes — de la frame live (quelques ms) au pipeline 200 MP (plusieurs s)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_str(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    """Base : nom, aide, noms de labels et fragments par thread."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._shards: list[dict] = []
+
+    def _shard(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = {}
+            self._local.shard = shard
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def _header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Compteur monotone, éventuellement labellisé.
+
+    collect() → total tenu ailleurs (ex. compteurs du cache vision), lu au scrape.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = (), collect=None) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._collect = collect
+
+    def inc(self, *labels, amount: float = 1.0) -> None:
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0.0) + amount
+
+    def value(self, *labels) -> float:
+        return sum(shard.get(labels, 0.0) for shard in list(self._shards))
+
+    def render(self) -> list[str]:
+        totals: dict[tuple, float] = {}
+        if self._collect is not None:
+            totals[()] = self._collect()
+        for shard in list(self._shards):
+            for labels, value in list(shard.items()):
+                totals[labels] = totals.get(labels, 0.0) + value
+        lines = self._header()
+        for labels, value in sorted(totals.items()):
+            lines.append(f"{self.name}{_label_str(self.labelnames, labels)} {_format(value)}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Jauge : valeur posée par inc()/dec() (boucle asyncio), ou calculée au scrape.
+
+    collect() → float, ou dict {tuple de labels: float} pour une jauge labellisée.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = (), collect=None) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._collect = collect
+        self._value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._value -= amount
+
+    def value(self) -> float:
+        return self._value
+
+    def render(self) -> list[str]:
+        values = self._collect() if self._collect is not None else self._value
+        if values is None:
+            return []
+        if not isinstance(values, dict):
+            values = {(): values}
+        lines = self._header()
+        for labels, value in sorted(values.items()):
+            lines.append(f"{self.name}{_label_str(self.labelnames, labels)} {_format(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    """Histogramme à buckets fixes (secondes par défaut)."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels) -> None:
+        shard = self._shard()
+        series = shard.get(labels)
+        if series is None:
+            # [compte par bucket (non cumulé) ..., compte > dernier bucket, somme]
+            series = [0] * (len(self.buckets) + 1) + [0.0]
+            shard[labels] = series
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def time(self, *labels) -> "_HistogramTimer":
+        """Context manager : observe la durée du bloc en secondes."""
+        return _HistogramTimer(self, labels)
+
+    def count(self, *labels) -> int:
+        return sum(sum(shard[labels][:-1]) for shard in list(self._shards) if labels in shard)
+
+    def render(self) -> list[str]:
+        merged: dict[tuple, list] = {}
+        for shard in list(self._shards):
+            for labels, series in list(shard.items()):
+                total = merged.setdefault(labels, [0] * len(series[:-1]) + [0.0])
+                for i, v in enumerate(series):
+                    total[i] += v
+        lines = self._header()
+        for labels, series in sorted(merged.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = f'le="{_format(bound)}"'
+                lines.append(f"{self.name}_bucket{_label_str(self.labelnames, labels, le)} {cumulative}")
+            label_str = _label_str(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_str} {_format(series[-1])}")
+            lines.append(f"{self.name}_count{label_str} {cumulative}")
+        return lines
+
+
+class _HistogramTimer:
+    __slots__ = ("_histogram", "_labels", "_t0")
+
+    def __init__(self, histogram: Histogram, labels: tuple) -> None:
+        self._histogram = histogram
+        self._labels = labels
+
+    def __enter__(self) -> None:
+        self._t0 = time.perf_counter()
+
+    def __exit__(self, *exc) -> None:
+        self._histogram.observe(time.perf_counter() - self._t0, *self._labels)
+
+
+class Registry:
+    """Ensemble ordonné de métriques rendues ensemble."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# ── Métriques enregistrées sur les chemins chauds ─────────────────────────────
+
+http_request_duration = REGISTRY.register(Histogram(
+    "corniscan_http_request_duration_seconds",
+    "Durée des requêtes HTTP par route.",
+    ("route", "method", "status"),
+))
+vision_stage_duration = REGISTRY.register(Histogram(
+    "corniscan_vision_stage_duration_seconds",
+    "Durée des étapes du pipeline vision (décodage, carte, warp, contour, DXF, PNG, attente).",
+    ("stage",),
+))
+vision_megapixels_in_flight = REGISTRY.register(Gauge(
+    "corniscan_vision_megapixels_in_flight",
+    "Mégapixels des images acceptées par le pool vision et pas encore traitées.",
+))
+vision_rejections = REGISTRY.register(Counter(
+    "corniscan_vision_rejections_total",
+    "Tâches vision refusées (file pleine, 503).",
+))
+vision_opencv_threads = REGISTRY.register(Counter(
+    "corniscan_vision_opencv_threads_total",
+    "Tâches vision par nombre de threads OpenCV attribué (gouverneur de threads).",
+    ("threads",),
+))
+bcrypt_duration = REGISTRY.register(Histogram(
+    "corniscan_bcrypt_duration_seconds",
+    "Durée des opérations bcrypt (hash, verify).",
+    ("operation",),
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0),
+))
+db_pool_checkouts = REGISTRY.register(Counter(
+    "corniscan_db_pool_checkouts_total",
+    "Connexions obtenues du pool SQLAlchemy.",
+))
+db_pool_wait = REGISTRY.register(Histogram(
+    "corniscan_db_pool_wait_seconds",
+    "Attente d'une connexion libre dans le pool SQLAlchemy.",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+))
+
+
+class MetricsMiddleware:
+    """Middleware ASGI : durée de chaque requête /api/, labellisée par gabarit de route.
+
+    Le gabarit ("/api/v1/admin/users/{user_id}") borne la cardinalité des
+    labels ; les fichiers statiques du frontend ne sont pas mesurés.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith("/api/"):
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            http_request_duration.observe(
+                time.perf_counter() - t0,
+                getattr(route, "path", "unmatched"),
+                scope["method"],
+                str(status),
+            )
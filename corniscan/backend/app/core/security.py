@@ -3,31 +3,37 @@
 from datetime import datetime, timedelta, timezone
 
 import bcrypt
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError, jwt
 
 from app.core.config import settings
+from app.core.metrics import bcrypt_duration
 
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_HOURS = 8
+STREAM_TOKEN_EXPIRE_MINUTES = 10
+_STREAM_SCOPE = "job_events"
 _BCRYPT_ROUNDS = 12
 
 _http_bearer = HTTPBearer()
+_optional_bearer = HTTPBearer(auto_error=False)
 
 
 def hash_password(plain_password: str) -> str:
     """Retourne le hash bcrypt (cost=12) d'un mot de passe en clair."""
     salt = bcrypt.gensalt(rounds=_BCRYPT_ROUNDS)
-    return bcrypt.hashpw(plain_password.encode("utf-8"), salt).decode("utf-8")
+    with bcrypt_duration.time("hash"):
+        return bcrypt.hashpw(plain_password.encode("utf-8"), salt).decode("utf-8")
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Vérifie qu'un mot de passe en clair correspond au hash stocké."""
-    return bcrypt.checkpw(
-        plain_password.encode("utf-8"),
-        hashed_password.encode("utf-8"),
-    )
+    with bcrypt_duration.time("verify"):
+        return bcrypt.checkpw(
+            plain_password.encode("utf-8"),
+            hashed_password.encode("utf-8"),
+        )
 
 
 def create_access_token(data: dict) -> str:
@@ -37,17 +43,32 @@ def create_access_token(data: dict) -> str:
     return jwt.encode(to_encode, settings.jwt_secret, algorithm=ALGORITHM)
 
 
+def create_stream_token(username: str, job_id: str) -> str:
+    """JWT court (10 min) limité au flux SSE d'un job — seul token accepté en ?access_token=.
+
+    Sans rôle : refusé par user_from_token() sur tout autre endpoint.
+    """
+    expires = datetime.now(timezone.utc) + timedelta(minutes=STREAM_TOKEN_EXPIRE_MINUTES)
+    return jwt.encode(
+        {"sub": username, "scope": _STREAM_SCOPE, "job": job_id, "exp": expires},
+        settings.jwt_secret,
+        algorithm=ALGORITHM,
+    )
+
+
 def verify_token(token: str) -> dict:
     """Décode et valide un JWT. Lève JWTError si invalide ou expiré."""
     return jwt.decode(token, settings.jwt_secret, algorithms=[ALGORITHM])
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(_http_bearer),
-) -> dict:
-    """Dependency FastAPI — extrait et valide le JWT depuis le header Authorization."""
+def user_from_token(token: str) -> dict:
+    """Valide un JWT brut et retourne l'utilisateur (header Authorization ou WebSocket).
+
+    Raises:
+        HTTPException 401: token invalide, expiré ou incomplet.
+    """
     try:
-        payload = verify_token(credentials.credentials)
+        payload = verify_token(token)
         return {
             "username": payload["sub"],
             "role": payload["role"],
@@ -59,3 +80,36 @@ def get_current_user(
             detail="Token invalide ou expiré.",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(_http_bearer),
+) -> dict:
+    """Dependency FastAPI — extrait et valide le JWT depuis le header Authorization."""
+    return user_from_token(credentials.credentials)
+
+
+def get_job_stream_user(
+    job_id: str,
+    credentials: HTTPAuthorizationCredentials | None = Depends(_optional_bearer),
+    access_token: str = Query(""),
+) -> dict:
+    """Dependency du flux SSE d'un job — header Authorization, ou ?access_token= (EventSource n'envoie pas d'en-tête).
+
+    En query, seul un token de flux de ce job (create_stream_token) est
+    accepté : le JWT de session finirait dans les logs d'accès, de proxy et
+    l'historique du navigateur.
+    """
+    if credentials is not None:
+        return user_from_token(credentials.credentials)
+    try:
+        payload = verify_token(access_token)
+        if payload.get("scope") != _STREAM_SCOPE or payload.get("job") != job_id:
+            raise JWTError("token de flux d'un autre job")
+        return {"username": payload["sub"]}
+    except (JWTError, KeyError):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token invalide ou expiré.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
@@ -0,0 +1,107 @@
+"""
+timing.py — Durées par étape du pipeline vision (header Server-Timing)
+
+« L'analyse a pris 9 secondes » : décodage, détection carte, warp, contour ou
+ré-encodage JPEG ? Les services marquent leurs étapes avec stage("nom") ;
+les durées ne sont collectées qu'à l'intérieur d'un bloc collect_timings().
+
+  - Hors collect_timings() et listen_stages() : stage() retourne un context
+    manager vide partagé — deux lectures de ContextVar, aucune horloge, aucune
+    allocation
+  - ContextVar : chaque requête / thread du pool a son propre collecteur
+  - Une étape répétée (ex. un appel par trou) cumule ses durées
+  - Les durées (ms) sont de simples dicts : elles traversent la frontière du
+    pool de processus avec le résultat de la tâche (scan_tasks.run_timed)
+  - listen_stages(callback) : callback(nom) appelé à la fin de chaque étape
+    (progression des jobs asynchrones — scan_jobs) ; milestone(nom) signale
+    une étape atteinte sans la chronométrer
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable
+
+
+class _Stage:
+    """Chronomètre d'une étape : ajoute sa durée au collecteur à la sortie du bloc."""
+
+    __slots__ = ("_timings", "_name", "_listener", "_t0")
+
+    def __init__(self, timings: dict[str, float], name: str, listener: Callable[[str], None] | None) -> None:
+        self._timings = timings
+        self._name = name
+        self._listener = listener
+
+    def __enter__(self) -> None:
+        self._t0 = time.perf_counter()
+
+    def __exit__(self, *exc) -> None:
+        elapsed = (time.perf_counter() - self._t0) * 1000.0
+        self._timings[self._name] = self._timings.get(self._name, 0.0) + elapsed
+        if self._listener is not None:
+            self._listener(self._name)
+
+
+class _NoStage:
+    """Étape non mesurée (aucun collecteur actif)."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        pass
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+_NO_STAGE = _NoStage()
+_current: ContextVar[dict[str, float] | None] = ContextVar("stage_timings", default=None)
+_listener: ContextVar[Callable[[str], None] | None] = ContextVar("stage_listener", default=None)
+
+
+def stage(name: str) -> _Stage | _NoStage:
+    """Context manager mesurant l'étape `name` si un collecteur est actif.
+
+    Usage :
+        with stage("decode"):
+            img = cv2.imdecode(...)
+    """
+    timings = _current.get()
+    listener = _listener.get()
+    if timings is None and listener is None:
+        return _NO_STAGE
+    return _Stage({} if timings is None else timings, name, listener)
+
+
+def milestone(name: str) -> None:
+    """Signale l'étape `name` comme atteinte (listen_stages), sans durée."""
+    listener = _listener.get()
+    if listener is not None:
+        listener(name)
+
+
+@contextmanager
+def collect_timings():
+    """Active la collecte des durées d'étape pour le bloc ; produit le dict nom → ms."""
+    timings: dict[str, float] = {}
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def listen_stages(callback: Callable[[str], None]):
+    """Appelle callback(nom) à la fin de chaque étape du bloc (et à chaque milestone())."""
+    token = _listener.set(callback)
+    try:
+        yield
+    finally:
+        _listener.reset(token)
+
+
+def server_timing_header(timings: dict[str, float]) -> str:
+    """Valeur du header Server-Timing : "decode;dur=12.3, card;dur=4.1"."""
+    return ", ".join(f"{name};dur={ms:.1f}" for name, ms in timings.items())
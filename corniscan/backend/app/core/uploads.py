@@ -0,0 +1,199 @@
+"""
+uploads.py — Réception des uploads à taille bornée, sans copies intermédiaires
+
+Les endpoints scan lisaient tout le fichier (await file.read()) avant de
+vérifier _MAX_IMAGE_SIZE : un corps de 20 Mo était bufferisé, puis recopié
+vers le worker vision (pickle), avant même d'être refusé ou décodé.
+
+  - UploadLimitMiddleware : taille max du corps par route — refus 413 sur
+    Content-Length avant toute lecture, puis comptage des chunks reçus
+    (corps chunked ou Content-Length mensonger)
+  - read_upload() : copie l'upload par chunks en appliquant la limite ; petit
+    fichier → bytes, sinon fichier temporaire (UPLOAD_SPOOL_DIR, /dev/shm
+    conseillé) dont seul le chemin traverse la frontière du pool
+  - upload_buffer() : côté worker, vue sans copie — bytes tels quels ou fichier
+    mappé en mémoire (mmap) ; cv2.imdecode / PyMuPDF lisent directement les
+    pages mappées
+
+Pic mémoire d'une requête : l'image décodée, plus l'upload compressé une
+seule fois (cache de pages du fichier mappé) au lieu de trois copies.
+"""
+
+import json
+import mmap
+import os
+import tempfile
+import weakref
+from contextlib import contextmanager
+
+from fastapi import HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+_CHUNK_SIZE = 1024 * 1024
+_SPOOL_THRESHOLD = 1024 * 1024  # au-delà : fichier temporaire plutôt que bytes (même seuil que Starlette)
+
+
+def _too_large(limit: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+        detail=f"Fichier trop volumineux (max {limit // (1024 * 1024)} Mo).",
+    )
+
+
+class UploadLimitMiddleware:
+    """Middleware ASGI : refuse (413) les corps de requête au-delà de la limite de leur route.
+
+    limits : chemin exact → octets (corps multipart complet, champs de
+    formulaire compris). Les autres routes ne sont pas limitées ici.
+    """
+
+    def __init__(self, app, limits: dict[str, int]) -> None:
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope, receive, send) -> None:
+        limit = self.limits.get(scope["path"]) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        declared = dict(scope["headers"]).get(b"content-length")
+        if declared is not None and declared.isdigit() and int(declared) > limit:
+            await _send_too_large(send, limit)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Propagée par le parseur multipart → réponse 413 de FastAPI
+                    raise _too_large(limit)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+async def _send_too_large(send, limit: int) -> None:
+    body = json.dumps({"detail": _too_large(limit).detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status.HTTP_413_CONTENT_TOO_LARGE,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+def _unlink(path: str) -> None:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _attach(path: str, size: int) -> "SpooledUpload":
+    """Reconstruit un SpooledUpload dans un worker — sans supprimer le fichier à sa collecte."""
+    upload = SpooledUpload.__new__(SpooledUpload)
+    upload.path, upload.size, upload._finalizer = path, size, None
+    return upload
+
+
+class SpooledUpload:
+    """Upload écrit dans un fichier temporaire : seul le chemin est transmis aux workers (pickle).
+
+    Le fichier est supprimé par close(), ou à la collecte de l'instance du
+    processus principal (requête annulée, client déconnecté).
+    """
+
+    __slots__ = ("path", "size", "_finalizer", "__weakref__")
+
+    def __init__(self, path: str, size: int) -> None:
+        self.path = path
+        self.size = size
+        self._finalizer = weakref.finalize(self, _unlink, path)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __reduce__(self):
+        return _attach, (self.path, self.size)
+
+    def close(self) -> None:
+        if self._finalizer is not None:
+            self._finalizer()
+
+
+Upload = bytes | SpooledUpload
+
+
+def _read_limited(source, limit: int) -> Upload:
+    """Copie bloquante de source par chunks (thread) ; 413 dès que limit est dépassée."""
+    head = source.read(_SPOOL_THRESHOLD + 1)
+    if len(head) > limit:
+        raise _too_large(limit)
+    if len(head) <= _SPOOL_THRESHOLD:
+        return head
+    fd, path = tempfile.mkstemp(prefix="corniscan-", suffix=".upload", dir=settings.upload_spool_dir or None)
+    size = len(head)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            out.write(head)
+            del head
+            while chunk := source.read(_CHUNK_SIZE):
+                size += len(chunk)
+                if size > limit:
+                    raise _too_large(limit)
+                out.write(chunk)
+    except BaseException:
+        _unlink(path)
+        raise
+    return SpooledUpload(path, size)
+
+
+async def read_upload(file: UploadFile, limit: int) -> Upload:
+    """Lit un fichier uploadé en appliquant limit pendant la lecture.
+
+    Returns:
+        bytes (≤ 1 Mo) ou SpooledUpload — à libérer avec release_upload().
+
+    Raises:
+        HTTPException 413: fichier au-delà de limit (taille annoncée ou lue).
+    """
+    if file.size is not None and file.size > limit:
+        raise _too_large(limit)
+    return await run_in_threadpool(_read_limited, file.file, limit)
+
+
+def release_upload(upload: Upload | None) -> None:
+    """Supprime le fichier temporaire d'un upload spoolé (sans effet sur des bytes)."""
+    if isinstance(upload, SpooledUpload):
+        upload.close()
+
+
+@contextmanager
+def upload_buffer(upload: Upload):
+    """Vue sans copie sur le contenu : bytes tels quels, ou fichier spoolé mappé en lecture seule.
+
+    La vue n'est valide que dans le bloc ; un résultat qui doit en sortir est
+    copié (bytes(vue)).
+    """
+    if not isinstance(upload, SpooledUpload):
+        yield upload
+        return
+    with open(upload.path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapped)
+    try:
+        yield view
+    finally:
+        try:
+            view.release()
+            mapped.close()
+        except BufferError:
+            # Vue encore référencée (exception en cours, tableau numpy…) : fermée à la collecte
+            pass
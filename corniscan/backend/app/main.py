@@ -8,9 +8,14 @@ from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 
 from app.core.config import settings
+from app.core.metrics import MetricsMiddleware
+from app.core.uploads import UploadLimitMiddleware
 from app.routers.admin import router as admin_router
 from app.routers.auth import router as auth_router
-from app.routers.scan import router as scan_router
+from app.routers.metrics import router as metrics_router
+from app.routers.scan import UPLOAD_BODY_LIMITS, router as scan_router
+from app.services.scan_jobs import scan_jobs
+from app.services.vision_executor import vision_executor
 
 _BACKEND_DIR = Path(__file__).parent.parent
 _logger = logging.getLogger("uvicorn")
@@ -42,7 +47,7 @@ async def _run_migrations() -> None:
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Lifespan event — migrations + seed admin au démarrage."""
+    """Lifespan event — migrations + seed admin + préchauffage du pool vision + file de jobs au démarrage."""
     if settings.database_url:
         await _run_migrations()
 
@@ -51,7 +56,11 @@ async def lifespan(app: FastAPI):
 
         async with engine.connect() as conn:
             await seed_admin(conn)
+    vision_executor.start()
+    scan_jobs.start()
     yield
+    scan_jobs.shutdown()
+    vision_executor.shutdown()
 
 
 app = FastAPI(
@@ -62,6 +71,13 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Uploads scan : 413 sur Content-Length avant lecture du corps, puis au fil des chunks
+app.add_middleware(UploadLimitMiddleware, limits=UPLOAD_BODY_LIMITS)
+
+# Durée par route (GET /api/v1/metrics)
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
 # ── Health check endpoint ──────────────────────────────────────────────────────
 # ORDRE CRITIQUE : doit être déclaré AVANT le mount StaticFiles
 # Sinon StaticFiles capture "/" et l'endpoint n'est jamais atteint
@@ -70,6 +86,7 @@ app = FastAPI(
 app.include_router(auth_router)
 app.include_router(admin_router)
 app.include_router(scan_router)
+app.include_router(metrics_router)
 
 
 @app.get("/api/v1/health")
@@ -0,0 +1,100 @@
+# Routeur métriques — exploitation
+# GET /api/v1/metrics → format texte Prometheus (scrape local)
+#
+# Les jauges et compteurs ci-dessous sont calculés au moment du scrape, à
+# partir de l'état courant du pool vision, du cache et du pool SQLAlchemy : rien
+# n'est recopié sur le chemin des requêtes. Bearer METRICS_TOKEN toujours exigé : sans token
+# configuré, l'endpoint n'est pas exposé (404) — il révèle routes et activité.
+
+import hmac
+
+from fastapi import APIRouter, Header, HTTPException, Response, status
+
+from app.core import database
+from app.core.config import settings
+from app.core.metrics import REGISTRY, Counter, Gauge
+from app.services.result_cache import vision_cache
+from app.services.vision_executor import vision_executor
+
+router = APIRouter(prefix="/api/v1", tags=["metrics"])
+
+_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _db_pool_stats() -> dict | None:
+    if database.engine is None:
+        return None
+    pool = database.engine.pool
+    return {
+        ("size",): pool.size(),
+        ("checked_out",): pool.checkedout(),
+        ("overflow",): pool.overflow(),
+    }
+
+
+REGISTRY.register(Gauge(
+    "corniscan_vision_queue_depth",
+    "Tâches vision acceptées en attente d'un worker libre.",
+    collect=lambda: vision_executor.queue_depth,
+))
+REGISTRY.register(Gauge(
+    "corniscan_vision_in_flight",
+    "Tâches vision en cours d'exécution dans un worker.",
+    collect=lambda: vision_executor.in_flight,
+))
+REGISTRY.register(Gauge(
+    "corniscan_vision_capacity",
+    "Nombre maximal de tâches vision acceptées (workers + file).",
+    collect=lambda: vision_executor.capacity,
+))
+REGISTRY.register(Gauge(
+    "corniscan_vision_cpu_budget",
+    "Cœurs répartis entre les tâches vision par le gouverneur de threads OpenCV.",
+    collect=lambda: vision_executor.governor.budget if vision_executor.governor is not None else None,
+))
+REGISTRY.register(Gauge(
+    "corniscan_vision_opencv_threads",
+    "Threads OpenCV attribués à la dernière tâche vision soumise.",
+    collect=lambda: vision_executor.governor.last if vision_executor.governor is not None else None,
+))
+REGISTRY.register(Counter(
+    "corniscan_vision_cache_hits_total",
+    "Lectures du cache des résultats vision servies depuis le cache.",
+    collect=lambda: vision_cache.stats()["hits"],
+))
+REGISTRY.register(Counter(
+    "corniscan_vision_cache_misses_total",
+    "Lectures du cache des résultats vision sans entrée valide.",
+    collect=lambda: vision_cache.stats()["misses"],
+))
+REGISTRY.register(Counter(
+    "corniscan_vision_cache_evictions_total",
+    "Entrées du cache des résultats vision évincées (taille ou TTL).",
+    collect=lambda: vision_cache.stats()["evictions"],
+))
+REGISTRY.register(Gauge(
+    "corniscan_vision_cache_entries",
+    "Entrées présentes dans le cache des résultats vision.",
+    collect=lambda: vision_cache.stats()["entries"],
+))
+REGISTRY.register(Gauge(
+    "corniscan_vision_cache_bytes",
+    "Taille des entrées du cache des résultats vision (octets).",
+    collect=lambda: vision_cache.stats()["bytes"],
+))
+REGISTRY.register(Gauge(
+    "corniscan_db_pool",
+    "État du pool de connexions SQLAlchemy.",
+    ("stat",),
+    collect=_db_pool_stats,
+))
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics_endpoint(authorization: str = Header("")) -> Response:
+    """Métriques applicatives au format texte Prometheus (scrape)."""
+    if not settings.metrics_enabled or not settings.metrics_token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    if not hmac.compare_digest(authorization, f"Bearer {settings.metrics_token}"):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token métriques invalide.")
+    return Response(content=REGISTRY.render(), media_type=_CONTENT_TYPE)
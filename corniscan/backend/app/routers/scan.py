@@ -1,101 +1,674 @@
 # Routeur scan — Story 3.2 + Story 4.1 + Story 4.5 + Epic 5
-# POST /api/v1/scan/detect-card   → détection carte live (synchrone, thread pool)
+# POST /api/v1/scan/detect-card   → détection carte live (pool vision)
+# WS   /api/v1/scan/detect-card/ws → détection carte live en flux (frames JPEG binaires)
 # POST /api/v1/scan/process       → pipeline complet (Stories 4.x)
-# POST /api/v1/scan/submit        → DXF + PNG contour encodés base64 (partage natif frontend)
+# POST /api/v1/scan/process-pages → pipeline par page d'un PDF, résultats en NDJSON au fil de l'eau
+# POST /api/v1/scan/process-batch → pipeline sur plusieurs fichiers d'un même upload, NDJSON au fil de l'eau
+# POST /api/v1/scan/jobs          → job d'analyse asynchrone (id immédiat), suivi :
+#      GET  /jobs/{id}, GET /jobs/{id}/events (SSE), GET /jobs/{id}/artefacts/{nom}, DELETE /jobs/{id}
+# POST /api/v1/scan/submit        → DXF + PNG contour encodés base64 (partage natif frontend),
+#                                   ou multipart/mixed / ZIP binaires selon le header Accept
+#
+# Tout le travail CPU passe par le pool de processus vision (vision_executor) :
+# file bornée, 503 + Retry-After quand elle est pleine.
+# Uploads : corps refusé sur Content-Length / au fil de la lecture
+# (UPLOAD_BODY_LIMITS, core.uploads), fichiers > 1 Mo transmis aux workers par
+# fichier temporaire mappé en mémoire plutôt qu'en bytes.
+# Durées par étape : header Server-Timing (SERVER_TIMING_ENABLED) et, avec
+# ?timings=true, champ "timings" dans la réponse (ms).
 
 import asyncio
 import base64
 import json
-
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
-
-from app.core.security import get_current_user
-from app.services.dxf_service import generate_dxf
-from app.services.vision_service import detect_card, generate_contour_png, pdf_to_image_bytes, process_image
+import logging
+import time
+from functools import partial
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Form,
+    Header,
+    HTTPException,
+    Query,
+    Response,
+    UploadFile,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.core.metrics import vision_megapixels_in_flight, vision_rejections, vision_stage_duration
+from app.core.security import create_stream_token, get_current_user, get_job_stream_user, user_from_token
+from app.core.timing import server_timing_header
+from app.core.uploads import Upload, read_upload, release_upload, upload_buffer
+from app.services.card_tracking import TrackingState, card_trackers
+from app.services.image_decoder import read_image_size
+from app.services.result_cache import upload_digest, vision_cache
+from app.services.scan_delivery import (
+    NDJSON,
+    RENDER_OUTPUTS,
+    SSE,
+    ZIP,
+    artefact_name,
+    as_completed_bounded,
+    multipart_stream,
+    ndjson_line,
+    negotiate,
+    sse_event,
+    zip_stream,
+)
+from app.services.scan_jobs import ScanJob, scan_jobs
+from app.services.scan_tasks import (
+    detect_card_task,
+    pdf_page_count_task,
+    process_pdf_page_task,
+    process_task,
+    run_timed,
+    submit_task,
+)
+from app.services.vision_executor import VisionBusyError, vision_executor
+from app.services.vision_service import RENDER_PROFILES
 
 router = APIRouter(prefix="/api/v1/scan", tags=["scan"])
 
-_MAX_IMAGE_SIZE = 20 * 1024 * 1024  # 20 Mo (PDF inclus)
+_logger = logging.getLogger("uvicorn")
 
-
-def _normalise_to_image_bytes(file: UploadFile, raw: bytes) -> bytes:
-    """Convertit en JPEG si le fichier est un PDF, sinon renvoie raw tel quel."""
+_MAX_IMAGE_SIZE = 20 * 1024 * 1024  # 20 Mo (PDF inclus)
+_MAX_FORM_OVERHEAD = 2 * 1024 * 1024  # champs de formulaire (contour_points, ...) + en-têtes multipart
+
+# Corps de requête max par route (core.uploads.UploadLimitMiddleware, enregistré dans main)
+_SINGLE_UPLOAD_LIMIT = _MAX_IMAGE_SIZE + _MAX_FORM_OVERHEAD
+UPLOAD_BODY_LIMITS = {
+    **{
+        f"{router.prefix}{path}": _SINGLE_UPLOAD_LIMIT
+        for path in ("/detect-card", "/process", "/process-pages", "/jobs", "/submit")
+    },
+    f"{router.prefix}/process-batch": settings.vision_batch_max_files * _MAX_IMAGE_SIZE + _MAX_FORM_OVERHEAD,
+}
+_WS_AUTH_TIMEOUT_SECONDS = 10.0
+_SSE_KEEPALIVE_SECONDS = 15.0  # commentaire SSE périodique : les proxys ne coupent pas un flux silencieux
+
+
+def _is_pdf(file: UploadFile) -> bool:
+    """Vrai si l'upload est un PDF (content-type ou extension)."""
     ct = (file.content_type or "").lower()
     fn = (file.filename or "").lower()
-    if "pdf" in ct or fn.endswith(".pdf"):
-        return pdf_to_image_bytes(raw)
-    return raw
+    return "pdf" in ct or fn.endswith(".pdf")
+
+
+def _parse_optional_json(value: str) -> list | None:
+    """Décode un champ JSON optionnel ; vide ou invalide → None (repli sur la détection)."""
+    if not value:
+        return None
+    try:
+        parsed = json.loads(value)
+    except (json.JSONDecodeError, ValueError):
+        return None
+    return parsed if isinstance(parsed, list) else None
+
+
+def _parse_profiles(render: str) -> tuple[str, ...]:
+    """?render=preview,archive → profils demandés (ordre conservé, doublons retirés) ; inconnu → 422."""
+    profiles = tuple(dict.fromkeys(p.strip() for p in render.split(",") if p.strip()))
+    if not profiles or any(p not in RENDER_PROFILES for p in profiles):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"render invalide — profils disponibles : {', '.join(RENDER_PROFILES)}.",
+        )
+    return profiles
+
+
+def _parse_pages(spec: str, page_count: int) -> list[int]:
+    """?pages=1-3,7,10- → indices de page (base 0), ordre conservé, doublons retirés.
+
+    Numérotation 1..page_count comme une boîte de dialogue d'impression ;
+    vide → toutes les pages. Invalide ou hors limites → 422.
+    """
+    if not spec.strip():
+        return list(range(page_count))
+    pages: list[int] = []
+    try:
+        for part in filter(None, (p.strip() for p in spec.split(","))):
+            start, sep, end = part.partition("-")
+            first = int(start) if start else 1
+            last = (int(end) if end else page_count) if sep else first
+            if not 1 <= first <= last <= page_count:
+                raise ValueError(part)
+            pages.extend(range(first - 1, last))
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"pages invalide — pages 1 à {page_count}, ex. 1-3,7.",
+        ) from exc
+    return list(dict.fromkeys(pages))
+
+
+async def _batch_item(
+    key: dict, fn, *args, cache_key: str | None = None, megapixels: float = 0.0,
+) -> dict:
+    """Un élément d'un lot : {**key, "result": ...} ou {**key, "error": {"status", "detail"}}.
+
+    Une erreur (422, 503, ...) n'interrompt pas le lot : elle est rapportée
+    sur la ligne de l'élément.
+    """
+    result = vision_cache.get("process", cache_key) if cache_key else None
+    if result is None:
+        try:
+            result = await _run_vision(fn, *args, megapixels=megapixels)
+        except HTTPException as exc:
+            return {**key, "error": {"status": exc.status_code, "detail": exc.detail}}
+        except Exception:
+            _logger.exception("Élément de lot en échec : %s", key)
+            return {**key, "error": {"status": 500, "detail": "Erreur interne pendant l'analyse."}}
+        if cache_key:
+            _cache_process_result(cache_key, result)
+    return {**key, "result": result}
+
+
+def _cache_key(digest: str, is_pdf: bool, page: int = 0) -> str:
+    """Clé du cache vision : empreinte + nature de l'entrée et paramètres qui changent le résultat.
+
+    Mêmes octets en image et en PDF, pages différentes, analyse vectorielle
+    activée ou non → entrées distinctes.
+    """
+    if not is_pdf:
+        return f"{digest}:image"
+    return f"{digest}:pdf:p{page + 1}:{'vector' if settings.pdf_vector_analysis else 'raster'}"
+
+
+def _cache_process_result(key: str, result: dict) -> None:
+    """Résultat /process en cache, et géométrie carte seule pour un /submit ultérieur."""
+    vision_cache.put("process", key, result)
+    if result["card_quad"] is not None:
+        vision_cache.put("card", key, {"card_quad": result["card_quad"], "homography": result["homography"]})
+
+
+def _timings_for(include_timings: bool) -> dict[str, float] | None:
+    """Collecteur de durées de la requête, ou None si ni header, ni champ timings, ni métriques."""
+    if include_timings or settings.server_timing_enabled or settings.metrics_enabled:
+        return {}
+    return None
+
+
+def _image_megapixels(data) -> float:
+    """Taille de l'image d'après son en-tête (0 pour un PDF ou un format inconnu)."""
+    size = read_image_size(data)
+    return size[0] * size[1] / 1e6 if size else 0.0
+
+
+def _read_megapixels(upload: Upload) -> float:
+    with upload_buffer(upload) as data:
+        return _image_megapixels(data)
+
+
+def _read_digest(upload: Upload) -> str:
+    with upload_buffer(upload) as data:
+        return upload_digest(data)
+
+
+async def _megapixels(upload: Upload) -> float:
+    """_image_megapixels() d'un upload, hors de la boucle (fichier spoolé mappé)."""
+    return await run_in_threadpool(_read_megapixels, upload)
+
+
+async def _digest(upload: Upload) -> str:
+    """Empreinte du cache d'un upload (jusqu'à 20 Mo hachés) — hors de la boucle."""
+    return await run_in_threadpool(_read_digest, upload)
+
+
+def _emit_timings(response: Response, timings: dict[str, float] | None) -> None:
+    if timings and settings.server_timing_enabled:
+        response.headers["Server-Timing"] = server_timing_header(timings)
+
+
+def _rounded(timings: dict[str, float]) -> dict[str, float]:
+    return {name: round(ms, 2) for name, ms in timings.items()}
+
+
+async def _run_vision(fn, *args, timings: dict[str, float] | None = None, megapixels: float = 0.0):
+    """Exécute une tâche dans le pool vision ; traduit saturation → 503 et ValueError → 422.
+
+    timings fourni → durées par étape de la tâche ajoutées au dict, plus
+    "wait" (file d'attente + transfert vers le worker), et reportées dans
+    les métriques.
+    """
+    vision_megapixels_in_flight.inc(megapixels)
+    try:
+        if timings is None:
+            return await vision_executor.run(fn, *args)
+        t0 = time.perf_counter()
+        result, stages = await vision_executor.run(run_timed, fn, *args)
+        timings.update(stages)
+        timings["wait"] = max(0.0, (time.perf_counter() - t0) * 1000.0 - stages["vision"])
+        if settings.metrics_enabled:
+            for name in (*stages, "wait"):
+                vision_stage_duration.observe(timings[name] / 1000.0, name)
+        return result
+    except VisionBusyError as exc:
+        vision_rejections.inc()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(exc),
+            headers={"Retry-After": str(exc.retry_after)},
+        ) from exc
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(exc),
+        ) from exc
+    finally:
+        vision_megapixels_in_flight.dec(megapixels)
+
+
+def _public_detection(result: dict) -> dict:
+    """Contrat /detect-card : retire les champs internes au suivi (quad, roi)."""
+    return {"card_detected": result["card_detected"], "confidence": result["confidence"]}
 
 
 @router.post("/detect-card")
 async def detect_card_endpoint(
+    response: Response,
     file: UploadFile = File(...),
-    _: dict = Depends(get_current_user),
+    x_scan_session: str = Header(""),
+    include_timings: bool = Query(False, alias="timings"),
+    user: dict = Depends(get_current_user),
 ) -> dict:
     """Détecte une carte bancaire dans la frame JPEG reçue (Story 3.2 — FR10).
 
     Appelé toutes les 500ms par le frontend pendant le flux caméra.
-    La détection OpenCV tourne dans un thread pool pour ne pas bloquer l'event loop.
+    La détection OpenCV tourne dans le pool vision pour ne pas bloquer l'event loop.
+    Chemin rapide niveaux de gris à buffers réutilisés (live_detection).
+    Suivi par session (utilisateur + header X-Scan-Session) : la recherche
+    part du quad de la frame précédente (card_tracking). Sans header, pas de
+    suivi — frame entière à chaque appel, sans état partagé entre appareils.
 
     Returns:
-        {"card_detected": bool, "confidence": float}
+        {"card_detected": bool, "confidence": float}  (+ "timings" si ?timings=true)
     """
-    image_bytes = await file.read()
+    image = await read_upload(file, _MAX_IMAGE_SIZE)
 
-    if len(image_bytes) > _MAX_IMAGE_SIZE:
-        raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail="Image trop volumineuse (max 10 Mo).",
+    tracking = card_trackers.get(f"{user['username']}:{x_scan_session}") if x_scan_session else None
+    roi = tracking.roi_hint() if tracking is not None else None
+
+    # Exécution dans un worker vision — ne bloque pas l'event loop (NFR-P4)
+    timings = _timings_for(include_timings)
+    try:
+        result = await _run_vision(
+            detect_card_task, image, roi, timings=timings, megapixels=await _megapixels(image),
         )
+    finally:
+        release_upload(image)
+    if tracking is not None:
+        tracking.update(result["quad"], result["roi"])
 
-    # Exécution synchrone dans un thread pool — ne bloque pas l'event loop (NFR-P4)
-    loop = asyncio.get_event_loop()
-    result = await loop.run_in_executor(None, detect_card, image_bytes)
+    _emit_timings(response, timings)
+    if include_timings:
+        return {**_public_detection(result), "timings": _rounded(timings)}
+    return _public_detection(result)
 
-    return result
+
+class _LatestFrameSlot:
+    """Emplacement à une seule frame : la plus récente remplace celle pas encore traitée.
+
+    Une frame lente ne fait jamais attendre les suivantes — on analyse toujours
+    la dernière image reçue (latest-frame-wins).
+    """
+
+    def __init__(self) -> None:
+        self._frame: bytes | None = None
+        self._seq = 0
+        self._ready = asyncio.Event()
+        self.dropped = 0
+
+    def put(self, frame: bytes) -> None:
+        if self._frame is not None:
+            self.dropped += 1
+        self._seq += 1
+        self._frame = frame
+        self._ready.set()
+
+    async def take(self) -> tuple[int, bytes]:
+        """Attend puis retire la frame la plus récente : (numéro de frame, bytes)."""
+        await self._ready.wait()
+        self._ready.clear()
+        frame, self._frame = self._frame, None
+        return self._seq, frame
+
+
+@router.websocket("/detect-card/ws")
+async def detect_card_ws(websocket: WebSocket) -> None:
+    """Détection carte live en flux (Story 3.2 — FR10), sans multipart ni JWT par frame.
+
+    Protocole :
+      1. Client → {"token": "<jwt>"} (texte, premier message, < 10 s)
+         Serveur → {"authenticated": true}, ou fermeture 1008 si token invalide
+      2. Client → frames JPEG (messages binaires, au rythme de la caméra)
+         Serveur → {"frame": int, "card_detected": bool, "confidence": float}
+         par frame analysée ; les frames remplacées avant analyse ne reçoivent
+         pas de réponse (latest-frame-wins).
+    Pool vision saturé → la frame est ignorée, la suivante sera analysée.
+    Erreur inattendue → journalisée, fermeture 1011.
+    Suivi carte propre à la connexion (card_tracking), libéré à la fermeture.
+    """
+    await websocket.accept()
+    try:
+        message = await asyncio.wait_for(websocket.receive_text(), _WS_AUTH_TIMEOUT_SECONDS)
+        user_from_token(json.loads(message)["token"])
+    except WebSocketDisconnect:
+        return
+    except (asyncio.TimeoutError, json.JSONDecodeError, KeyError, TypeError, HTTPException):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await websocket.send_json({"authenticated": True})
+
+    slot = _LatestFrameSlot()
+    tracking = TrackingState(settings.card_tracking_refresh_frames)
+
+    async def detect_loop() -> None:
+        try:
+            while True:
+                seq, frame = await slot.take()
+                megapixels = _image_megapixels(frame)
+                vision_megapixels_in_flight.inc(megapixels)
+                try:
+                    result = await vision_executor.run(detect_card_task, frame, tracking.roi_hint())
+                except VisionBusyError:
+                    vision_rejections.inc()
+                    continue
+                finally:
+                    vision_megapixels_in_flight.dec(megapixels)
+                tracking.update(result["quad"], result["roi"])
+                await websocket.send_json({"frame": seq, **_public_detection(result)})
+        except WebSocketDisconnect:
+            return
+        except Exception:
+            # Sans réponse ni fermeture, le client attendrait indéfiniment
+            _logger.exception("Détection carte live en échec")
+            await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+
+    detector = asyncio.create_task(detect_loop())
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            frame = message.get("bytes")
+            if frame is None:
+                continue
+            if len(frame) > _MAX_IMAGE_SIZE:
+                await websocket.close(code=status.WS_1009_MESSAGE_TOO_BIG)
+                break
+            slot.put(frame)
+    finally:
+        detector.cancel()
+        await asyncio.gather(detector, return_exceptions=True)
 
 
 @router.post("/process")
-def process_image_endpoint(
+async def process_image_endpoint(
+    response: Response,
     file: UploadFile = File(...),
+    include_timings: bool = Query(False, alias="timings"),
     _: dict = Depends(get_current_user),
 ) -> dict:
     """Pipeline complet d'analyse : homographie + perspective + contour joint + dimensions (Story 4.1 — FR14-18).
 
-    Déclaré `def` synchrone — Uvicorn l'exécute dans son thread pool,
-    adapté au code CPU-bound OpenCV sans bloquer l'event loop (NFR-P4).
+    Le pipeline OpenCV s'exécute dans un worker du pool vision,
+    sans bloquer l'event loop (NFR-P4).
+    PDF vectoriel (export CAO) : géométrie lue dans les tracés, sans rastérisation.
     Aucune donnée n'est persistée côté serveur (NFR-S4).
+    Résultat mis en cache par empreinte de l'upload : une relance identique
+    ne repasse pas par OpenCV (seule la géométrie est conservée).
 
     Returns:
         {
             "contour_points": list[list[float]],
             "dimensions": {"width_mm": float, "height_mm": float},
             "calibration_warning": bool,
+            "holes": list[dict],
+            "card_quad": list[list[float]] | None,
+            "homography": list[list[float]] | None,
+            "scale_factor": float,
+            "timings": dict[str, float],  # si ?timings=true (ms par étape)
         }
     """
-    image_bytes = file.file.read()
+    upload = await read_upload(file, _MAX_IMAGE_SIZE)
+
+    timings = _timings_for(include_timings)
+    try:
+        t0 = time.perf_counter()
+        key = _cache_key(await _digest(upload), _is_pdf(file))
+        cached = vision_cache.get("process", key)
+        if timings is not None:
+            timings["cache"] = (time.perf_counter() - t0) * 1000.0
+
+        if cached is not None:
+            result = cached
+        else:
+            result = await _run_vision(
+                process_task, upload, _is_pdf(file), timings=timings, megapixels=await _megapixels(upload),
+            )
+            _cache_process_result(key, result)
+    finally:
+        release_upload(upload)
+
+    _emit_timings(response, timings)
+    if include_timings:
+        return {**result, "timings": _rounded(timings)}
+    return result
+
+
+@router.post("/process-pages")
+async def process_pdf_pages_endpoint(
+    file: UploadFile = File(...),
+    pages: str = Query(""),
+    _: dict = Depends(get_current_user),
+) -> StreamingResponse:
+    """Analyse page par page d'un PDF multi-pages (un plan de joint par page).
+
+    ?pages=1-3,7 (numérotation à partir de 1, vide = toutes, PDF_MAX_PAGES au
+    plus). Les pages sont réparties sur les workers du pool vision, au plus
+    VISION_BATCH_CONCURRENCY à la fois : la mémoire reste bornée à quelques
+    pages quel que soit le document.
+
+    Returns:
+        Flux NDJSON, une ligne par page dans l'ordre d'achèvement :
+        {"page": int, "result": {...}}  — même structure que /process
+        {"page": int, "error": {"status": int, "detail": str}}
+    """
+    if not _is_pdf(file):
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Un PDF est attendu.")
+    # Chaque page reçoit le même upload : un fichier spoolé n'est transmis que par son chemin
+    upload = await read_upload(file, _MAX_IMAGE_SIZE)
+
+    try:
+        indices = _parse_pages(pages, await _run_vision(pdf_page_count_task, upload))
+        if len(indices) > settings.pdf_max_pages:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Trop de pages ({len(indices)}, max {settings.pdf_max_pages}).",
+            )
+        digest = await _digest(upload)
+    except BaseException:
+        release_upload(upload)
+        raise
+
+    jobs = (
+        partial(_batch_item, {"page": i + 1}, process_pdf_page_task, upload, i, cache_key=_cache_key(digest, True, i))
+        for i in indices
+    )
+
+    async def lines():
+        try:
+            async for item in as_completed_bounded(jobs, settings.vision_batch_concurrency):
+                yield ndjson_line(item)
+        finally:
+            release_upload(upload)
+
+    return StreamingResponse(lines(), media_type=NDJSON)
+
+
+async def _batch_file(index: int, file: UploadFile) -> dict:
+    """Un fichier de /process-batch, lu seulement quand son tour vient (mémoire bornée)."""
+    key = {"index": index, "filename": file.filename}
+    try:
+        upload = await read_upload(file, _MAX_IMAGE_SIZE)
+    except HTTPException as exc:
+        return {**key, "error": {"status": exc.status_code, "detail": exc.detail}}
+    finally:
+        await file.close()
+    try:
+        return await _batch_item(
+            key, process_task, upload, _is_pdf(file),
+            cache_key=_cache_key(await _digest(upload), _is_pdf(file)), megapixels=await _megapixels(upload),
+        )
+    finally:
+        release_upload(upload)
+
 
-    if len(image_bytes) > _MAX_IMAGE_SIZE:
+@router.post("/process-batch")
+async def process_batch_endpoint(
+    files: list[UploadFile] = File(...),
+    _: dict = Depends(get_current_user),
+) -> StreamingResponse:
+    """Pipeline complet sur plusieurs photos (ou PDF) envoyées en un seul multipart.
+
+    Mesure d'un lot de joints photographiés hors ligne, sans un aller-retour
+    /process par fichier. Les fichiers sont répartis sur les workers du pool
+    vision, au plus VISION_BATCH_CONCURRENCY à la fois (VISION_BATCH_MAX_FILES
+    fichiers par lot). Cache partagé avec /process.
+
+    Returns:
+        Flux NDJSON, une ligne par fichier dans l'ordre d'achèvement :
+        {"index": int, "filename": str, "result": {...}}  — même structure que /process
+        {"index": int, "filename": str, "error": {"status": int, "detail": str}}
+        index = position du fichier dans le multipart (à partir de 0).
+    """
+    if len(files) > settings.vision_batch_max_files:
         raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail="Fichier trop volumineux (max 20 Mo).",
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Trop de fichiers ({len(files)}, max {settings.vision_batch_max_files}).",
         )
 
-    image_bytes = _normalise_to_image_bytes(file, image_bytes)
+    jobs = (partial(_batch_file, index, file) for index, file in enumerate(files))
+
+    async def lines():
+        async for item in as_completed_bounded(jobs, settings.vision_batch_concurrency):
+            yield ndjson_line(item)
+
+    return StreamingResponse(lines(), media_type=NDJSON)
+
+
+@router.post("/jobs", status_code=status.HTTP_202_ACCEPTED)
+async def create_scan_job_endpoint(
+    file: UploadFile = File(...),
+    render: str = Query("archive"),
+    webp: bool = Query(False),
+    user: dict = Depends(get_current_user),
+) -> dict:
+    """Job d'analyse asynchrone : /process + génération DXF et rendu contour, sans garder la requête ouverte.
+
+    Répond dès l'upload reçu ; l'analyse tourne ensuite dans le pool vision
+    (scan_jobs). Suivi par GET /jobs/{id} ou flux SSE /jobs/{id}/events ;
+    fichiers (joint.dxf, contour.jpg, ... selon ?render / ?webp comme /submit)
+    sur /jobs/{id}/artefacts/{nom} jusqu'à expiration (SCAN_JOBS_TTL_SECONDS).
+    File pleine → 503 + Retry-After.
+
+    Returns:
+        {"job_id": str, "status": "queued", ..., "status_url": str, "events_url": str}
+        — events_url porte un token de flux court, propre au job (EventSource)
+    """
+    profiles = _parse_profiles(render)
+    # Le job conserve son upload (spoolé sur disque au-delà de 1 Mo) jusqu'à sa fin
+    upload = await read_upload(file, _MAX_IMAGE_SIZE)
 
     try:
-        result = process_image(image_bytes)
-    except ValueError as exc:
+        job = await scan_jobs.submit(user["username"], file.filename, upload, _is_pdf(file), profiles, webp)
+    except VisionBusyError as exc:
+        release_upload(upload)
         raise HTTPException(
-            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail=str(exc),
+            headers={"Retry-After": str(exc.retry_after)},
         ) from exc
 
-    return result
+    return {**job.summary(), **_job_urls(job)}
+
+
+def _job_urls(job: ScanJob) -> dict:
+    url = f"{router.prefix}/jobs/{job.id}"
+    return {"status_url": url, "events_url": f"{url}/events?access_token={create_stream_token(job.owner, job.id)}"}
+
+
+def _job_or_404(job_id: str, user: dict) -> ScanJob:
+    job = scan_jobs.get(job_id, user["username"])
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job introuvable ou expiré.")
+    return job
+
+
+@router.get("/jobs/{job_id}")
+async def get_scan_job_endpoint(job_id: str, user: dict = Depends(get_current_user)) -> dict:
+    """État d'un job : status (queued, running, done, failed), jalons atteints, résultat /process et fichiers.
+
+    events_url renouvelé (token de flux expiré → reconnexion EventSource).
+    """
+    job = _job_or_404(job_id, user)
+    return {**job.summary(), **_job_urls(job)}
+
+
+@router.get("/jobs/{job_id}/events")
+async def scan_job_events_endpoint(
+    job_id: str,
+    last_event_id: str = Header(""),
+    user: dict = Depends(get_job_stream_user),
+) -> StreamingResponse:
+    """Progression d'un job en Server-Sent Events, du premier événement (ou après Last-Event-ID) à la fin.
+
+    Événements : "status" {"status"}, "stage" {"stage", "elapsed_ms"} pour
+    decoded, card_found, contour_extracted, dxf_ready, puis "done" ou
+    "failed" (même contenu que GET /jobs/{id}). Token par header
+    Authorization, ou token de flux du job en ?access_token= (events_url,
+    pour EventSource) — jamais le JWT de session.
+    """
+    job = _job_or_404(job_id, user)
+    after = int(last_event_id) if last_event_id.isdigit() else 0
+
+    async def events():
+        async for item in job.follow(after, keepalive=_SSE_KEEPALIVE_SECONDS):
+            yield b": keepalive\n\n" if item is None else sse_event(*item)
+
+    return StreamingResponse(
+        events(), media_type=SSE, headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/jobs/{job_id}/artefacts/{name}")
+async def get_scan_job_artefact_endpoint(job_id: str, name: str, user: dict = Depends(get_current_user)) -> Response:
+    """Fichier généré par un job terminé (joint.dxf, contour.jpg, contour_preview.webp, ...)."""
+    artefact = _job_or_404(job_id, user).artefacts.get(name)
+    if artefact is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Fichier introuvable.")
+    media_type, data = artefact
+    return Response(data, media_type=media_type, headers={"Content-Disposition": f'attachment; filename="{name}"'})
+
+
+@router.delete("/jobs/{job_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_scan_job_endpoint(job_id: str, user: dict = Depends(get_current_user)) -> Response:
+    """Efface immédiatement le job, son upload, son résultat et ses fichiers (NFR-S4)."""
+    if not await scan_jobs.delete(job_id, user["username"]):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job introuvable ou expiré.")
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
 @router.post("/submit")
-def submit_scan_endpoint(
+async def submit_scan_endpoint(
+    response: Response,
     file: UploadFile = File(...),
     contour_points: str = Form(...),
     width_mm: float = Form(...),
@@ -103,25 +676,42 @@ def submit_scan_endpoint(
     thickness: float | None = Form(None),
     calibration_warning: bool = Form(False),
     hole_contours: str = Form("[]"),
+    card_quad: str = Form(""),
+    homography: str = Form(""),
+    include_timings: bool = Query(False, alias="timings"),
+    include_original: bool = Query(True),
+    render: str = Query("archive"),
+    webp: bool = Query(False),
+    accept: str = Header(""),
     _: dict = Depends(get_current_user),
-) -> dict:
+):
     """Pipeline de livraison : génère DXF R2018 + PNG contour et les retourne en base64 (Stories 4.5, 5.1, 5.2).
 
-    Exécuté en `def` synchrone (thread pool Uvicorn).
+    DXF et PNG sont générés dans un worker du pool vision.
     Aucune donnée n'est persistée côté serveur (NFR-S4).
+    card_quad / homography (JSON, renvoyés par /process) évitent une nouvelle
+    détection carte ; absents → géométrie du cache si la même photo est passée
+    par /process ; incohérents → détection comme avant.
+
+    Mode de réponse négocié par Accept (scan_delivery) :
+      - multipart/mixed ou application/zip → fichiers binaires joint.dxf,
+        contour.jpg, original.jpg (sans base64, sans copie intermédiaire)
+      - sinon JSON base64 (frontend actuel)
+    ?include_original=false → l'image source n'est pas renvoyée.
+    ?render=preview|archive|preview,archive → profils de rendu du contour
+    (défaut archive : JPEG q100 pleine résolution ; preview : largeur plafonnée,
+    JPEG q85, ou WebP avec ?webp=true). archive → "contour" / contour.jpg,
+    preview → "contour_preview" / contour_preview.jpg|webp.
 
     Returns:
-        {"dxf": str, "image": str, "contour": str}  — fichiers encodés en base64
+        {"dxf": str, "image": str, "contour": str, "geometry": dict}  — fichiers
+        encodés en base64 ("image" absent si include_original=false ; "contour" /
+        "contour_preview" selon ?render ; + "timings" si ?timings=true).
+        geometry : compression du contour dans le DXF — sommets avant / après,
+        arcs, cercles, écart max (mm), taille du DXF (en-tête X-DXF-Geometry
+        en mode binaire).
     """
-    image_bytes = file.file.read()
-
-    if len(image_bytes) > _MAX_IMAGE_SIZE:
-        raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail="Fichier trop volumineux (max 20 Mo).",
-        )
-
-    image_bytes = _normalise_to_image_bytes(file, image_bytes)
+    profiles = _parse_profiles(render)
 
     try:
         points: list[list[float]] = json.loads(contour_points)
@@ -136,26 +726,50 @@ def submit_scan_endpoint(
     except (json.JSONDecodeError, ValueError):
         holes_list = []
 
-    # Story 5.1 — génération DXF R2018
-    try:
-        dxf_bytes = generate_dxf(points, width_mm, height_mm, holes=holes_list or None)
-    except ValueError as exc:
-        raise HTTPException(
-            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            detail=f"Génération DXF échouée : {exc}",
-        ) from exc
-
-    # Story 5.2 — PNG contour superposé
+    upload = await read_upload(file, _MAX_IMAGE_SIZE)
     try:
-        png_bytes = generate_contour_png(image_bytes, points, width_mm, height_mm, holes_list or [])
-    except ValueError as exc:
-        raise HTTPException(
-            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            detail=str(exc),
-        ) from exc
-
-    return {
-        "dxf": base64.b64encode(dxf_bytes).decode(),
-        "image": base64.b64encode(image_bytes).decode(),
-        "contour": base64.b64encode(png_bytes).decode(),
-    }
+        card_geometry = {
+            "card_quad": _parse_optional_json(card_quad),
+            "homography": _parse_optional_json(homography),
+        }
+        if card_geometry["card_quad"] is None and card_geometry["homography"] is None:
+            card_geometry = vision_cache.get("card", _cache_key(await _digest(upload), _is_pdf(file))) or card_geometry
+
+        # Stories 5.1 + 5.2 — DXF R2018 + PNG contour superposé
+        timings = _timings_for(include_timings)
+        dxf_bytes, image_bytes, renders, geometry = await _run_vision(
+            submit_task, upload, _is_pdf(file), points, width_mm, height_mm, holes_list or [], card_geometry,
+            include_original, profiles, webp, timings=timings, megapixels=await _megapixels(upload),
+        )
+    finally:
+        release_upload(upload)
+
+    mode = negotiate(accept)
+    if mode is not None:
+        artefacts = [("joint.dxf", "application/dxf", dxf_bytes)]
+        for profile, (data, media_type) in renders.items():
+            artefacts.append((artefact_name(profile, media_type), media_type, data))
+        if image_bytes is not None:
+            artefacts.append(("original.jpg", "image/jpeg", image_bytes))
+        if mode == ZIP:
+            streamed = StreamingResponse(
+                zip_stream(artefacts), media_type=ZIP,
+                headers={"Content-Disposition": 'attachment; filename="scan.zip"'},
+            )
+        else:
+            media_type, body = multipart_stream(artefacts)
+            streamed = StreamingResponse(body, media_type=media_type)
+        streamed.headers["X-DXF-Geometry"] = json.dumps(geometry, separators=(",", ":"))
+        _emit_timings(streamed, timings)
+        return streamed
+
+    result = {"dxf": base64.b64encode(dxf_bytes).decode()}
+    if image_bytes is not None:
+        result["image"] = base64.b64encode(image_bytes).decode()
+    for profile, (data, _) in renders.items():
+        result[RENDER_OUTPUTS[profile]] = base64.b64encode(data).decode()
+    result["geometry"] = geometry
+    _emit_timings(response, timings)
+    if include_timings:
+        result["timings"] = _rounded(timings)
+    return result
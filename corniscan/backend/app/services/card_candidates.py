@@ -0,0 +1,113 @@
+"""
+card_candidates.py — Extraction des quadrilatères candidats carte bancaire
+
+Source unique du filtre carte utilisé par detect_card(), _find_card_corners()
+et la détection live. Sur fond de chantier texturé, findContours renvoie des
+milliers de petits contours : la boucle arcLength / approxPolyDP / contourArea /
+boundingRect par contour dominait le temps de détection.
+
+  1. Pré-filtre vectorisé sur tous les contours d'un coup : rectangle englobant
+     (np.minimum/maximum.reduceat sur les points concaténés) — la surface du
+     quadrilatère approché ne peut pas dépasser celle de ce rectangle
+  2. Survivants triés par surface englobante décroissante
+  3. Arrêt anticipé : dès qu'un candidat accepté couvre au moins la surface
+     englobante des contours restants, aucun d'eux ne peut le battre
+
+Résultat : tableau structuré (CANDIDATE_DTYPE) trié par surface décroissante —
+le premier élément est la carte retenue (plus grand quadrilatère au bon ratio).
+"""
+
+import numpy as np
+import cv2
+
+_CARD_RATIO = 85.6 / 53.98  # ≈ 1.585
+_RATIO_TOLERANCE = 0.12  # ±12 % de tolérance (filtre strict : seules les vraies cartes)
+_MIN_AREA_FRACTION = 0.04  # Le quadrilatère doit couvrir ≥ 4 % de l'image
+
+CANDIDATE_DTYPE = np.dtype([
+    ("quad", np.int32, (4, 2)),  # sommets approxPolyDP, ordre du contour
+    ("area", np.float64),  # surface du quadrilatère (px²)
+    ("ratio", np.float64),  # ratio largeur/hauteur normalisé (≥ 1)
+    ("score", np.float64),  # confiance ∈ [0, 1] proportionnelle à la surface occupée
+])
+
+
+def _bounding_areas(contours) -> np.ndarray:
+    """Surfaces des rectangles englobants de tous les contours, calculées en bloc."""
+    lengths = np.fromiter((len(c) for c in contours), dtype=np.intp, count=len(contours))
+    points = np.concatenate(contours).reshape(-1, 2)
+    starts = np.zeros(len(lengths), dtype=np.intp)
+    np.cumsum(lengths[:-1], out=starts[1:])
+    spans = np.maximum.reduceat(points, starts) - np.minimum.reduceat(points, starts) + 1
+    return spans[:, 0].astype(np.float64) * spans[:, 1]
+
+
+def extract_card_candidates(
+    contours, image_area: int, exhaustive: bool = False, min_area_fraction: float = _MIN_AREA_FRACTION,
+) -> np.ndarray:
+    """Quadrilatères au ratio carte bancaire parmi `contours`.
+
+    Args:
+        contours: sortie de cv2.findContours.
+        image_area: surface de l'image (px²) — seuil min_area_fraction et score.
+        exhaustive: désactive l'arrêt anticipé (tous les candidats sont retournés).
+        min_area_fraction: surface minimale du quad rapportée à image_area
+            (abaissée pour une recherche grossière, confirmée ensuite).
+
+    Returns:
+        Tableau CANDIDATE_DTYPE trié par surface décroissante (vide si aucune carte).
+        Sans `exhaustive`, seuls les candidats examinés avant l'arrêt anticipé
+        figurent — le premier est toujours le meilleur.
+    """
+    if len(contours) == 0:
+        return np.empty(0, dtype=CANDIDATE_DTYPE)
+
+    min_area = min_area_fraction * image_area
+    bbox_areas = _bounding_areas(contours)
+    survivors = np.flatnonzero(bbox_areas >= min_area)
+    survivors = survivors[np.argsort(-bbox_areas[survivors], kind="stable")]
+
+    found = []
+    best_area = 0.0
+    for idx in survivors:
+        if not exhaustive and bbox_areas[idx] <= best_area:
+            break
+
+        cnt = contours[idx]
+        perimeter = cv2.arcLength(cnt, True)
+        approx = cv2.approxPolyDP(cnt, 0.02 * perimeter, True)
+
+        # Filtre : exactement 4 sommets (quadrilatère)
+        if len(approx) != 4:
+            continue
+
+        # Filtre : surface minimale (évite les petits artéfacts)
+        area = cv2.contourArea(approx)
+        if area < min_area:
+            continue
+
+        # Ratio largeur/hauteur du bounding rect, deux orientations (portrait / paysage)
+        _, _, w, h = cv2.boundingRect(approx)
+        if h == 0:
+            continue
+        ratio = max(w / h, h / w)
+        if abs(ratio - _CARD_RATIO) > _RATIO_TOLERANCE:
+            continue
+
+        found.append((approx.reshape(4, 2), area, ratio, min(area / image_area * 10.0, 1.0)))
+        best_area = max(best_area, area)
+
+    candidates = np.array(found, dtype=CANDIDATE_DTYPE)
+    return candidates[np.argsort(-candidates["area"], kind="stable")]
+
+
+def best_card_quad(contours, image_area: int) -> tuple[float, np.ndarray | None]:
+    """Meilleur quadrilatère carte (le plus grand) et sa confiance.
+
+    Returns:
+        (confiance ∈ [0, 1], quad int32 4×2 | None) — (0.0, None) si aucune carte.
+    """
+    candidates = extract_card_candidates(contours, image_area)
+    if len(candidates) == 0:
+        return 0.0, None
+    return float(candidates[0]["score"]), candidates[0]["quad"]
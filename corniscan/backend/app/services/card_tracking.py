@@ -0,0 +1,77 @@
+"""
+card_tracking.py — Suivi temporel de la carte entre frames live (Story 3.2)
+
+En cadrage, la carte bouge à peine entre deux frames à 500 ms d'intervalle :
+inutile de relancer Canny + findContours sur toute l'image à chaque fois.
+
+  - TrackingState : dernier quad carte accepté pour un flux caméra ; fournit la
+    fenêtre de recherche (roi) de la frame suivante
+  - Recherche plein cadre forcée toutes les `refresh_every` frames suivies
+    (une seconde carte entrée dans le champ, dérive du suivi)
+  - CardTrackerRegistry : un état par session POST /detect-card, expiré après
+    `ttl_seconds` sans frame (purge à chaque accès, aucune tâche de fond)
+
+Seul le quad normalisé est conservé — jamais d'image (NFR-S4).
+Les deux classes ne sont utilisées que depuis la boucle asyncio : aucun verrou.
+"""
+
+import time
+
+from app.core.config import settings
+
+
+class TrackingState:
+    """État de suivi d'un flux caméra : dernier quad accepté + compteur de rafraîchissement."""
+
+    def __init__(self, refresh_every: int) -> None:
+        self.refresh_every = refresh_every
+        self.quad: list[list[float]] | None = None
+        self._tracked_frames = 0
+
+    def roi_hint(self) -> list[list[float]] | None:
+        """Quad à passer au détecteur pour la prochaine frame, None → recherche plein cadre."""
+        if self.quad is None or self._tracked_frames >= self.refresh_every:
+            return None
+        return self.quad
+
+    def update(self, quad: list[list[float]] | None, used_roi: bool) -> None:
+        """Enregistre le résultat d'une frame (quad normalisé ou None si carte absente)."""
+        self.quad = quad
+        self._tracked_frames = self._tracked_frames + 1 if used_roi else 0
+
+
+class CardTrackerRegistry:
+    """États de suivi par session, expirés après `ttl_seconds` d'inactivité."""
+
+    def __init__(self, ttl_seconds: float, refresh_every: int, clock=time.monotonic) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.refresh_every = refresh_every
+        self._clock = clock
+        # session → (dernier accès, état)
+        self._states: dict[str, tuple[float, TrackingState]] = {}
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def get(self, session: str) -> TrackingState:
+        """État de la session (créé si absent ou expiré) ; purge les sessions inactives."""
+        now = self._clock()
+        self._purge(now)
+        entry = self._states.get(session)
+        state = entry[1] if entry is not None else TrackingState(self.refresh_every)
+        self._states[session] = (now, state)
+        return state
+
+    def clear(self) -> None:
+        self._states.clear()
+
+    def _purge(self, now: float) -> None:
+        expired = [key for key, (seen, _) in self._states.items() if now - seen > self.ttl_seconds]
+        for key in expired:
+            del self._states[key]
+
+
+card_trackers = CardTrackerRegistry(
+    ttl_seconds=settings.card_tracking_ttl_seconds,
+    refresh_every=settings.card_tracking_refresh_frames,
+)
@@ -0,0 +1,201 @@
+"""
+contour_geometry.py — Compression des contours à tolérance (mm) pour la sortie DXF
+
+Un contour détecté (ou lu dans un PDF vectoriel) arrive en polyligne dense :
+les joints ronds donnaient soit des polygones grossiers (approxPolyDP à 1 %
+du périmètre), soit des centaines de sommets — DXF lourd, post-processeur CNC
+lent. Ici, dans le repère mm du DXF :
+
+  - compress_closed() : suites de sommets remplacées par un segment droit ou
+    un arc (bulge LWPOLYLINE) tant que l'écart reste sous la tolérance ;
+    recherche exponentielle puis dichotomique de la plus longue suite
+  - compress_hole() : trou rond → cercle (entité CIRCLE), sinon comme
+    compress_closed()
+
+Écart mesuré aux sommets et aux milieux d'arêtes de la polyligne d'entrée
+(aux sommets seuls pour le cercle).
+Arcs limités à 180° (|bulge| ≤ 1), ajustés par moindres carrés avec centre
+sur la médiatrice de la corde — les extrémités restent des sommets d'entrée.
+"""
+
+import numpy as np
+
+# Arc : au moins 2 sommets intermédiaires (sinon n'importe quel coin s'arrondit)
+_MIN_ARC_INNER = 2
+# Cercle : au moins 8 sommets (un carré ou un hexagone n'est pas un trou rond)
+_MIN_CIRCLE_VERTICES = 8
+# Changement de direction (rad) au-delà duquel un sommet est un coin net
+_SHARP_CORNER = np.pi / 6
+
+
+def _segment_deviation(a: np.ndarray, b: np.ndarray, probes: np.ndarray) -> float:
+    """Distance max des points au segment [a, b]."""
+    ab = b - a
+    offset = probes - a
+    t = np.minimum(np.maximum(offset @ ab / max(float(ab @ ab), 1e-24), 0.0), 1.0)
+    offset -= t[:, None] * ab
+    return float(np.sqrt(np.einsum("ij,ij->i", offset, offset).max()))
+
+
+def _arc_fit(
+    a: np.ndarray, b: np.ndarray, inner: np.ndarray, probes: np.ndarray, tolerance: float,
+) -> tuple[float, float] | None:
+    """Arc de a à b ajusté sur inner : (bulge, écart max sur probes), None si aucun arc ≤ 180° ne convient."""
+    chord = b - a
+    half = float(np.sqrt(chord @ chord)) / 2.0
+    if half < 1e-12:
+        return None
+    normal = np.array([-chord[1], chord[0]]) / (2.0 * half)
+    offset = inner - a
+    # Distance signée à la corde : les points à plus de tolerance doivent tous
+    # être du même côté (les autres, bruit près des extrémités, sont libres)
+    lhs = offset @ normal
+    low, high = float(lhs.min()), float(lhs.max())
+    if high > tolerance and low >= -tolerance:
+        side = 1.0  # arc à gauche de a → b
+    elif low < -tolerance and high <= tolerance:
+        side = -1.0
+    else:
+        return None
+
+    # Centre m + s·n : |p - c|² - |a - c|² = (p - a)·(p - b) - 2s (p - a)·n est
+    # linéaire en s → moindres carrés fermés
+    lhs *= 2.0
+    rhs = np.einsum("ij,ij->i", offset, inner - b)
+    s = float(lhs @ rhs) / float(lhs @ lhs)
+    radius = float(np.hypot(half, s))
+    sagitta = radius + side * s
+    if sagitta > half:
+        return None  # > 180°
+
+    rel = probes - ((a + b) / 2.0 + s * normal)
+    deviation = float(np.abs(np.sqrt(np.einsum("ij,ij->i", rel, rel)) - radius).max())
+    # Bulge > 0 : arc anti-horaire, qui s'écarte à droite de la corde
+    return -side * sagitta / half, deviation
+
+
+def _fit_run(ring: np.ndarray, samples: np.ndarray, i: int, j: int, tolerance: float) -> tuple[float, float] | None:
+    """Sommets i..j remplacés par un segment (bulge 0) ou un arc : (bulge, écart), None si hors tolérance.
+
+    samples : sommets et milieux d'arêtes entrelacés — ceux de la suite i..j
+    forment la tranche [2i + 1, 2j).
+    """
+    a, b = ring[i], ring[j]
+    probes = samples[2 * i + 1:2 * j]
+    deviation = _segment_deviation(a, b, probes)
+    if deviation <= tolerance:
+        return 0.0, deviation
+    if j - i - 1 < _MIN_ARC_INNER:
+        return None
+    fit = _arc_fit(a, b, ring[i + 1:j], probes, tolerance)
+    if fit is None or fit[1] > tolerance:
+        return None
+    return fit
+
+
+def _longest_run(ring: np.ndarray, samples: np.ndarray, i: int, end: int, tolerance: float) -> tuple[int, float, float]:
+    """Plus longue suite i..j (j ≤ end) compressible : (j, bulge, écart). Segment d'origine à défaut."""
+    best = (i + 1, 0.0, 0.0)
+    failed = end + 1
+    span = _MIN_ARC_INNER + 1
+    # Recherche exponentielle de la longueur, puis dichotomie entre dernier succès et premier échec
+    while i + span <= end:
+        fit = _fit_run(ring, samples, i, i + span, tolerance)
+        if fit is None:
+            failed = i + span
+            break
+        best = (i + span, *fit)
+        span *= 2
+    else:
+        if best[0] < end:
+            fit = _fit_run(ring, samples, i, end, tolerance)
+            if fit is not None:
+                return (end, *fit)
+            failed = end
+    lo, hi = best[0], failed
+    while hi - lo > 1:
+        j = (lo + hi) // 2
+        fit = _fit_run(ring, samples, i, j, tolerance)
+        if fit is None:
+            hi = j
+        else:
+            lo, best = j, (j, *fit)
+    return best
+
+
+def compress_closed(points: np.ndarray, tolerance: float) -> tuple[np.ndarray, np.ndarray, float]:
+    """Compresse une polyligne fermée en segments et arcs à tolerance près.
+
+    Args:
+        points: sommets (N, 2), repère métrique (mm), sans répéter le premier.
+        tolerance: écart max toléré, même unité.
+
+    Returns:
+        (sommets (M, 2), bulges (M,) — bulge du segment qui part de chaque
+        sommet, écart max mesuré)
+    """
+    pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    n = len(pts)
+    if n < 4 or tolerance <= 0:
+        return pts, np.zeros(n), 0.0
+
+    # Départ sur le coin le plus marqué : un arc ne peut pas le chevaucher
+    incoming = pts - np.roll(pts, 1, axis=0)
+    outgoing = np.roll(pts, -1, axis=0) - pts
+    turn = np.abs(np.arctan2(
+        incoming[:, 0] * outgoing[:, 1] - incoming[:, 1] * outgoing[:, 0], (incoming * outgoing).sum(axis=1),
+    ))
+    start = int(np.argmax(turn))
+    kept, bulges, max_deviation = _compress_from(pts, start, tolerance)
+    if turn[start] < _SHARP_CORNER and len(kept) > 1:
+        # Contour sans coin net : le départ tombe au milieu d'un arc, qu'il coupe
+        # en deux — seconde passe depuis la première rupture trouvée
+        kept, bulges, max_deviation = _compress_from(pts, int(kept[1]), tolerance)
+    return pts[kept], bulges, max_deviation
+
+
+def _compress_from(pts: np.ndarray, start: int, tolerance: float) -> tuple[np.ndarray, np.ndarray, float]:
+    """Passe gloutonne depuis start : (indices des sommets gardés dans pts, bulges, écart max)."""
+    n = len(pts)
+    ring = np.vstack((np.roll(pts, -start, axis=0), pts[start:start + 1]))
+    samples = np.empty((2 * n + 1, 2))
+    samples[0::2] = ring
+    samples[1::2] = (ring[:-1] + ring[1:]) / 2.0
+
+    kept, bulges, max_deviation = [], [], 0.0
+    i = 0
+    while i < n:
+        j, bulge, deviation = _longest_run(ring, samples, i, n, tolerance)
+        kept.append(i)
+        bulges.append(bulge)
+        max_deviation = max(max_deviation, deviation)
+        i = j
+    return (np.array(kept) + start) % n, np.array(bulges), max_deviation
+
+
+def fit_circle(points: np.ndarray) -> tuple[np.ndarray, float]:
+    """Cercle des moindres carrés algébriques (Kåsa) : (centre, rayon)."""
+    pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    origin = pts.mean(axis=0)
+    local = pts - origin  # centré : conditionnement du système
+    system = np.column_stack((2.0 * local, np.ones(len(local))))
+    (cx, cy, c), *_ = np.linalg.lstsq(system, (local * local).sum(axis=1), rcond=None)
+    return origin + (cx, cy), float(np.sqrt(max(c + cx * cx + cy * cy, 0.0)))
+
+
+def compress_hole(points: np.ndarray, tolerance: float) -> dict:
+    """Trou : cercle s'il est rond à tolerance près, sinon polyligne compressée.
+
+    Returns:
+        {"circle": (centre, rayon), "deviation": float}
+        ou {"vertices": (M, 2), "bulges": (M,), "deviation": float}
+    """
+    pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    if len(pts) >= _MIN_CIRCLE_VERTICES and tolerance > 0:
+        center, radius = fit_circle(pts)
+        # Sommets seuls : les cordes d'approxPolyDP ont déjà consommé leur part de la tolérance
+        deviation = float(np.abs(np.hypot(*(pts - center).T) - radius).max())
+        if deviation <= tolerance:
+            return {"circle": (center, radius), "deviation": deviation}
+    vertices, bulges, deviation = compress_closed(pts, tolerance)
+    return {"vertices": vertices, "bulges": bulges, "deviation": deviation}
@@ -3,6 +3,15 @@
 Produit un fichier DXF R2018 avec une LWPOLYLINE fermée représentant le contour
 du joint à l'échelle 1:1 en millimètres. Le fichier reste en mémoire (bytes) —
 aucun fichier n'est écrit sur le disque serveur.
+
+Contours compressés à tolérance (contour_geometry) : arcs en bulges de
+LWPOLYLINE, trous ronds en entités CIRCLE.
+
+Le squelette R2018 (header, tables, blocs, objets) est produit une seule fois
+par processus avec ezdxf, puis découpé autour de la section ENTITIES : chaque
+requête n'écrit que ses entités (conversion mm vectorisée NumPy, formatage
+en un seul %) entre les deux moitiés, directement en bytes. ezdxf.new()
+construisait auparavant tout le document à chaque soumission.
 """
 
 import io
@@ -10,80 +19,184 @@ import io
 import ezdxf
 import numpy as np
 
+from app.core.config import settings
+from app.core.timing import stage
+from app.services.contour_geometry import compress_closed, compress_hole
+
 # Unité DXF 4 = millimètres (standard DXF InsUnits)
 _DXF_UNITS_MM = 4
 
+# LWPOLYLINE code 70 : bit 1 = fermée (NFR-I2)
+_CLOSED = 1
+
+# Un sommet : 10 = X, 20 = Y (mm, 6 décimales = nanomètre), 42 = bulge du segment suivant
+_VERTEX = " 10\n%.6f\n 20\n%.6f\n"
+_ARC_VERTEX = " 10\n%.6f\n 20\n%.6f\n 42\n%.6f\n"
+
+
+class _R2018Template:
+    """Document R2018 vide ($INSUNITS = mm) pré-écrit, découpé autour des entités du modelspace.
+
+    head : texte jusqu'à la valeur de $HANDSEED ; body : suite du document
+    jusqu'au début de la section ENTITIES ; end : fin de ENTITIES et
+    sections suivantes. Les entités ajoutées reçoivent les handles à partir de
+    handseed, et $HANDSEED est réécrit après elles.
+    """
+
+    def __init__(self) -> None:
+        doc = ezdxf.new("R2018")
+        doc.header["$INSUNITS"] = _DXF_UNITS_MM
+        # Validation unique du squelette (NFR-I1) : chaque DXF en hérite
+        if doc.header.get("$INSUNITS") != _DXF_UNITS_MM:
+            raise ValueError("Les unités DXF ne sont pas configurées en mm.")
+        self.owner = doc.modelspace().layout_key
+
+        stream = io.StringIO()
+        doc.write(stream)
+        text = stream.getvalue()
+
+        seed_key = "  9\n$HANDSEED\n  5\n"
+        seed_start = text.index(seed_key) + len(seed_key)
+        seed_end = text.index("\n", seed_start)
+        entities = text.index("  2\nENTITIES\n", seed_end) + len("  2\nENTITIES\n")
+
+        self.handseed = int(text[seed_start:seed_end], 16)
+        self.head = text[:seed_start].encode("utf-8")
+        self.body = text[seed_end:entities].encode("utf-8")
+        self.end = text[entities:].encode("utf-8")
+
+
+_TEMPLATE = _R2018Template()
+
+
+def _entity(kind: str, subclass: str, handle: int, owner: str) -> str:
+    return f"  0\n{kind}\n  5\n{handle:X}\n330\n{owner}\n100\nAcDbEntity\n  8\n0\n100\n{subclass}\n"
+
+
+def _lwpolyline(points_mm: np.ndarray, bulges: np.ndarray, handle: int, owner: str) -> bytes:
+    """LWPOLYLINE fermée (groupe DXF R2018) — sommets formatés en un seul appel C."""
+    header = _entity("LWPOLYLINE", "AcDbPolyline", handle, owner) + f" 90\n{len(points_mm)}\n 70\n{_CLOSED}\n"
+    arcs = bulges != 0.0
+    if not arcs.any():
+        vertices = (_VERTEX * len(points_mm)) % tuple(points_mm.ravel().tolist())
+    else:
+        # Code 42 sur les seuls sommets qui ouvrent un arc
+        values = np.column_stack((points_mm, bulges))
+        mask = np.column_stack((np.ones((len(arcs), 2), dtype=bool), arcs))
+        formats = np.where(arcs, _ARC_VERTEX, _VERTEX)
+        vertices = "".join(formats.tolist()) % tuple(values[mask].tolist())
+    return (header + vertices).encode("ascii")
+
+
+def _circle(center_mm: np.ndarray, radius_mm: float, handle: int, owner: str) -> bytes:
+    return (
+        _entity("CIRCLE", "AcDbCircle", handle, owner)
+        + " 10\n%.6f\n 20\n%.6f\n 30\n0.0\n 40\n%.6f\n" % (center_mm[0], center_mm[1], radius_mm)
+    ).encode("ascii")
+
 
 def generate_dxf(
     contour_points: list[list[float]],
     width_mm: float,
     height_mm: float,
     holes: list[dict] | None = None,
+    tolerance_mm: float | None = None,
 ) -> bytes:
     """Génère un fichier DXF R2018 avec le contour du joint (Story 5.1 — FR25).
 
+    Voir generate_dxf_report() — même DXF, sans le rapport de compression.
+    """
+    return generate_dxf_report(contour_points, width_mm, height_mm, holes, tolerance_mm)[0]
+
+
+def generate_dxf_report(
+    contour_points: list[list[float]],
+    width_mm: float,
+    height_mm: float,
+    holes: list[dict] | None = None,
+    tolerance_mm: float | None = None,
+) -> tuple[bytes, dict]:
+    """Génère le DXF R2018 du joint et rend compte de la compression du contour.
+
     Les coordonnées normalisées [0,1] sont converties en mm réels en utilisant
-    la boîte englobante du contour mise à l'échelle width_mm × height_mm.
+    la boîte englobante du contour mise à l'échelle width_mm × height_mm, puis
+    compressées à tolerance_mm près (arcs, cercles).
 
     Args:
         contour_points: Points du contour normalisés [[x, y], ...] avec x,y ∈ [0,1].
         width_mm: Largeur du joint en mm (FR15).
         height_mm: Hauteur du joint en mm (FR15).
+        holes: Trous internes [{"contour_points": [[x, y], ...]}, ...], même repère.
+        tolerance_mm: écart max toléré par la compression (défaut : moitié de
+            CONTOUR_TOLERANCE_MM, l'autre moitié allant à la simplification du
+            contour détecté) ; 0 = polylignes écrites telles quelles.
 
     Returns:
-        Bytes du fichier DXF (ASCII, encodage UTF-8).
+        (bytes du fichier DXF (ASCII, encodage UTF-8), rapport :
+        {"vertices_in", "vertices_out", "arcs", "circles", "max_deviation_mm",
+        "tolerance_mm", "dxf_bytes"})
 
     Raises:
-        ValueError: Si le contour a moins de 3 points, ou si la validation
-                    DXF échoue (LWPOLYLINE non fermée ou unités incorrectes).
+        ValueError: Si le contour a moins de 3 points.
     """
-    pts = np.array(contour_points, dtype=float)
+    if tolerance_mm is None:
+        tolerance_mm = settings.contour_tolerance_mm / 2.0
+    pts = np.asarray(contour_points, dtype=np.float64).reshape(-1, 2)
 
     if len(pts) < 3:
         raise ValueError("Le contour doit contenir au moins 3 points.")
 
     # Convertir les coordonnées normalisées en mm
     # La boîte englobante du contour est mise à l'échelle width_mm × height_mm
-    x_min, y_min = pts[:, 0].min(), pts[:, 1].min()
-    x_max, y_max = pts[:, 0].max(), pts[:, 1].max()
-    x_range = (x_max - x_min) if (x_max - x_min) > 1e-9 else 1.0
-    y_range = (y_max - y_min) if (y_max - y_min) > 1e-9 else 1.0
-
-    pts_mm = [
-        ((pt[0] - x_min) / x_range * width_mm, (pt[1] - y_min) / y_range * height_mm)
-        for pt in pts
-    ]
-
-    # Créer le document DXF R2018
-    doc = ezdxf.new("R2018")
-
-    # Configurer les unités en mm (NFR-I1)
-    doc.header["$INSUNITS"] = _DXF_UNITS_MM
-
-    msp = doc.modelspace()
-    polyline = msp.add_lwpolyline(pts_mm)
-    polyline.closed = True
-
-    # Trous internes — même transform coordonnées que le contour principal
-    if holes:
-        for hole in holes:
-            h_pts = np.array(hole.get("contour_points", []), dtype=float)
-            if len(h_pts) < 3:
-                continue
-            hole_mm = [
-                ((pt[0] - x_min) / x_range * width_mm, (pt[1] - y_min) / y_range * height_mm)
-                for pt in h_pts
-            ]
-            h_poly = msp.add_lwpolyline(hole_mm)
-            h_poly.closed = True
-
-    # Validation avant export (NFR-I2)
-    if not polyline.is_closed:
-        raise ValueError("La LWPOLYLINE générée n'est pas fermée.")
-    if doc.header.get("$INSUNITS") != _DXF_UNITS_MM:
-        raise ValueError("Les unités DXF ne sont pas configurées en mm.")
+    with stage("dxf_convert"):
+        origin = pts.min(axis=0)
+        extent = pts.max(axis=0) - origin
+        extent[extent <= 1e-9] = 1.0
+        scale = np.array([width_mm, height_mm]) / extent
+
+        outline = (pts - origin) * scale
+        # Trous internes — même transform coordonnées que le contour principal
+        hole_outlines = []
+        for hole in holes or ():
+            h_pts = np.asarray(hole.get("contour_points", []), dtype=np.float64).reshape(-1, 2)
+            if len(h_pts) >= 3:
+                hole_outlines.append((h_pts - origin) * scale)
+
+    # Compression à tolérance : arcs (bulges), trous ronds → CIRCLE
+    with stage("dxf_compress"):
+        vertices, bulges, max_deviation = compress_closed(outline, tolerance_mm)
+        polylines = [(vertices, bulges)]
+        circles = []
+        for hole_mm in hole_outlines:
+            compressed = compress_hole(hole_mm, tolerance_mm)
+            max_deviation = max(max_deviation, compressed["deviation"])
+            if "circle" in compressed:
+                circles.append(compressed["circle"])
+            else:
+                polylines.append((compressed["vertices"], compressed["bulges"]))
 
     # Export en bytes (NFR-S4 — pas de fichier disque)
-    stream = io.StringIO()
-    doc.write(stream)
-    return stream.getvalue().encode("utf-8")
+    with stage("dxf_write"):
+        template = _TEMPLATE
+        handle = template.handseed
+        entities = []
+        for polygon, polygon_bulges in polylines:
+            entities.append(_lwpolyline(polygon, polygon_bulges, handle, template.owner))
+            handle += 1
+        for center, radius in circles:
+            entities.append(_circle(center, radius, handle, template.owner))
+            handle += 1
+        dxf_bytes = b"".join((
+            template.head, f"{handle:X}".encode("ascii"), template.body, *entities, template.end,
+        ))
+
+    report = {
+        "vertices_in": len(outline) + sum(len(h) for h in hole_outlines),
+        "vertices_out": sum(len(polygon) for polygon, _ in polylines),
+        "arcs": int(sum(np.count_nonzero(b) for _, b in polylines)),
+        "circles": len(circles),
+        "max_deviation_mm": round(max_deviation, 4),
+        "tolerance_mm": tolerance_mm,
+        "dxf_bytes": len(dxf_bytes),
+    }
+    return dxf_bytes, report
@@ -0,0 +1,154 @@
+"""
+image_decoder.py — Décodage à résolution réduite piloté par l'en-tête
+
+Le pipeline vision travaille à _MAX_PROCESSING_WIDTH (2048 px). Décoder une
+photo 48 MP en pleine résolution pour la réduire aussitôt par INTER_AREA
+coûte l'essentiel du CPU et de la mémoire d'une requête.
+
+  1. Lit les dimensions dans l'en-tête (JPEG : marqueur SOFn, PNG : chunk IHDR)
+     sans décoder un seul pixel
+  2. Choisit le flag IMREAD_REDUCED_*_2/4/8 le plus agressif qui garde l'image
+     décodée au-dessus de la largeur cible — libjpeg réduit directement dans
+     le domaine DCT (8064 × 6048 → 4032 × 3024 sans jamais allouer 48 MP)
+  3. Retourne le facteur d'échelle exact (pixels décodés / pixels originaux)
+     et les dimensions originales pour que les coordonnées normalisées
+     restent exactes
+
+PNG : OpenCV décode toujours le PNG en entier puis le redimensionne avec
+arrondi par défaut (mapping inexact) — on lit l'en-tête mais on décode en
+pleine résolution, _resize_for_processing() s'occupe de la réduction.
+"""
+
+import struct
+
+import numpy as np
+import cv2
+
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Marqueurs SOFn porteurs des dimensions (hors DHT=C4, JPG=C8, DAC=CC)
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+# Marqueurs autonomes (sans champ longueur) : TEM, RSTn, SOI
+_JPEG_STANDALONE_MARKERS = frozenset(range(0xD0, 0xD9)) | {0x01}
+
+# Dénominateur → (flag couleur, flag niveaux de gris), du plus agressif au moins agressif
+_REDUCED_FLAGS = {
+    8: (cv2.IMREAD_REDUCED_COLOR_8, cv2.IMREAD_REDUCED_GRAYSCALE_8),
+    4: (cv2.IMREAD_REDUCED_COLOR_4, cv2.IMREAD_REDUCED_GRAYSCALE_4),
+    2: (cv2.IMREAD_REDUCED_COLOR_2, cv2.IMREAD_REDUCED_GRAYSCALE_2),
+}
+
+
+def _jpeg_size(data: memoryview) -> tuple[int, int] | None:
+    """Parcourt les segments JPEG jusqu'au premier SOFn et lit (largeur, hauteur)."""
+    n = len(data)
+    pos = 2  # après SOI (FF D8)
+    while pos + 4 <= n:
+        if data[pos] != 0xFF:
+            return None
+        marker = data[pos + 1]
+        if marker == 0xFF:  # octets de remplissage autorisés entre segments
+            pos += 1
+            continue
+        if marker in _JPEG_STANDALONE_MARKERS:
+            pos += 2
+            continue
+        (seg_len,) = struct.unpack(">H", data[pos + 2:pos + 4])
+        if marker in _JPEG_SOF_MARKERS:
+            if pos + 9 > n:
+                return None
+            height, width = struct.unpack(">HH", data[pos + 5:pos + 9])
+            return (width, height) if width and height else None
+        if marker == 0xDA:  # SOS sans SOF préalable : flux invalide
+            return None
+        pos += 2 + seg_len
+    return None
+
+
+def read_image_size(image_bytes) -> tuple[int, int] | None:
+    """Lit (largeur, hauteur) dans l'en-tête JPEG ou PNG sans décoder l'image.
+
+    Les dimensions sont celles stockées dans le fichier, avant application de
+    l'orientation EXIF.
+
+    Returns:
+        (width, height) ou None si le format n'est pas reconnu / l'en-tête est tronqué.
+    """
+    data = memoryview(image_bytes).cast("B")
+    if len(data) >= 24 and data[:8] == _PNG_SIGNATURE and data[12:16] == b"IHDR":
+        width, height = struct.unpack(">II", data[16:24])
+        return (width, height) if width and height else None
+    if len(data) >= 4 and data[0] == 0xFF and data[1] == 0xD8:
+        return _jpeg_size(data)
+    return None
+
+
+def _is_jpeg(image_bytes) -> bool:
+    data = memoryview(image_bytes).cast("B")
+    return len(data) >= 2 and data[0] == 0xFF and data[1] == 0xD8
+
+
+def choose_reduction(width: int, height: int, target_width: int) -> int:
+    """Plus grand dénominateur d ∈ {8, 4, 2} tel que min(w, h) / d ≥ target_width.
+
+    On raisonne sur le plus petit côté : l'orientation EXIF peut échanger
+    largeur et hauteur au décodage, et l'image décodée ne doit jamais tomber
+    sous la largeur cible quelle que soit l'orientation.
+
+    Returns:
+        Dénominateur de réduction (1 = pleine résolution).
+    """
+    short_side = min(width, height)
+    for denom in _REDUCED_FLAGS:
+        if short_side // denom >= target_width:
+            return denom
+    return 1
+
+
+def decode_image(
+    image_bytes,
+    target_width: int | None = None,
+    grayscale: bool = False,
+) -> tuple[np.ndarray | None, float, tuple[int, int]]:
+    """Décode un JPEG/PNG en réduisant dès le décodage si la cible le permet.
+
+    Args:
+        image_bytes: contenu brut du fichier (bytes ou buffer compatible).
+        target_width: largeur minimale souhaitée après décodage.
+                      None → décodage pleine résolution.
+        grayscale: décode directement en niveaux de gris (1 canal).
+
+    Returns:
+        (image | None, scale, (orig_w, orig_h))
+        scale = pixels décodés par pixel original (1/d en cas de réduction).
+        Un point (x, y) de l'image décodée vaut (x / scale, y / scale) dans l'originale.
+        image = None si le contenu ne peut pas être décodé.
+    """
+    arr = np.frombuffer(image_bytes, dtype=np.uint8)
+    full_flag = cv2.IMREAD_GRAYSCALE if grayscale else cv2.IMREAD_COLOR
+
+    size = read_image_size(image_bytes) if target_width else None
+    denom = 1
+    if size is not None and _is_jpeg(image_bytes):
+        denom = choose_reduction(size[0], size[1], target_width)
+
+    if denom > 1:
+        color_flag, gray_flag = _REDUCED_FLAGS[denom]
+        img = cv2.imdecode(arr, gray_flag if grayscale else color_flag)
+    else:
+        img = cv2.imdecode(arr, full_flag)
+
+    if img is None:
+        return None, 1.0, (0, 0)
+
+    dec_h, dec_w = img.shape[:2]
+    if denom == 1 or size is None:
+        return img, 1.0, (dec_w, dec_h)
+
+    # Orientation EXIF appliquée au décodage : l'en-tête peut être transposé
+    orig_w, orig_h = size
+    if orig_w != orig_h and (orig_w > orig_h) != (dec_w > dec_h):
+        orig_w, orig_h = orig_h, orig_w
+    return img, 1.0 / denom, (orig_w, orig_h)
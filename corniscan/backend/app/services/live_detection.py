@@ -0,0 +1,165 @@
+"""
+live_detection.py — Détection carte live (flux caméra, toutes les 500 ms)
+
+Chemin rapide dédié à POST /api/v1/scan/detect-card :
+  1. Décode directement en niveaux de gris, à résolution réduite (IMREAD_REDUCED_GRAYSCALE_*)
+     — ni image BGR 3 canaux, ni cvtColor
+  2. Resize / flou / Canny écrits dans des buffers préalloués par worker (dst=)
+     — les frames d'un même flux caméra ont toutes la même taille
+  3. Même filtre quadrilatère que detect_card() (card_candidates)
+  4. Suivi temporel : si la frame précédente a trouvé la carte (roi=quad), la
+     recherche se limite d'abord à une fenêtre élargie autour de ce quad ;
+     recherche plein cadre seulement si la carte n'y est plus (card_tracking)
+
+Contrat identique à detect_card() : {"card_detected": bool, "confidence": float},
+plus "quad" (coins normalisés | None) et "roi" (bool) à l'usage du suivi.
+"""
+
+import threading
+
+import numpy as np
+import cv2
+
+from app.core.timing import stage
+from app.services.card_candidates import best_card_quad
+from app.services.image_decoder import decode_image
+from app.services.vision_service import _MAX_PROCESSING_WIDTH, _canny_auto
+
+# Marge autour du quad de la frame précédente (fraction de son plus grand côté)
+_ROI_PADDING = 0.25
+
+
+class LiveCardDetector:
+    """Détecteur carte live avec buffers de travail réutilisés d'une frame à l'autre.
+
+    Une instance n'est pas thread-safe : utiliser get_live_detector() qui en
+    fournit une par thread (worker).
+    """
+
+    def __init__(self) -> None:
+        self._buffers: dict[str, np.ndarray] = {}
+
+    def _buffer(self, name: str, shape: tuple[int, ...]) -> np.ndarray:
+        """Retourne le buffer `name` à la forme demandée (réalloué seulement si elle change)."""
+        buf = self._buffers.get(name)
+        if buf is None or buf.shape != shape:
+            buf = np.empty(shape, dtype=np.uint8)
+            self._buffers[name] = buf
+        return buf
+
+    def _search(
+        self,
+        gray: np.ndarray,
+        image_area: int,
+        offset: tuple[int, int] = (0, 0),
+    ) -> tuple[float, np.ndarray | None]:
+        """Flou + Canny + contours sur `gray` (frame entière ou fenêtre ROI).
+
+        Les buffers sont dimensionnés à la frame entière ; une fenêtre ROI y
+        écrit dans une sous-vue, sans réallocation quand sa taille varie.
+        """
+        rh, rw = gray.shape
+        blurred = self._buffer("blurred", self._frame_shape)[:rh, :rw]
+        edges = self._buffer("edges", self._frame_shape)[:rh, :rw]
+        blurred = cv2.GaussianBlur(gray, (5, 5), 0, dst=blurred)
+        edges = _canny_auto(blurred, sigma=0.33, edges=edges)
+
+        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE, offset=offset)
+        return best_card_quad(contours, image_area)
+
+    def detect(self, image_bytes, roi: list[list[float]] | None = None) -> dict:
+        """Détecte une carte bancaire dans la frame JPEG fournie.
+
+        Args:
+            image_bytes: contenu brut de la frame JPEG.
+            roi: quad carte normalisé de la frame précédente — recherche d'abord
+                 dans une fenêtre élargie autour de lui.
+
+        Returns:
+            {"card_detected": bool, "confidence": float,
+             "quad": list[list[float]] | None, "roi": bool}
+        """
+        with stage("decode"):
+            gray, _, _ = decode_image(image_bytes, _MAX_PROCESSING_WIDTH, grayscale=True)
+        if gray is None:
+            return {"card_detected": False, "confidence": 0.0, "quad": None, "roi": False}
+
+        # Reliquat de normalisation après décodage réduit
+        h, w = gray.shape
+        if w > _MAX_PROCESSING_WIDTH:
+            scale = _MAX_PROCESSING_WIDTH / w
+            size = (_MAX_PROCESSING_WIDTH, max(1, round(h * scale)))
+            gray = cv2.resize(
+                gray, size, dst=self._buffer("resized", (size[1], size[0])),
+                interpolation=cv2.INTER_AREA,
+            )
+
+        self._frame_shape = gray.shape
+        h, w = gray.shape
+        image_area = h * w
+
+        window = _roi_window(roi, w, h) if roi is not None else None
+        if window is not None:
+            x0, y0, x1, y1 = window
+            with stage("card_roi"):
+                confidence, quad = self._search(gray[y0:y1, x0:x1], image_area, offset=(x0, y0))
+            if quad is not None:
+                return _result(confidence, quad, w, h, used_roi=True)
+
+        with stage("card"):
+            confidence, quad = self._search(gray, image_area)
+        return _result(confidence, quad, w, h, used_roi=False)
+
+
+def _roi_window(roi: list[list[float]], w: int, h: int) -> tuple[int, int, int, int] | None:
+    """Fenêtre (x0, y0, x1, y1) en px autour du quad normalisé, élargie de _ROI_PADDING.
+
+    Returns:
+        None si le quad est invalide ou si la fenêtre couvre toute la frame.
+    """
+    try:
+        pts = np.asarray(roi, dtype=np.float32).reshape(4, 2) * np.array([w, h], dtype=np.float32)
+    except (TypeError, ValueError):
+        return None
+    if not np.all(np.isfinite(pts)):
+        return None
+    (x0, y0), (x1, y1) = pts.min(axis=0), pts.max(axis=0)
+    pad = _ROI_PADDING * max(x1 - x0, y1 - y0)
+    x0, y0 = max(0, int(x0 - pad)), max(0, int(y0 - pad))
+    x1, y1 = min(w, int(np.ceil(x1 + pad))), min(h, int(np.ceil(y1 + pad)))
+    if x1 - x0 < 8 or y1 - y0 < 8 or (x1 - x0) * (y1 - y0) >= w * h:
+        return None
+    return x0, y0, x1, y1
+
+
+def _result(confidence: float, quad: np.ndarray | None, w: int, h: int, used_roi: bool) -> dict:
+    quad_norm = None
+    if quad is not None:
+        quad_norm = (quad.astype(np.float32) / np.array([w, h], dtype=np.float32)).round(4).tolist()
+    return {
+        "card_detected": quad is not None,
+        "confidence": round(confidence, 3),
+        "quad": quad_norm,
+        "roi": used_roi,
+    }
+
+
+_local = threading.local()
+
+
+def get_live_detector() -> LiveCardDetector:
+    """Détecteur du thread courant (créé au premier appel)."""
+    detector = getattr(_local, "detector", None)
+    if detector is None:
+        detector = LiveCardDetector()
+        _local.detector = detector
+    return detector
+
+
+def detect_card_live(image_bytes, roi: list[list[float]] | None = None) -> dict:
+    """Détection carte live via le détecteur du worker courant.
+
+    Returns:
+        {"card_detected": bool, "confidence": float, "quad": list | None, "roi": bool}
+    """
+    return get_live_detector().detect(image_bytes, roi)
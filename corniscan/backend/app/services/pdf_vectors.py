@@ -0,0 +1,294 @@
+"""
+pdf_vectors.py — Analyse vectorielle des PDF (exports CAO)
+
+Les PDF exportés d'un logiciel de CAO contiennent déjà le contour du joint sous
+forme de tracés vectoriels. Plutôt que de les rastériser puis de retrouver un
+contour approché par Canny, analyse_pdf_vectors() lit les tracés d'une page
+(page.get_drawings()) :
+
+  1. Découpage en chemins fermés : segments, courbes de Bézier aplaties,
+     rectangles, quadrilatères (coordonnées de la page affichée, rotation incluse)
+  2. Fond et cadre de page écartés (rectangle englobant ≥ 80 % de la page)
+  3. Carte bancaire vectorielle (4 sommets, ratio 85.6 / 53.98 à 1 % près,
+     contenant un autre tracé) → étalonnage sur la carte ; sinon unités PDF
+     (1 pt = 25.4 / 72 mm — export CAO supposé à l'échelle 1:1) avec
+     calibration_warning, comme toute analyse sans carte de référence
+  4. Contour extérieur = plus grand chemin fermé restant ; trous = chemins
+     fermés qu'il contient directement
+  5. Sans carte, la page doit montrer un joint seul : pas d'image raster,
+     au plus _MAX_UNCALIBRATED_PATHS chemins, tous contenus dans le contour
+     extérieur, trous ne le pavant pas (grille de tableau) — sinon un
+     cartouche, un logo ou un tableau passerait pour le joint
+  6. Résultat au format de process_image() — coordonnées normalisées sur la
+     page, donc alignées sur le rendu pdf_to_array()
+
+Pas de chemin fermé exploitable, page dominée par une image raster (photo,
+scan) ou mise en page sans carte qui ne ressemble pas à un joint seul → None :
+l'appelant retombe sur l'analyse raster.
+"""
+
+import numpy as np
+import cv2
+import fitz  # pymupdf
+
+from app.services.card_candidates import _CARD_RATIO
+from app.services.vision_service import _CARD_W_MM, _card_geometry, _order_points, _pdf_page
+
+_PT_TO_MM = 25.4 / 72
+_CLOSE_EPS_PT = 0.1            # extrémités confondues → chemin fermé
+_BEZIER_STEPS = 16             # segments par courbe de Bézier aplatie (cercle : écart < 0,2 %)
+_PAGE_FRAME_FRACTION = 0.8     # rectangle englobant ≥ 80 % de la page → fond / cadre
+_RASTER_PAGE_FRACTION = 0.5    # image raster ≥ 50 % de la page → photo, analyse raster
+_CARD_RATIO_TOLERANCE = 0.01   # géométrie exacte : ±1 % (vs ±12 % en raster)
+_CARD_MIN_CONTENT = 0.1        # la carte porte un tracé d'au moins 10 % de sa surface
+_MIN_HOLE_FRACTION = 0.001     # trous < 0,1 % du contour extérieur ignorés
+_MAX_UNCALIBRATED_PATHS = 64   # sans carte : au-delà, plan ou mise en page, pas un joint seul
+_MAX_HOLE_COVER = 0.9          # sans carte : plusieurs trous pavant ≥ 90 % du contour → grille de tableau
+_DUPLICATE_EPS_PT = 0.5        # même tracé émis deux fois (remplissage + trait) : même rectangle englobant
+_DUPLICATE_AREA = 0.01         # … et même aire à 1 % près (un cercle inscrit dans son carré n'est pas un doublon)
+
+
+def _point(p) -> tuple[float, float]:
+    return (float(p.x), float(p.y))
+
+
+def _bezier(p0, p1, p2, p3) -> list[tuple[float, float]]:
+    """Courbe de Bézier cubique aplatie (_BEZIER_STEPS points, p0 exclu)."""
+    t = np.linspace(0.0, 1.0, _BEZIER_STEPS + 1)[1:, None]
+    ctrl = np.array([_point(p0), _point(p1), _point(p2), _point(p3)])
+    pts = ((1 - t) ** 3) * ctrl[0] + 3 * ((1 - t) ** 2) * t * ctrl[1] + 3 * (1 - t) * t ** 2 * ctrl[2] + t ** 3 * ctrl[3]
+    return [tuple(p) for p in pts]
+
+
+def _closed_paths(drawings: list[dict]) -> list[np.ndarray]:
+    """Chemins fermés (N×2 float64, en points PDF) des tracés de la page."""
+    paths: list[np.ndarray] = []
+
+    def flush(points: list, close_path: bool) -> None:
+        if len(points) < 3:
+            return
+        pts = np.array(points, dtype=np.float64)
+        if np.hypot(*(pts[0] - pts[-1])) <= _CLOSE_EPS_PT:
+            pts = pts[:-1]
+        elif not close_path:
+            return
+        if len(pts) >= 3:
+            paths.append(pts)
+
+    for drawing in drawings:
+        current: list[tuple[float, float]] = []
+        for item in drawing["items"]:
+            kind = item[0]
+            if kind == "re":
+                r = item[1]
+                paths.append(np.array([[r.x0, r.y0], [r.x1, r.y0], [r.x1, r.y1], [r.x0, r.y1]], dtype=np.float64))
+                continue
+            if kind == "qu":
+                q = item[1]
+                paths.append(np.array([_point(q.ul), _point(q.ur), _point(q.lr), _point(q.ll)], dtype=np.float64))
+                continue
+            start = _point(item[1])
+            # Point de départ disjoint → nouveau sous-chemin
+            if current and np.hypot(current[-1][0] - start[0], current[-1][1] - start[1]) > _CLOSE_EPS_PT:
+                flush(current, False)
+                current = []
+            if not current:
+                current.append(start)
+            if kind == "l":
+                current.append(_point(item[2]))
+            elif kind == "c":
+                current.extend(_bezier(*item[1:5]))
+        flush(current, bool(drawing.get("closePath")))
+    return paths
+
+
+def _to_displayed(paths: list[np.ndarray], page: fitz.Page) -> list[np.ndarray]:
+    """Coordonnées non tournées (get_drawings) → page affichée (telle que rastérisée)."""
+    if page.rotation == 0:
+        return paths
+    m = page.rotation_matrix
+    affine = np.array([[m.a, m.c], [m.b, m.d]], dtype=np.float64)
+    offset = np.array([m.e, m.f], dtype=np.float64)
+    return [pts @ affine.T + offset for pts in paths]
+
+
+def _area(pts: np.ndarray) -> float:
+    return float(cv2.contourArea(pts.astype(np.float32)))
+
+
+def _boxes(paths: list[np.ndarray]) -> np.ndarray:
+    """Rectangles englobants (N×4 : x0, y0, x1, y1) des chemins."""
+    return np.array([np.concatenate([pts.min(axis=0), pts.max(axis=0)]) for pts in paths]).reshape(-1, 4)
+
+
+def _inside(inner: np.ndarray, outer: np.ndarray) -> bool:
+    """Premier sommet de inner dans outer (bord compris).
+
+    Les tracés CAO ne se croisent pas : une fois les rectangles englobants
+    filtrés, un sommet suffit.
+    """
+    contour = outer.astype(np.float32).reshape(-1, 1, 2)
+    return cv2.pointPolygonTest(contour, (float(inner[0, 0]), float(inner[0, 1])), False) >= 0
+
+
+def _children(i: int, paths: list[np.ndarray], boxes: np.ndarray, candidates: np.ndarray) -> list[int]:
+    """Chemins candidats (masque booléen) contenus dans le chemin i.
+
+    Filtre vectorisé sur les rectangles englobants avant tout pointPolygonTest.
+    """
+    box = boxes[i]
+    within = (
+        candidates
+        & (boxes[:, :2] >= box[:2] - _CLOSE_EPS_PT).all(axis=1)
+        & (boxes[:, 2:] <= box[2:] + _CLOSE_EPS_PT).all(axis=1)
+    )
+    within[i] = False
+    return [int(j) for j in np.flatnonzero(within) if _inside(paths[j], paths[i])]
+
+
+def _has_parent(i: int, paths: list[np.ndarray], boxes: np.ndarray, candidates: np.ndarray) -> bool:
+    """Le chemin i est-il contenu dans l'un des chemins candidats ?"""
+    box = boxes[i]
+    around = (
+        candidates
+        & (boxes[:, :2] <= box[:2] + _CLOSE_EPS_PT).all(axis=1)
+        & (boxes[:, 2:] >= box[2:] - _CLOSE_EPS_PT).all(axis=1)
+    )
+    around[i] = False
+    return any(_inside(paths[i], paths[j]) for j in np.flatnonzero(around))
+
+
+def _min_rect(pts: np.ndarray) -> tuple[float, float]:
+    """(grand côté, petit côté) du rectangle d'aire minimale."""
+    (_, _), (w, h), _ = cv2.minAreaRect(pts.astype(np.float32))
+    return float(max(w, h)), float(min(w, h))
+
+
+def _dedupe(paths: list[np.ndarray]) -> list[np.ndarray]:
+    """Retire les tracés répétés (même rectangle englobant arrondi à _DUPLICATE_EPS_PT, même aire)."""
+    kept: list[np.ndarray] = []
+    seen: dict[tuple[int, ...], list[float]] = {}
+    for pts in paths:
+        box = np.concatenate([pts.min(axis=0), pts.max(axis=0)])
+        areas = seen.setdefault(tuple(np.round(box / _DUPLICATE_EPS_PT).astype(int).tolist()), [])
+        area = _area(pts)
+        if any(abs(area - other) <= _DUPLICATE_AREA * max(area, other) for other in areas):
+            continue
+        kept.append(pts)
+        areas.append(area)
+    return kept
+
+
+def _find_card(paths: list[np.ndarray], areas: np.ndarray, boxes: np.ndarray) -> int | None:
+    """Index du chemin « carte bancaire » (le plus grand s'il y en a plusieurs), ou None."""
+    for i in np.argsort(-areas, kind="stable"):
+        if len(paths[i]) != 4:
+            continue
+        long_side, short_side = _min_rect(paths[i])
+        if short_side == 0 or abs(long_side / short_side / _CARD_RATIO - 1.0) > _CARD_RATIO_TOLERANCE:
+            continue
+        if _children(i, paths, boxes, areas >= _CARD_MIN_CONTENT * areas[i]):
+            return int(i)
+    return None
+
+
+def _raster_fraction(page: fitz.Page) -> float:
+    """Part de la page couverte par la plus grande image raster (0 si aucune)."""
+    page_area = page.rect.width * page.rect.height
+    return max(
+        (rect.width * rect.height / page_area
+         for image in page.get_images(full=True) for rect in page.get_image_rects(image[0])),
+        default=0.0,
+    )
+
+
+def analyse_pdf_vectors(pdf_bytes: bytes, page_index: int = 0) -> dict | None:
+    """Contour du joint lu directement dans les tracés vectoriels d'une page (la première par défaut).
+
+    Returns:
+        Même structure que vision_service.process_image() (contour et trous
+        normalisés sur la page, dimensions en mm, géométrie carte si une carte
+        vectorielle sert d'étalon), ou None si la page n'a pas de géométrie
+        vectorielle fermée exploitable (→ analyse raster).
+
+    Raises:
+        ValueError: si le PDF ne peut pas être ouvert ou ne contient pas cette page.
+    """
+    with _pdf_page(pdf_bytes, page_index) as page:
+        return _analyse_page(page)
+
+
+def _analyse_page(page: fitz.Page) -> dict | None:
+    """analyse_pdf_vectors() sur une page ouverte."""
+    page_size = np.array([page.rect.width, page.rect.height], dtype=np.float64)
+    page_area = float(page_size[0] * page_size[1])
+
+    raster = _raster_fraction(page)
+    if raster >= _RASTER_PAGE_FRACTION:
+        return None
+
+    paths = []
+    for pts in _dedupe(_to_displayed(_closed_paths(page.get_drawings()), page)):
+        extent = pts.max(axis=0) - pts.min(axis=0)
+        if extent[0] * extent[1] < _PAGE_FRAME_FRACTION * page_area and _area(pts) > 0:
+            paths.append(pts)
+    if not paths:
+        return None
+    areas = np.array([_area(pts) for pts in paths])
+    boxes = _boxes(paths)
+    everything = np.ones(len(paths), dtype=bool)
+
+    # Étalon : carte vectorielle si présente, sinon unités PDF (CAO 1:1)
+    card_idx = _find_card(paths, areas, boxes)
+    if card_idx is not None:
+        mm_per_pt = _CARD_W_MM / _min_rect(paths[card_idx])[0]
+        region = _children(card_idx, paths, boxes, everything)
+        card_quad, homography = _card_geometry(_order_points(paths[card_idx].astype(np.float32)), page_size)
+    else:
+        if raster > 0 or len(paths) > _MAX_UNCALIBRATED_PATHS:
+            return None
+        mm_per_pt = _PT_TO_MM
+        region = list(range(len(paths)))
+        card_quad, homography = None, None
+    if not region:
+        return None
+
+    outer_idx = max(region, key=lambda i: areas[i])
+    outer = paths[outer_idx]
+    in_region = np.zeros(len(paths), dtype=bool)
+    in_region[region] = True
+    contained = _children(outer_idx, paths, boxes, in_region)
+    # Sans carte : tout tracé hors du contour (cartouche, logo, cote) → pas un joint seul
+    if card_idx is None and len(contained) < len(region) - 1:
+        return None
+    inner = [i for i in contained if areas[i] >= _MIN_HOLE_FRACTION * areas[outer_idx]]
+    # Trous directs uniquement : un tracé contenu dans un autre trou est un détail de ce trou
+    in_inner = np.zeros(len(paths), dtype=bool)
+    in_inner[inner] = True
+    holes_idx = [i for i in inner if not _has_parent(i, paths, boxes, in_inner & (areas > areas[i]))]
+    if card_idx is None and len(holes_idx) > 1 and areas[holes_idx].sum() >= _MAX_HOLE_COVER * areas[outer_idx]:
+        return None
+
+    width_pt, height_pt = _min_rect(outer)
+    holes = []
+    for i in holes_idx:
+        h_w, h_h = _min_rect(paths[i])
+        holes.append({
+            "contour_points": (paths[i] / page_size).tolist(),
+            "width_mm": round(h_w * mm_per_pt, 1),
+            "height_mm": round(h_h * mm_per_pt, 1),
+        })
+
+    return {
+        "contour_points": (outer / page_size).tolist(),
+        "dimensions": {
+            "width_mm": round(width_pt * mm_per_pt, 1),
+            "height_mm": round(height_pt * mm_per_pt, 1),
+        },
+        # Échelle 1:1 supposée, non vérifiée : un plan à 1:2 ou 2:1 serait faux
+        "calibration_warning": card_idx is None,
+        "holes": holes,
+        "card_quad": card_quad,
+        "homography": homography,
+        "scale_factor": 1.0,
+    }
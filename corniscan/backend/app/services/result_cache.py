@@ -0,0 +1,128 @@
+"""
+result_cache.py — Cache LRU en mémoire des résultats du pipeline vision
+
+Les opérateurs relancent /scan/process sur connexion de chantier instable, puis
+renvoient la même photo à /scan/submit : une upload identique ne doit pas
+repasser par OpenCV.
+
+  - Clé : empreinte BLAKE2b-128 des bytes uploadés (hashlib, aucune dépendance)
+    + espace de noms ("process", "card", ...)
+  - Budget mémoire en octets (taille JSON des valeurs), éviction LRU
+  - Expiration TTL, compteurs hits / misses / évictions
+  - NFR-S4 : seule la géométrie dérivée (contours, dimensions, quad carte) est
+    stockée — jamais l'image ni les fichiers générés
+  - Désactivable : VISION_CACHE_ENABLED=false
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from app.core.config import settings
+
+
+def upload_digest(data) -> str:
+    """Empreinte BLAKE2b-128 (hex) du contenu uploadé."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class ResultCache:
+    """Cache LRU thread-safe à budget en octets et expiration TTL.
+
+    Les valeurs sont sérialisées en JSON à l'insertion : la taille comptée est
+    exacte, et chaque lecture retourne une copie indépendante.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        ttl_seconds: float,
+        enabled: bool = True,
+        clock=time.monotonic,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._clock = clock
+        self._lock = threading.Lock()
+        # (namespace, digest) → (expire_at, json_payload)
+        self._entries: OrderedDict[tuple[str, str], tuple[float, str]] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, namespace: str, digest: str) -> Any | None:
+        """Retourne une copie de la valeur en cache, ou None (absente, expirée, cache désactivé)."""
+        if not self.enabled:
+            return None
+        key = (namespace, digest)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= self._clock():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            payload = entry[1]
+        return json.loads(payload)
+
+    def put(self, namespace: str, digest: str, value: Any) -> None:
+        """Insère une valeur JSON-sérialisable ; évince les plus anciennes au-delà du budget."""
+        if not self.enabled:
+            return
+        payload = json.dumps(value, separators=(",", ":"))
+        if len(payload) > self.max_bytes:
+            return
+        key = (namespace, digest)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (self._clock() + self.ttl_seconds, payload)
+            self._bytes += len(payload)
+            self._evict_expired()
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """Compteurs du cache (exposés par les métriques)."""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _remove(self, key: tuple[str, str]) -> None:
+        _, payload = self._entries.pop(key)
+        self._bytes -= len(payload)
+
+    def _evict_expired(self) -> None:
+        """Retire les entrées expirées (quelques centaines d'entrées au plus : balayage complet)."""
+        now = self._clock()
+        expired = [key for key, (expire_at, _) in self._entries.items() if expire_at <= now]
+        for key in expired:
+            self._remove(key)
+        self.evictions += len(expired)
+
+
+vision_cache = ResultCache(
+    max_bytes=settings.vision_cache_max_bytes,
+    ttl_seconds=settings.vision_cache_ttl_seconds,
+    enabled=settings.vision_cache_enabled,
+)
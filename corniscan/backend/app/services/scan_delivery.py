@@ -0,0 +1,173 @@
+"""
+scan_delivery.py — Livraison binaire des fichiers de POST /scan/submit
+
+Le mode JSON historique encode en base64 le DXF, l'image annotée et l'image
+source : +33 % sur des charges de plusieurs Mo, plusieurs copies en mémoire.
+Modes binaires négociés par le header Accept :
+
+  - multipart/mixed : une partie par fichier (Content-Type + Content-Disposition)
+  - application/zip : archive écrite au fil de l'eau (DXF compressé, JPEG stockés
+    tels quels — déjà compressés)
+
+Les bytes produits par le worker sont écrits directement dans la réponse, sans
+ré-encodage ni concaténation préalable. Un fichier livré est un tuple
+(nom, type MIME, contenu).
+
+Traitements par lot (pages d'un PDF, ...) : as_completed_bounded() borne le
+nombre de tâches en vol et produit chaque résultat dès qu'il est prêt, émis en
+NDJSON (une ligne JSON par élément).
+
+Jobs asynchrones (scan_jobs) : progression émise en Server-Sent Events
+(sse_event), fichiers livrés sous les mêmes noms que /submit (artefact_name).
+"""
+
+import asyncio
+import json
+import secrets
+import zipfile
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Iterator
+
+MULTIPART_MIXED = "multipart/mixed"
+ZIP = "application/zip"
+NDJSON = "application/x-ndjson"
+SSE = "text/event-stream"
+
+Artefact = tuple[str, str, bytes]  # (filename, media_type, data)
+
+# Profil de rendu (vision_service.RENDER_PROFILES) → nom du champ JSON / du fichier livré
+RENDER_OUTPUTS = {"archive": "contour", "preview": "contour_preview"}
+_EXTENSIONS = {"image/jpeg": "jpg", "image/webp": "webp"}
+
+
+def artefact_name(profile: str, media_type: str) -> str:
+    """Nom du fichier livré pour un rendu : "contour.jpg", "contour_preview.webp", ..."""
+    return f"{RENDER_OUTPUTS[profile]}.{_EXTENSIONS[media_type]}"
+
+
+def _quality(params: list[str]) -> float:
+    """Paramètre q d'une entrée Accept (1 par défaut, 0 si illisible)."""
+    for param in params:
+        name, _, value = param.partition("=")
+        if name.strip().lower() == "q":
+            try:
+                return min(max(float(value), 0.0), 1.0)
+            except ValueError:
+                return 0.0
+    return 1.0
+
+
+def negotiate(accept: str) -> str | None:
+    """Mode binaire demandé par le header Accept, ou None (JSON).
+
+    Entrées triées par q décroissant (ordre du header à q égal), q=0 exclues ;
+    application/json mieux classé qu'un mode binaire → None.
+    """
+    ranked = []
+    for item in accept.split(","):
+        media_type, *params = item.split(";")
+        quality = _quality(params)
+        if quality > 0:
+            ranked.append((media_type.strip().lower(), quality))
+    for media_type, _ in sorted(ranked, key=lambda entry: -entry[1]):
+        if media_type in (MULTIPART_MIXED, ZIP):
+            return media_type
+        if media_type == "application/json":
+            return None
+    return None
+
+
+def multipart_stream(artefacts: list[Artefact], boundary: str | None = None) -> tuple[str, Iterator[bytes]]:
+    """Corps multipart/mixed (RFC 2046).
+
+    Returns:
+        (content_type avec boundary, générateur de chunks)
+    """
+    boundary = boundary or secrets.token_hex(16)
+
+    def chunks() -> Iterator[bytes]:
+        for filename, media_type, data in artefacts:
+            yield (
+                f"--{boundary}\r\n"
+                f"Content-Type: {media_type}\r\n"
+                f'Content-Disposition: attachment; filename="{filename}"\r\n'
+                f"Content-Length: {len(data)}\r\n\r\n"
+            ).encode("ascii")
+            yield data
+            yield b"\r\n"
+        yield f"--{boundary}--\r\n".encode("ascii")
+
+    return f'{MULTIPART_MIXED}; boundary="{boundary}"', chunks()
+
+
+class _ChunkSink:
+    """Flux non seekable pour zipfile : accumule les écritures jusqu'au prochain drain()."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> Iterator[bytes]:
+        chunks, self._chunks = self._chunks, []
+        yield from chunks
+
+
+def zip_stream(artefacts: list[Artefact]) -> Iterator[bytes]:
+    """Archive ZIP produite au fil de l'eau : chaque fichier est émis dès qu'il est écrit.
+
+    Flux non seekable → zipfile utilise des descripteurs de données (pas de
+    retour en arrière pour réécrire les en-têtes locaux).
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, mode="w") as archive:
+        for filename, _, data in artefacts:
+            # Le DXF (texte) se compresse ~5× ; les JPEG sont stockés tels quels
+            compression = zipfile.ZIP_DEFLATED if filename.endswith(".dxf") else zipfile.ZIP_STORED
+            archive.writestr(filename, data, compress_type=compression)
+            yield from sink.drain()
+    yield from sink.drain()
+
+
+def ndjson_line(item: dict) -> bytes:
+    """Une ligne NDJSON (JSON compact + saut de ligne)."""
+    return (json.dumps(item, separators=(",", ":")) + "\n").encode()
+
+
+def sse_event(event_id: int, event: str, data: dict) -> bytes:
+    """Un événement Server-Sent Events (id, type, données JSON sur une ligne)."""
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode()
+
+
+async def as_completed_bounded(jobs: Iterable[Callable[[], Awaitable]], limit: int) -> AsyncIterator:
+    """Exécute les jobs (fabriques de coroutines) avec au plus `limit` en vol.
+
+    Chaque résultat est produit dès que son job se termine (ordre d'achèvement) ;
+    un job n'est lancé qu'à la libération d'une place, ce qui borne la mémoire
+    aux `limit` éléments en cours. Fermeture anticipée (client déconnecté) →
+    les jobs en vol sont annulés.
+    """
+    jobs = iter(jobs)
+    pending: set[asyncio.Future] = set()
+
+    def launch() -> None:
+        job = next(jobs, None)
+        if job is not None:
+            pending.add(asyncio.ensure_future(job()))
+
+    try:
+        for _ in range(max(1, limit)):
+            launch()
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                pending.discard(task)
+                launch()
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
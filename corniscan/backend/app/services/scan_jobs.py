@@ -0,0 +1,449 @@
+"""
+scan_jobs.py — Jobs d'analyse asynchrones (POST /scan/jobs)
+
+/scan/process garde la requête HTTP ouverte pendant tout le pipeline : sur une
+grande photo et une connexion de chantier lente, le proxy coupe la requête et
+le client la relance — deux analyses pour une. Un job découple l'upload du
+calcul :
+
+  - POST /jobs renvoie aussitôt un identifiant ; SCAN_JOBS_CONCURRENCY
+    exécutants passent scan_tasks.scan_job_task (analyse + DXF + rendu contour)
+    au pool vision, au plus SCAN_JOBS_MAX_QUEUED jobs en attente (au-delà :
+    VisionBusyError → 503)
+  - Progression par jalon (decoded, card_found, contour_extracted, dxf_ready),
+    remontée du worker par vision_executor.run_with_progress() ; le client
+    interroge GET /jobs/{id} ou s'abonne au flux SSE GET /jobs/{id}/events
+    (événements rejouables : Last-Event-ID)
+  - SCAN_JOBS_DB_PATH : persistance SQLite — un job en attente ou en cours au
+    redémarrage est relancé depuis son upload
+  - Upload gardé tel que reçu par read_upload() : au-delà de 1 Mo, fichier
+    spoolé (UPLOAD_SPOOL_DIR) dont seul le chemin passe au worker — la file
+    ne retient pas SCAN_JOBS_MAX_QUEUED × 20 Mo en mémoire
+  - NFR-S4 : l'upload est effacé dès la fin du job ; résultat et fichiers
+    générés expirent SCAN_JOBS_TTL_SECONDS après la fin (purge à chaque accès
+    et périodique, en mémoire comme en base, secure_delete SQLite) ;
+    DELETE /jobs/{id} efface tout immédiatement
+
+Les jobs ne sont manipulés que depuis la boucle asyncio : aucun verrou hors
+de l'accès SQLite (exécuté dans un thread).
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+
+from app.core.config import settings
+from app.core.uploads import Upload, release_upload, upload_buffer
+from app.services.scan_delivery import artefact_name
+from app.services.scan_tasks import scan_job_task
+from app.services.vision_executor import VisionBusyError, vision_executor
+
+_logger = logging.getLogger("uvicorn")
+
+# Jalons publiés, dans l'ordre du pipeline
+JOB_STAGES = ("decoded", "card_found", "contour_extracted", "dxf_ready")
+# Étape du pipeline (core.timing) → jalon atteint à sa fin. "card_found" est
+# signalé par le pipeline lui-même (milestone), seulement si la carte est trouvée
+_MILESTONES = {
+    "decode": "decoded",
+    "pdf": "decoded",
+    "card_found": "card_found",
+    "contour": "contour_extracted",
+    "pdf_vector_geometry": "contour_extracted",
+    "dxf_write": "dxf_ready",
+}
+_FINISHED = ("done", "failed")
+_MAX_ATTEMPTS = 5               # pool vision saturé ou redémarré : tentatives avant échec 503
+_SWEEP_INTERVAL_SECONDS = 60.0  # purge périodique (au plus, bornée par le TTL)
+
+
+class ScanJob:
+    """Un job : statut, jalons atteints, événements rejouables, résultat et fichiers générés."""
+
+    def __init__(
+        self,
+        job_id: str,
+        owner: str,
+        filename: str | None,
+        is_pdf: bool,
+        profiles: tuple[str, ...],
+        webp: bool,
+        created_at: float,
+        upload: Upload | None,
+    ) -> None:
+        self.id = job_id
+        self.owner = owner
+        self.filename = filename
+        self.is_pdf = is_pdf
+        self.profiles = profiles
+        self.webp = webp
+        self.created_at = created_at
+        self.upload = upload
+        self.status = "queued"
+        self.stages: list[str] = []
+        self.events: list[tuple[str, dict]] = []  # (type, données) — id SSE = rang + 1
+        self.result: dict | None = None
+        self.error: dict | None = None
+        self.artefacts: dict[str, tuple[str, bytes]] = {}  # nom → (type MIME, contenu)
+        self.expires_at: float | None = None
+        self.removed = False
+        self._changed = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in _FINISHED
+
+    def summary(self) -> dict:
+        """Vue publique : GET /jobs/{id} et données de l'événement final."""
+        data = {"job_id": self.id, "status": self.status, "filename": self.filename, "stages": list(self.stages)}
+        if self.result is not None:
+            data["result"] = self.result
+        if self.error is not None:
+            data["error"] = self.error
+        if self.artefacts:
+            data["artefacts"] = list(self.artefacts)
+        if self.expires_at is not None:
+            data["expires_at"] = self.expires_at
+        return data
+
+    def emit(self, event: str, data: dict) -> None:
+        self.events.append((event, data))
+        self._wake()
+
+    def _wake(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def follow(self, after: int = 0, keepalive: float | None = None):
+        """Événements (id, type, données) d'id > after, puis au fil de l'eau jusqu'à la fin du job.
+
+        Produit None après `keepalive` secondes sans événement (commentaire SSE
+        pour les proxys).
+        """
+        sent = after
+        while True:
+            changed = self._changed
+            while sent < len(self.events):
+                event, data = self.events[sent]
+                sent += 1
+                yield sent, event, data
+            if self.finished or self.removed:
+                return
+            try:
+                await asyncio.wait_for(changed.wait(), keepalive)
+            except asyncio.TimeoutError:
+                yield None
+
+
+class SqliteJobStore:
+    """Persistance SQLite des jobs — appels bloquants, exécutés hors de la boucle (asyncio.to_thread)."""
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS scan_jobs (
+            id TEXT PRIMARY KEY,
+            owner TEXT NOT NULL,
+            filename TEXT,
+            is_pdf INTEGER NOT NULL,
+            profiles TEXT NOT NULL,
+            webp INTEGER NOT NULL,
+            created_at REAL NOT NULL,
+            status TEXT NOT NULL,
+            stages TEXT NOT NULL,
+            events TEXT NOT NULL,
+            result TEXT,
+            error TEXT,
+            expires_at REAL,
+            upload BLOB
+        );
+        CREATE TABLE IF NOT EXISTS scan_job_artefacts (
+            job_id TEXT NOT NULL,
+            name TEXT NOT NULL,
+            media_type TEXT NOT NULL,
+            data BLOB NOT NULL,
+            PRIMARY KEY (job_id, name)
+        );
+    """
+
+    def __init__(self, path: str) -> None:
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            # Pages libérées écrasées : rien de l'image ne reste dans le fichier après purge
+            self._conn.execute("PRAGMA secure_delete = ON")
+            self._conn.executescript(self._SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def insert(self, job: ScanJob) -> None:
+        with self._lock, self._conn, upload_buffer(job.upload) as upload:
+            self._conn.execute(
+                "INSERT INTO scan_jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job.id, job.owner, job.filename, job.is_pdf, json.dumps(job.profiles), job.webp,
+                    job.created_at, job.status, json.dumps(job.stages), json.dumps(job.events),
+                    None, None, None, upload,
+                ),
+            )
+
+    def update(self, job: ScanJob) -> None:
+        """Statut, jalons, résultat ; job terminé → upload effacé, fichiers générés enregistrés."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE scan_jobs SET status = ?, stages = ?, events = ?, result = ?, error = ?, expires_at = ?,"
+                " upload = CASE WHEN ? THEN NULL ELSE upload END WHERE id = ?",
+                (
+                    job.status, json.dumps(job.stages), json.dumps(job.events),
+                    json.dumps(job.result) if job.result is not None else None,
+                    json.dumps(job.error) if job.error is not None else None,
+                    job.expires_at, job.finished, job.id,
+                ),
+            )
+            if job.finished:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO scan_job_artefacts VALUES (?, ?, ?, ?)",
+                    [(job.id, name, media_type, data) for name, (media_type, data) in job.artefacts.items()],
+                )
+
+    def delete(self, job_id: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM scan_jobs WHERE id = ?", (job_id,))
+            self._conn.execute("DELETE FROM scan_job_artefacts WHERE job_id = ?", (job_id,))
+
+    def purge(self, now: float) -> None:
+        """Supprime les jobs expirés et leurs fichiers."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM scan_jobs WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+            self._conn.execute("DELETE FROM scan_job_artefacts WHERE job_id NOT IN (SELECT id FROM scan_jobs)")
+
+    def load(self) -> list[ScanJob]:
+        """Jobs enregistrés, du plus ancien au plus récent."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, owner, filename, is_pdf, profiles, webp, created_at, status, stages, events,"
+                " result, error, expires_at, upload FROM scan_jobs ORDER BY created_at",
+            ).fetchall()
+            artefacts = self._conn.execute("SELECT job_id, name, media_type, data FROM scan_job_artefacts").fetchall()
+        jobs = []
+        for (job_id, owner, filename, is_pdf, profiles, webp, created_at, status, stages, events,
+             result, error, expires_at, upload) in rows:
+            job = ScanJob(job_id, owner, filename, bool(is_pdf), tuple(json.loads(profiles)), bool(webp), created_at, upload)
+            job.status = status
+            job.stages = json.loads(stages)
+            job.events = [tuple(event) for event in json.loads(events)]
+            job.result = json.loads(result) if result is not None else None
+            job.error = json.loads(error) if error is not None else None
+            job.expires_at = expires_at
+            jobs.append(job)
+        by_id = {job.id: job for job in jobs}
+        for job_id, name, media_type, data in artefacts:
+            if job_id in by_id:
+                by_id[job_id].artefacts[name] = (media_type, data)
+        return jobs
+
+
+class ScanJobQueue:
+    """File de jobs en mémoire : exécutants asyncio, expiration TTL, persistance SQLite optionnelle."""
+
+    def __init__(
+        self,
+        concurrency: int,
+        max_queued: int,
+        ttl_seconds: float,
+        db_path: str = "",
+        retry_after: int = 2,
+        clock=time.time,
+    ) -> None:
+        self.concurrency = concurrency
+        self.max_queued = max_queued
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self.retry_after = retry_after
+        self._clock = clock  # horloge murale : les échéances survivent au redémarrage
+        self._jobs: dict[str, ScanJob] = {}
+        self._queue: asyncio.Queue | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._store: SqliteJobStore | None = None
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for job in self._jobs.values() if job.status == "queued")
+
+    def start(self) -> None:
+        """Lance exécutants et purge dans la boucle courante ; relance les jobs non terminés (idempotent)."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self.shutdown()
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        if self.db_path:
+            self._store = SqliteJobStore(self.db_path)
+            self._store.purge(self._clock())
+            self._jobs = {job.id: job for job in self._store.load()}
+        for job in sorted(self._jobs.values(), key=lambda j: j.created_at):
+            if not job.finished:
+                if job.status == "running":
+                    # Interrompu par un redémarrage : repart de zéro depuis l'upload
+                    job.status, job.stages = "queued", []
+                    job.emit("status", {"status": "queued", "restarted": True})
+                self._queue.put_nowait(job)
+        self._tasks = [loop.create_task(self._worker()) for _ in range(max(1, self.concurrency))]
+        self._tasks.append(loop.create_task(self._sweep()))
+
+    def shutdown(self) -> None:
+        """Arrête exécutants et purge ; les jobs en cours restent à relancer au prochain start()."""
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        self._loop = None
+        if self._store is not None:
+            self._store.close()
+            self._store = None
+
+    async def submit(
+        self,
+        owner: str,
+        filename: str | None,
+        raw: Upload,
+        is_pdf: bool,
+        profiles: tuple[str, ...] = ("archive",),
+        webp: bool = False,
+    ) -> ScanJob:
+        """Enregistre un job et le met en file ; raw lui appartient (libéré à la fin du job).
+
+        Raises:
+            VisionBusyError: SCAN_JOBS_MAX_QUEUED jobs déjà en attente.
+        """
+        self.start()
+        self.purge()
+        if self.queued >= self.max_queued:
+            raise VisionBusyError(self.retry_after)
+        job = ScanJob(uuid.uuid4().hex, owner, filename, is_pdf, profiles, webp, self._clock(), raw)
+        job.emit("status", {"status": "queued"})
+        if self._store is not None:
+            await asyncio.to_thread(self._store.insert, job)
+        self._jobs[job.id] = job
+        self._queue.put_nowait(job)
+        return job
+
+    def get(self, job_id: str, owner: str) -> ScanJob | None:
+        """Job de cet utilisateur, ou None (inconnu, expiré, autre propriétaire)."""
+        self.purge()
+        job = self._jobs.get(job_id)
+        return job if job is not None and job.owner == owner else None
+
+    async def delete(self, job_id: str, owner: str) -> bool:
+        """Efface le job, son upload et ses fichiers ; False si introuvable."""
+        if self.get(job_id, owner) is None:
+            return False
+        self._remove(job_id)
+        if self._store is not None:
+            await asyncio.to_thread(self._store.delete, job_id)
+        return True
+
+    def purge(self) -> None:
+        """Retire de la mémoire les jobs expirés (la base est purgée par _sweep)."""
+        now = self._clock()
+        for job_id in [job.id for job in self._jobs.values() if job.expires_at is not None and job.expires_at <= now]:
+            self._remove(job_id)
+
+    def clear(self) -> None:
+        for job_id in list(self._jobs):
+            self._remove(job_id)
+
+    def _remove(self, job_id: str) -> None:
+        job = self._jobs.pop(job_id)
+        job.removed = True
+        release_upload(job.upload)
+        job.upload, job.result, job.artefacts = None, None, {}
+        job._wake()
+
+    async def _sweep(self) -> None:
+        while True:
+            await asyncio.sleep(min(self.ttl_seconds, _SWEEP_INTERVAL_SECONDS))
+            self.purge()
+            if self._store is not None:
+                await asyncio.to_thread(self._store.purge, self._clock())
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            if not job.removed:
+                await self._execute(job)
+
+    async def _execute(self, job: ScanJob) -> None:
+        job.status = "running"
+        job.emit("status", {"status": "running"})
+        await self._persist(job)
+        t0 = time.perf_counter()
+
+        def on_stage(name: str) -> None:
+            milestone = _MILESTONES.get(name)
+            # Jalons dans l'ordre, une seule fois (le rendu re-décode l'image, ...)
+            if milestone is None or (job.stages and JOB_STAGES.index(milestone) <= JOB_STAGES.index(job.stages[-1])):
+                return
+            job.stages.append(milestone)
+            job.emit("stage", {"stage": milestone, "elapsed_ms": round((time.perf_counter() - t0) * 1000.0, 1)})
+
+        for attempt in range(_MAX_ATTEMPTS):
+            try:
+                result, dxf_bytes, renders = await vision_executor.run_with_progress(
+                    on_stage, scan_job_task, job.upload, job.is_pdf, job.profiles, job.webp,
+                )
+                break
+            except VisionBusyError as exc:
+                if attempt == _MAX_ATTEMPTS - 1:
+                    await self._finish(job, error={"status": 503, "detail": str(exc)})
+                    return
+                await asyncio.sleep(exc.retry_after)
+            except ValueError as exc:
+                await self._finish(job, error={"status": 422, "detail": str(exc)})
+                return
+            except Exception:
+                _logger.exception("Job d'analyse en échec : %s", job.id)
+                await self._finish(job, error={"status": 500, "detail": "Erreur interne pendant l'analyse."})
+                return
+
+        artefacts = {"joint.dxf": ("application/dxf", dxf_bytes)}
+        for profile, (data, media_type) in renders.items():
+            artefacts[artefact_name(profile, media_type)] = (media_type, data)
+        await self._finish(job, result=result, artefacts=artefacts)
+
+    async def _finish(
+        self,
+        job: ScanJob,
+        result: dict | None = None,
+        artefacts: dict[str, tuple[str, bytes]] | None = None,
+        error: dict | None = None,
+    ) -> None:
+        if job.removed:
+            return
+        release_upload(job.upload)
+        job.upload = None
+        job.result, job.artefacts, job.error = result, artefacts or {}, error
+        job.status = "failed" if error is not None else "done"
+        job.expires_at = self._clock() + self.ttl_seconds
+        # Abonnés réveillés une fois le job enregistré (GET après "done" → état durable)
+        job.events.append((job.status, job.summary()))
+        await self._persist(job)
+        job._wake()
+
+    async def _persist(self, job: ScanJob) -> None:
+        if self._store is not None and not job.removed:
+            await asyncio.to_thread(self._store.update, job)
+
+
+scan_jobs = ScanJobQueue(
+    concurrency=settings.scan_jobs_concurrency,
+    max_queued=settings.scan_jobs_max_queued,
+    ttl_seconds=settings.scan_jobs_ttl_seconds,
+    db_path=settings.scan_jobs_db_path,
+    retry_after=settings.vision_retry_after_seconds,
+)
@@ -0,0 +1,160 @@
+"""
+scan_tasks.py — Tâches vision exécutées dans les workers (VisionExecutor)
+
+Fonctions de module (picklables) appelées par le routeur scan via
+VisionExecutor.run(). Chacune regroupe tout le travail CPU d'une requête —
+conversion PDF, OpenCV, ezdxf, construction des structures JSON — pour qu'il
+s'exécute hors du processus Uvicorn (GIL compris).
+
+Les uploads arrivent en bytes ou en SpooledUpload (core.uploads : chemin d'un
+fichier temporaire, mappé en mémoire ici — pas de copie à travers le pool).
+
+Les erreurs métier sont levées en ValueError : le routeur les traduit en 422.
+run_timed() enveloppe une tâche pour renvoyer aussi ses durées par étape
+(header Server-Timing).
+"""
+
+import time
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.timing import collect_timings, milestone, stage
+from app.core.uploads import Upload, upload_buffer
+from app.services.dxf_service import generate_dxf_report
+from app.services.live_detection import detect_card_live
+from app.services.pdf_vectors import analyse_pdf_vectors
+from app.services.vision_service import (
+    encode_page_jpeg,
+    pdf_page_count,
+    pdf_to_array,
+    process_image,
+    render_contour_images,
+)
+
+
+def load_image(raw: bytes, is_pdf: bool) -> bytes | np.ndarray:
+    """Source image du pipeline : PDF → tableau BGR rastérisé (sans JPEG intermédiaire),
+    sinon raw tel quel (décodage réduit laissé à vision_service)."""
+    if is_pdf:
+        with stage("pdf"):
+            return pdf_to_array(raw)
+    return raw
+
+
+def _source_bytes(image: bytes | np.ndarray) -> bytes:
+    """Image source renvoyée au client : l'upload tel quel, ou le rendu PDF en JPEG."""
+    if isinstance(image, np.ndarray):
+        with stage("pdf_encode"):
+            return encode_page_jpeg(image)
+    return bytes(image)  # copie si vue sur un fichier mappé (sans effet sur des bytes)
+
+
+def run_timed(fn, *args) -> tuple:
+    """Exécute fn(*args) en collectant les durées par étape (ms).
+
+    Returns:
+        (résultat de fn, {étape: ms, ..., "vision": durée totale dans le worker})
+    """
+    t0 = time.perf_counter()
+    with collect_timings() as timings:
+        result = fn(*args)
+    timings["vision"] = (time.perf_counter() - t0) * 1000.0
+    return result, timings
+
+
+def detect_card_task(image: Upload, roi_quad: list[list[float]] | None = None) -> dict:
+    """POST /detect-card — détection carte live, recherche d'abord autour de roi_quad si fourni."""
+    with upload_buffer(image) as data:
+        return detect_card_live(data, roi_quad)
+
+
+def process_task(raw: Upload, is_pdf: bool) -> dict:
+    """POST /process, /process-batch — pipeline complet d'analyse (Story 4.1) ; PDF : première page."""
+    if is_pdf:
+        return process_pdf_page_task(raw, 0)
+    with upload_buffer(raw) as data:
+        return process_image(data)
+
+
+def pdf_page_count_task(raw: Upload) -> int:
+    """POST /process-pages — nombre de pages du PDF (ValueError si illisible)."""
+    with upload_buffer(raw) as data:
+        return pdf_page_count(data)
+
+
+def process_pdf_page_task(raw: Upload, page: int) -> dict:
+    """Analyse d'une page de PDF (indice 0) — POST /process, /process-pages.
+
+    Géométrie lue dans les tracés vectoriels si la page en contient (export
+    CAO) ; sinon page rastérisée puis pipeline complet.
+    """
+    with upload_buffer(raw) as data:
+        if settings.pdf_vector_analysis:
+            with stage("pdf_vector"):
+                result = analyse_pdf_vectors(data, page)
+            if result is not None:
+                if result["card_quad"] is not None:
+                    milestone("card_found")
+                milestone("pdf_vector_geometry")
+                return result
+        with stage("pdf"):
+            image = pdf_to_array(data, page=page)
+    return process_image(image)
+
+
+def submit_task(
+    raw: Upload,
+    is_pdf: bool,
+    points: list[list[float]],
+    width_mm: float,
+    height_mm: float,
+    holes: list[dict],
+    card_geometry: dict,
+    return_image: bool = True,
+    profiles: tuple[str, ...] = ("archive",),
+    webp: bool = False,
+) -> tuple[bytes, bytes | None, dict[str, tuple[bytes, str]], dict]:
+    """POST /submit — génère DXF R2018 + rendus contour (Stories 5.1, 5.2).
+
+    Returns:
+        (dxf_bytes, image_bytes, {profil: (bytes, type MIME)}, geometry)
+        image_bytes = image source (JPEG rendu pour un PDF), None si not return_image
+        (évite de la renvoyer à travers la frontière du pool).
+        Un rendu par profil demandé (vision_service.RENDER_PROFILES).
+        geometry = rapport de compression du contour (dxf_service.generate_dxf_report).
+
+    Raises:
+        ValueError: génération DXF ou décodage image impossible.
+    """
+    # Story 5.1 — génération DXF R2018
+    try:
+        dxf_bytes, geometry = generate_dxf_report(points, width_mm, height_mm, holes=holes or None)
+    except ValueError as exc:
+        raise ValueError(f"Génération DXF échouée : {exc}") from exc
+
+    with upload_buffer(raw) as data:
+        image = load_image(data, is_pdf)
+        # Story 5.2 — contour superposé, un rendu par profil
+        renders = render_contour_images(
+            image, points, width_mm, height_mm, holes, **card_geometry, profiles=profiles, webp=webp,
+        )
+        return dxf_bytes, _source_bytes(image) if return_image else None, renders, geometry
+
+
+def scan_job_task(
+    raw: Upload, is_pdf: bool, profiles: tuple[str, ...] = ("archive",), webp: bool = False,
+) -> tuple[dict, bytes, dict]:
+    """Job asynchrone (scan_jobs) — analyse puis DXF + rendus depuis la géométrie détectée.
+
+    Returns:
+        (résultat de process_task + "geometry", dxf_bytes, {profil: (bytes, type MIME)})
+    """
+    result = process_task(raw, is_pdf)
+    dims = result["dimensions"]
+    card_geometry = {"card_quad": result["card_quad"], "homography": result["homography"]}
+    dxf_bytes, _, renders, geometry = submit_task(
+        raw, is_pdf, result["contour_points"], dims["width_mm"], dims["height_mm"], result["holes"], card_geometry,
+        return_image=False, profiles=profiles, webp=webp,
+    )
+    return {**result, "geometry": geometry}, dxf_bytes, renders
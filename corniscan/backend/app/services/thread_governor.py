@@ -0,0 +1,83 @@
+"""
+thread_governor.py — Budget de threads OpenCV des tâches vision
+
+OpenCV parallélise en interne resize, GaussianBlur, warpPerspective, CLAHE…
+sur tous les cœurs, dans chaque worker du pool vision : avec plusieurs tâches
+en vol, workers × cœurs threads se disputent la machine et la latence de
+queue explose. ThreadGovernor répartit un budget de cœurs (VISION_CPU_BUDGET)
+entre les tâches en cours :
+
+  - "adaptive" : budget // tâches en cours — tout le budget pour une requête
+    seule, 1 thread par worker quand le pool est plein
+  - "single" : toujours 1 thread (débit maximal sous charge)
+  - "opencv" : réglage OpenCV par défaut, jamais modifié
+
+La décision est prise dans la boucle asyncio à la soumission (compteur du
+VisionExecutor, sans verrou) et appliquée dans le worker par
+run_with_threads(), qui n'appelle cv2.setNumThreads() que si la valeur change.
+Une tâche lancée seule garde son budget jusqu'à sa fin même si d'autres
+arrivent entre-temps : le dépassement reste borné à une tâche.
+
+cv2.setNumThreads() et _applied valent pour tout le processus : un worker
+n'exécute qu'une tâche à la fois, d'où un gouverneur réservé au pool de
+processus (VisionExecutor l'ignore en pool de threads).
+"""
+
+import os
+
+import cv2
+
+from app.core.metrics import vision_opencv_threads
+
+MODES = ("adaptive", "single", "opencv")
+
+
+def available_cpus() -> int:
+    """Cœurs utilisables par le processus (affinité CPU si disponible)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # hors Linux
+        return os.cpu_count() or 1
+
+
+class ThreadGovernor:
+    """Nombre de threads OpenCV attribué à chaque tâche vision selon la charge."""
+
+    def __init__(self, mode: str = "adaptive", budget: int = 0) -> None:
+        if mode not in MODES:
+            raise ValueError(f"Mode de threads OpenCV inconnu : {mode!r} (attendu : {', '.join(MODES)}).")
+        self.mode = mode
+        self.budget = budget if budget > 0 else available_cpus()
+        self.last: int | None = None
+
+    def threads_for(self, in_flight: int) -> int | None:
+        """Threads OpenCV d'une tâche qui s'exécute avec in_flight tâches en cours (elle comprise).
+
+        Returns:
+            None en mode "opencv" (réglage laissé intact).
+        """
+        if self.mode == "opencv":
+            return None
+        threads = 1 if self.mode == "single" else max(1, self.budget // max(1, in_flight))
+        self.last = threads
+        vision_opencv_threads.inc(str(threads))
+        return threads
+
+
+# Côté worker : dernière valeur passée à cv2.setNumThreads() dans ce processus
+_applied: int | None = None
+
+
+def apply_threads(threads: int | None) -> None:
+    """Règle le nombre de threads OpenCV du processus courant (sans appel si inchangé)."""
+    global _applied
+    if threads is None or threads == _applied:
+        return
+    cv2.setNumThreads(threads)
+    _applied = threads
+
+
+def run_with_threads(threads: int | None, fn, *args):
+    """Exécute fn(*args) dans le worker avec le nombre de threads OpenCV décidé par le gouverneur."""
+    apply_threads(threads)
+    return fn(*args)
@@ -0,0 +1,55 @@
+"""
+vision_context.py — Buffers de travail et objets OpenCV réutilisés par thread
+
+Chaque appel à _find_card_corners(), _detect_joint_contour() et detect_card()
+allouait ses images intermédiaires (niveaux de gris, flou, Canny, dilatation,
+niveaux de pyramide, image rectifiée) et recréait son objet CLAHE. Même
+principe que LiveCardDetector (live_detection) : un contexte par thread —
+donc par worker processus — garde ces buffers d'un appel à l'autre, passés
+aux fonctions OpenCV en dst=.
+
+Les buffers ne grandissent que : une image plus petite (niveau de pyramide,
+fenêtre de raffinement) travaille dans une sous-vue, sans réallocation quand
+la taille varie d'une photo à l'autre. En régime établi, un appel n'alloue
+plus que les contours (findContours) et le résultat.
+
+Un buffer n'est valide que jusqu'à l'appel suivant qui utilise le même nom :
+rien de ce qui en sort ne doit le référencer (copie, tolist(), ...).
+"""
+
+import threading
+
+import numpy as np
+import cv2
+
+
+class VisionContext:
+    """Buffers nommés et objets OpenCV à état (CLAHE) d'un thread. Pas thread-safe."""
+
+    def __init__(self) -> None:
+        self._buffers: dict[str, np.ndarray] = {}
+        # CLAHE garde des buffers internes : un objet par thread
+        self.clahe = cv2.createCLAHE(clipLimit=2.5, tileGridSize=(8, 8))
+
+    def buffer(self, name: str, shape: tuple[int, ...]) -> np.ndarray:
+        """Vue uint8 de forme `shape` dans le buffer `name` (agrandi seulement si trop petit)."""
+        buf = self._buffers.get(name)
+        if buf is None or buf.shape[2:] != shape[2:] or buf.shape[0] < shape[0] or buf.shape[1] < shape[1]:
+            grown = shape if buf is None or buf.shape[2:] != shape[2:] else (
+                max(buf.shape[0], shape[0]), max(buf.shape[1], shape[1]), *shape[2:],
+            )
+            buf = np.empty(grown, dtype=np.uint8)
+            self._buffers[name] = buf
+        return buf[:shape[0], :shape[1]]
+
+
+_local = threading.local()
+
+
+def get_vision_context() -> VisionContext:
+    """Contexte du thread courant (créé au premier appel)."""
+    context = getattr(_local, "context", None)
+    if context is None:
+        context = VisionContext()
+        _local.context = context
+    return context
@@ -0,0 +1,248 @@
+"""
+vision_executor.py — Pool de processus dédié au pipeline vision
+
+Les trois endpoints scan passaient par le thread pool partagé d'Uvicorn/AnyIO :
+le travail Python (boucles de contours, tolist(), JSON, ezdxf) se sérialisait
+sur le GIL et rien ne bornait le nombre d'images 48 MP en vol.
+
+  - ProcessPoolExecutor (contexte "spawn" — pas de fork d'un processus dont le
+    pool de threads OpenCV est déjà initialisé), VISION_WORKERS workers
+  - File d'attente bornée : au-delà de workers + VISION_QUEUE_SIZE tâches,
+    VisionBusyError → le routeur répond 503 + Retry-After immédiatement
+  - Workers préchauffés : OpenCV / PyMuPDF / ezdxf importés et un premier
+    décodage effectué avant la première requête
+  - VISION_WORKERS=0 : exécution dans un pool de threads du processus courant
+    (développement, tests)
+  - Threads OpenCV de chaque tâche fixés par le gouverneur (thread_governor) :
+    tout le budget de cœurs pour une requête seule, 1 thread par worker quand
+    le pool est plein — pas de sur-souscription workers × cœurs. Mode
+    processus uniquement : cv2.setNumThreads() est global au processus, les
+    tâches du pool de threads (VISION_WORKERS=0) s'écraseraient leur budget
+  - run_with_progress() : les fins d'étape (core.timing) de la tâche remontent
+    du worker par une file de progression, relayées vers la boucle asyncio par
+    un thread dédié (jobs asynchrones — scan_jobs)
+
+Le compteur de tâches en vol n'est manipulé que depuis la boucle asyncio :
+aucun verrou nécessaire.
+"""
+
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable
+
+from app.core.config import settings
+from app.core.timing import listen_stages
+from app.services.thread_governor import ThreadGovernor, run_with_threads
+
+_logger = logging.getLogger("uvicorn")
+
+# Taille du pool de threads quand VISION_WORKERS=0
+_INLINE_THREADS = 4
+
+
+class VisionBusyError(RuntimeError):
+    """File d'attente vision pleine — la requête doit être réessayée plus tard."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__("Serveur d'analyse saturé, réessayez dans quelques secondes.")
+        self.retry_after = retry_after
+
+
+def _warm_worker() -> None:
+    """Initialiseur des workers : importe les bibliothèques lourdes et fait un premier décodage."""
+    import numpy as np
+    import cv2
+    import fitz  # noqa: F401 — pymupdf
+
+    import app.services.scan_tasks  # noqa: F401 — importe vision_service, dxf_service, ezdxf
+
+    _, encoded = cv2.imencode(".jpg", np.zeros((8, 8, 3), dtype=np.uint8))
+    cv2.imdecode(encoded, cv2.IMREAD_COLOR)
+
+
+def _noop() -> None:
+    """Tâche vide soumise au démarrage pour forcer le lancement des workers."""
+
+
+# Côté worker : file de progression vers le processus principal (héritée à la
+# création du worker — une file multiprocessing ne se passe pas en argument)
+_progress_queue = None
+
+
+def _init_worker(progress_queue) -> None:
+    """Initialiseur des workers processus : file de progression + préchauffage."""
+    global _progress_queue
+    _progress_queue = progress_queue
+    _warm_worker()
+
+
+def _run_reporting(channel: int, progress, fn, *args) -> tuple:
+    """Exécute fn(*args) en publiant (channel, étape) à la fin de chaque étape.
+
+    progress : file du pool de threads, None dans un worker processus (file
+    héritée à l'initialisation).
+
+    Returns:
+        (résultat de fn, étapes dans l'ordre) — la liste fait foi pour les
+        événements encore en transit quand le résultat arrive.
+    """
+    progress = progress if progress is not None else _progress_queue
+    reached: list[str] = []
+
+    def report(name: str) -> None:
+        reached.append(name)
+        progress.put((channel, name))
+
+    with listen_stages(report):
+        return fn(*args), reached
+
+
+class VisionExecutor:
+    """Exécuteur vision borné : pool de processus + file d'attente de taille fixe.
+
+    governor : threads OpenCV attribués à chaque tâche ; None = réglage OpenCV intact.
+    Ignoré en pool de threads (workers=0) : réglage OpenCV commun à toutes les tâches.
+    """
+
+    def __init__(
+        self, workers: int, queue_size: int, retry_after: int = 2, governor: ThreadGovernor | None = None,
+    ) -> None:
+        self.workers = workers
+        self.queue_size = queue_size
+        self.retry_after = retry_after
+        self.governor = governor if workers > 0 else None
+        self._pool: Executor | None = None
+        self._pending = 0
+        self._progress = None
+        # canal → (boucle, callback) des tâches run_with_progress() en cours
+        self._listeners: dict[int, tuple[asyncio.AbstractEventLoop, Callable[[str], None]]] = {}
+        self._channels = itertools.count(1)
+
+    @property
+    def capacity(self) -> int:
+        """Nombre maximal de tâches acceptées (en cours + en attente)."""
+        return max(1, self.workers or _INLINE_THREADS) + self.queue_size
+
+    @property
+    def in_flight(self) -> int:
+        """Tâches en cours d'exécution dans un worker."""
+        return min(self._pending, max(1, self.workers or _INLINE_THREADS))
+
+    @property
+    def queue_depth(self) -> int:
+        """Tâches acceptées en attente d'un worker libre."""
+        return self._pending - self.in_flight
+
+    def start(self) -> None:
+        """Crée le pool et lance le préchauffage des workers (idempotent)."""
+        if self._pool is not None:
+            return
+        if self.workers <= 0:
+            self._progress = queue.SimpleQueue()
+            self._pool = ThreadPoolExecutor(max_workers=_INLINE_THREADS, thread_name_prefix="vision")
+        else:
+            context = multiprocessing.get_context("spawn")
+            self._progress = context.Queue()
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(self._progress,),
+            )
+            for _ in range(self.workers):
+                self._pool.submit(_noop)
+            _logger.info("Vision executor: %d workers (pid %d)", self.workers, os.getpid())
+        threading.Thread(
+            target=self._relay_progress, args=(self._progress,), name="vision-progress", daemon=True,
+        ).start()
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+            self._progress.put(None)  # arrête le thread de relais
+            self._progress = None
+
+    def _relay_progress(self, progress) -> None:
+        """Thread de relais : (canal, étape) de la file → callback dans sa boucle asyncio."""
+        while (item := progress.get()) is not None:
+            channel, name = item
+            listener = self._listeners.get(channel)
+            if listener is None:
+                continue
+            loop, callback = listener
+            try:
+                loop.call_soon_threadsafe(callback, name)
+            except RuntimeError:  # boucle fermée
+                pass
+
+    async def run(self, fn, *args):
+        """Exécute fn(*args) dans un worker et attend son résultat.
+
+        Raises:
+            VisionBusyError: file d'attente pleine, ou pool redémarré après un crash worker.
+            Toute exception levée par fn (ValueError, ...) est propagée telle quelle.
+        """
+        if self._pending >= self.capacity:
+            raise VisionBusyError(self.retry_after)
+        self.start()
+        self._pending += 1
+        try:
+            # Tâches en cours, celle-ci comprise : une tâche mise en file ne
+            # démarrera que pool plein
+            threads = self.governor.threads_for(self.in_flight) if self.governor is not None else None
+            if threads is not None:
+                fn, args = run_with_threads, (threads, fn, *args)
+            pool = self._pool
+            return await asyncio.wrap_future(pool.submit(fn, *args))
+        except BrokenProcessPool as exc:
+            # Un worker a été tué (OOM sur image géante...) : on recrée le pool,
+            # sauf si une autre requête l'a déjà fait (futures restantes de l'ancien)
+            if self._pool is pool:
+                _logger.error("Vision executor: pool cassé, redémarrage (%s)", exc)
+                self.shutdown()
+            raise VisionBusyError(self.retry_after) from exc
+        finally:
+            self._pending -= 1
+
+    async def run_with_progress(self, on_stage: Callable[[str], None], fn, *args):
+        """Comme run(), en appelant on_stage(étape) dans la boucle à la fin de chaque étape de fn.
+
+        Chaque étape est signalée une fois, dans l'ordre, avant le retour
+        (les événements encore en transit sont rejoués depuis le résultat).
+        """
+        self.start()
+        channel = next(self._channels)
+        delivered: list[str] = []
+        done = False
+
+        def deliver(name: str) -> None:
+            if not done:
+                delivered.append(name)
+                on_stage(name)
+
+        self._listeners[channel] = (asyncio.get_running_loop(), deliver)
+        progress = self._progress if self.workers <= 0 else None
+        try:
+            result, reached = await self.run(_run_reporting, channel, progress, fn, *args)
+        finally:
+            done = True
+            del self._listeners[channel]
+        for name in reached[len(delivered):]:
+            on_stage(name)
+        return result
+
+
+vision_executor = VisionExecutor(
+    workers=settings.vision_workers,
+    queue_size=settings.vision_queue_size,
+    retry_after=settings.vision_retry_after_seconds,
+    governor=ThreadGovernor(settings.vision_opencv_threads, settings.vision_cpu_budget),
+)
@@ -16,27 +16,50 @@ Story 4.1 — process_image() :
   3. _detect_joint_contour() sur l'image corrigée
   4. Calcul dimensions mm
   5. Retour contour normalisé [0,1] en coordonnées image originale
+  6. Retour quad carte + homographie (coordonnées normalisées) réutilisables
+     par generate_contour_png() / POST /submit sans nouvelle détection
 
 Améliorations fiabilité :
   - Seuils Canny auto-adaptatifs (médiane de l'histogramme, σ=0.33)
   - Normalisation résolution entrée (max 2048 px) — stabilise le comportement
     quelque soit la résolution du capteur (iPhone 17 = jusqu'à 48 MP)
+  - Décodage JPEG réduit (IMREAD_REDUCED_*) choisi d'après l'en-tête — la
+    pleine résolution n'est décodée que pour le rendu "archive"
+  - PDF rastérisé directement en tableau BGR à la largeur de traitement
+    (pdf_to_array) : ni DPI fixe, ni JPEG intermédiaire ré-décodé
+  - Profils de rendu du contour (RENDER_PROFILES) : "preview" plafonné en
+    largeur (JPEG q85 ou WebP), "archive" pleine résolution (JPEG q100)
+  - Annotation en place sur l'image décodée ; masque carte fusionné dans son
+    seul rectangle englobant (aucune copie pleine image)
   - CLAHE avant détection joint — meilleur contraste en éclairage non uniforme
   - Raffinement sub-pixel des coins carte (cv2.cornerSubPix)
+  - Carte cherchée d'abord sur un niveau de pyramide ~512 px, puis à pleine
+    résolution dans une fenêtre autour du quad trouvé seulement
   - minAreaRect pour les dimensions — insensible à l'orientation du joint
   - Dilation morphologique avant findContours — ferme les lacunes Canny
   - Filtre de taille pour exclure les micro-contours parasites
+  - Contour simplifié à tolérance en mm (CONTOUR_TOLERANCE_MM) plutôt qu'à
+    1 % du périmètre ; arcs et cercles ajustés à l'écriture du DXF
+  - Filtre carte commun (card_candidates) : pré-filtre vectorisé des contours,
+    tri par surface et arrêt anticipé
+  - Images intermédiaires écrites dans les buffers du thread (vision_context,
+    dst=), CLAHE et noyau de dilatation réutilisés ; médiane Canny lue sur
+    l'histogramme 256 niveaux ; analyse décodée directement en niveaux de gris
 """
 
+from contextlib import contextmanager
+from typing import Iterator
+
 import numpy as np
 import cv2
 import fitz  # pymupdf
 
+from app.core.config import settings
+from app.core.timing import milestone, stage
+from app.services.card_candidates import _MIN_AREA_FRACTION, best_card_quad, extract_card_candidates
+from app.services.image_decoder import decode_image, read_image_size
+from app.services.vision_context import get_vision_context
 
-# Ratio largeur/hauteur d'une carte bancaire standard (85.6mm / 53.98mm)
-_CARD_RATIO = 85.6 / 53.98  # ≈ 1.585
-_RATIO_TOLERANCE = 0.12  # ±12 % de tolérance (filtre strict : seules les vraies cartes)
-_MIN_AREA_FRACTION = 0.04  # Le quadrilatère doit couvrir ≥ 4 % de l'image
 
 # Story 4.1 — constantes pipeline
 _SCALE = 10.0          # 10 px par mm
@@ -45,30 +68,118 @@ _CARD_H_MM = 53.98
 _DST_W = int(_CARD_W_MM * _SCALE)   # 856 px
 _DST_H = int(_CARD_H_MM * _SCALE)   # 539 px
 
+# Coins de la carte rectifiée (TL, TR, BR, BL) — cible de l'homographie
+_DST_PTS = np.array(
+    [
+        [0, 0],
+        [_DST_W - 1, 0],
+        [_DST_W - 1, _DST_H - 1],
+        [0, _DST_H - 1],
+    ],
+    dtype=np.float32,
+)
+
+# Tolérances de validation d'un quad carte fourni par le client (POST /submit)
+_QUAD_BOUNDS_MARGIN = 0.05       # coins acceptés dans [-5 %, 105 %] de l'image
+_HOMOGRAPHY_TOLERANCE_PX = 2.0   # écart max (px carte rectifiée) quad ↔ homographie
+
 # Normalisation résolution — stabilise le comportement quel que soit le capteur
 # (iPhone 15 Pro = 48 MP, iPhone 17 = ~48-200 MP selon modèle)
 _MAX_PROCESSING_WIDTH = 2048
 
+# Recherche carte grossière → fine : largeur du niveau de pyramide (pyrDown
+# successifs) et marge de la fenêtre pleine résolution autour du quad trouvé
+# (fraction de son plus grand côté). La carte couvre ≥ 4 % de l'image
+# (_MIN_AREA_FRACTION) : ~90 px de large au moins à 512 px.
+_PYRAMID_WIDTH = 512
+_REFINE_PADDING = 0.1
+_COARSE_MIN_AREA_FRACTION = 0.8 * _MIN_AREA_FRACTION
+
+# Rendu PDF : jamais au-delà de 150 DPI (une page A4 sur-échantillonnée à
+# 2048 px, ~250 DPI, doublait la rastérisation sans détail utile)
+_PDF_MAX_ZOOM = 150 / 72
+
+# Dilatation du contour joint — noyau construit une fois par processus
+_JOINT_KERNEL = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
+
+
+def _open_pdf(pdf_bytes: bytes) -> fitz.Document:
+    """Ouvre un PDF depuis ses bytes.
+
+    Raises:
+        ValueError: PDF illisible ou sans aucune page.
+    """
+    try:
+        doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    except RuntimeError as exc:  # fitz.FileDataError
+        raise ValueError("PDF illisible.") from exc
+    if doc.page_count == 0:
+        doc.close()
+        raise ValueError("Le PDF ne contient aucune page.")
+    return doc
 
-def pdf_to_image_bytes(pdf_bytes: bytes) -> bytes:
-    """Convertit la première page d'un PDF en JPEG bytes (150 DPI).
+
+@contextmanager
+def _pdf_page(pdf_bytes: bytes, page: int) -> Iterator[fitz.Page]:
+    """Page `page` (indice 0) d'un PDF, document fermé en sortie ; ValueError si hors limites."""
+    with _open_pdf(pdf_bytes) as doc:
+        if not 0 <= page < doc.page_count:
+            raise ValueError(f"Page {page + 1} absente (le PDF compte {doc.page_count} pages).")
+        yield doc[page]
+
+
+def pdf_page_count(pdf_bytes: bytes) -> int:
+    """Nombre de pages du PDF (ValueError si illisible ou vide)."""
+    with _open_pdf(pdf_bytes) as doc:
+        return doc.page_count
+
+
+def pdf_to_array(pdf_bytes: bytes, target_width: int | None = _MAX_PROCESSING_WIDTH, page: int = 0) -> np.ndarray:
+    """Rastérise une page d'un PDF (la première par défaut) directement en tableau BGR.
+
+    Le zoom est choisi pour que la page sorte à target_width px de large
+    (résolution de traitement), plafonné à 150 DPI : une page A0 est réduite
+    à target_width, une page A4 rendue à 150 DPI (~1240 px) sans
+    sur-échantillonnage. Aucun JPEG intermédiaire : les échantillons du
+    pixmap sont lus par une vue NumPy (samples_mv, sans copie) et convertis
+    RGB → BGR en une passe, dans un buffer possédé par l'appelant.
 
     Args:
         pdf_bytes: contenu brut du fichier PDF.
+        target_width: largeur max du rendu en px (None = 150 DPI).
+        page: indice de la page (0 = première).
 
     Returns:
-        JPEG bytes de la première page.
+        Image BGR uint8 (H×W×3) de la page.
+
+    Raises:
+        ValueError: si le PDF ne peut pas être ouvert ou ne contient pas cette page.
+    """
+    with _pdf_page(pdf_bytes, page) as pdf_page:
+        zoom = min(_PDF_MAX_ZOOM, target_width / pdf_page.rect.width) if target_width else _PDF_MAX_ZOOM
+        pix = pdf_page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csRGB, alpha=False)
+    # La memoryview ne retient pas le pixmap : elle n'est utilisée que tant que pix vit
+    rgb = np.frombuffer(pix.samples_mv, dtype=np.uint8).reshape(pix.height, pix.stride // 3, 3)[:, :pix.width]
+    return cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
+
+
+def encode_page_jpeg(page: np.ndarray) -> bytes:
+    """Page rastérisée (pdf_to_array) → JPEG q95.
+
+    Réservé aux sorties qui exigent un fichier (image source renvoyée par
+    /submit) : le pipeline vision consomme directement le tableau.
+    """
+    _, encoded = cv2.imencode(".jpg", page, [int(cv2.IMWRITE_JPEG_QUALITY), 95])
+    return encoded.tobytes()
+
+
+def pdf_to_image_bytes(pdf_bytes: bytes, max_width: int | None = _MAX_PROCESSING_WIDTH) -> bytes:
+    """Première page d'un PDF en JPEG (pdf_to_array() + encode_page_jpeg()).
 
     Raises:
         ValueError: si le PDF ne peut pas être ouvert ou ne contient aucune page.
     """
-    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-    if doc.page_count == 0:
-        raise ValueError("Le PDF ne contient aucune page.")
-    page = doc[0]
-    mat = fitz.Matrix(150 / 72, 150 / 72)  # 150 DPI
-    pix = page.get_pixmap(matrix=mat, colorspace=fitz.csRGB)
-    return pix.tobytes("jpeg")
+    return encode_page_jpeg(pdf_to_array(pdf_bytes, max_width))
 
 
 def _resize_for_processing(img: np.ndarray) -> tuple[np.ndarray, float]:
@@ -86,19 +197,62 @@ def _resize_for_processing(img: np.ndarray) -> tuple[np.ndarray, float]:
     return img, 1.0
 
 
-def _canny_auto(blurred: np.ndarray, sigma: float = 0.33) -> np.ndarray:
+def _decode_for_processing(
+    image: bytes | np.ndarray,
+    grayscale: bool = False,
+) -> tuple[np.ndarray | None, float, tuple[int, int]]:
+    """Décode l'image directement à la résolution de traitement.
+
+    Combine le décodage JPEG réduit (IMREAD_REDUCED_*) et _resize_for_processing()
+    pour le reliquat. Un tableau BGR déjà décodé (PDF rastérisé, pdf_to_array)
+    n'est que redimensionné.
+
+    Returns:
+        (image_traitement | None, scale, (orig_w, orig_h))
+        scale = pixels de traitement par pixel original (décodage × resize).
+    """
+    if isinstance(image, np.ndarray):
+        img, decode_scale, orig_size = image, 1.0, (image.shape[1], image.shape[0])
+        if grayscale:
+            img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    else:
+        img, decode_scale, orig_size = decode_image(image, _MAX_PROCESSING_WIDTH, grayscale)
+    if img is None:
+        return None, 1.0, orig_size
+    img, resize_scale = _resize_for_processing(img)
+    return img, decode_scale * resize_scale, orig_size
+
+
+def _median_u8(img: np.ndarray) -> float:
+    """Médiane d'une image uint8 lue sur son histogramme 256 niveaux (= np.median, sans tri)."""
+    cumulative = np.cumsum(cv2.calcHist([img], [0], None, [256], [0, 256]).ravel(), dtype=np.float64)
+    n = int(cumulative[-1])
+    # Valeur de rang k (tri croissant) : premier niveau dont l'effectif cumulé dépasse k
+    lower = int(np.searchsorted(cumulative, (n - 1) // 2, side="right"))
+    upper = int(np.searchsorted(cumulative, n // 2, side="right"))
+    return (lower + upper) / 2.0
+
+
+def _canny_auto(
+    blurred: np.ndarray,
+    sigma: float = 0.33,
+    edges: np.ndarray | None = None,
+) -> np.ndarray:
     """Canny avec seuils calculés automatiquement via la médiane de l'histogramme.
 
     Méthode de Bouchet : lower = median * (1 - sigma), upper = median * (1 + sigma).
     Adapte les seuils à la luminosité réelle de l'image (éclairage de chantier variable).
+
+    Args:
+        edges: buffer de sortie préalloué (même taille que blurred), optionnel.
     """
-    median = float(np.median(blurred))
+    median = _median_u8(blurred)
     lower = int(max(0, (1.0 - sigma) * median))
     upper = int(min(255, (1.0 + sigma) * median))
     # Canny requiert upper > lower — fallback sur valeurs fixes si médiane trop basse
     if upper <= lower or upper < 20:
-        return cv2.Canny(blurred, 30, 100)
-    return cv2.Canny(blurred, lower, upper)
+        return cv2.Canny(blurred, 30, 100, edges=edges)
+    return cv2.Canny(blurred, lower, upper, edges=edges)
 
 
 def detect_card(image_bytes: bytes) -> dict:
@@ -110,58 +264,26 @@ def detect_card(image_bytes: bytes) -> dict:
     Returns:
         {"card_detected": bool, "confidence": float}
     """
-    arr = np.frombuffer(image_bytes, dtype=np.uint8)
-    img = cv2.imdecode(arr, cv2.IMREAD_COLOR)
-    if img is None:
+    # Décodage réduit, directement en niveaux de gris + normalisation résolution
+    with stage("decode"):
+        gray, _, _ = _decode_for_processing(image_bytes, grayscale=True)
+    if gray is None:
         return {"card_detected": False, "confidence": 0.0}
 
-    # Normalisation résolution
-    img, _ = _resize_for_processing(img)
-    image_area = img.shape[0] * img.shape[1]
+    image_area = gray.shape[0] * gray.shape[1]
 
     # Pré-traitement — kernel adapté à la résolution normalisée
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    blurred = cv2.GaussianBlur(gray, (5, 5), 0)
-    edges = _canny_auto(blurred, sigma=0.33)
+    with stage("edges"):
+        context = get_vision_context()
+        blurred = cv2.GaussianBlur(gray, (5, 5), 0, dst=context.buffer("detect_blurred", gray.shape))
+        edges = _canny_auto(blurred, sigma=0.33, edges=context.buffer("detect_edges", gray.shape))
 
     # Contours
-    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-
-    best_confidence = 0.0
-    found = False
-
-    for cnt in contours:
-        perimeter = cv2.arcLength(cnt, True)
-        approx = cv2.approxPolyDP(cnt, 0.02 * perimeter, True)
+    with stage("card"):
+        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        best_confidence, _ = best_card_quad(contours, image_area)
 
-        # Filtre : exactement 4 sommets (quadrilatère)
-        if len(approx) != 4:
-            continue
-
-        area = cv2.contourArea(approx)
-
-        # Filtre : surface minimale (évite les petits artéfacts)
-        if area < _MIN_AREA_FRACTION * image_area:
-            continue
-
-        # Calcul du ratio largeur/hauteur du bounding rect
-        x, y, w, h = cv2.boundingRect(approx)
-        if h == 0:
-            continue
-        ratio = w / h
-        # Accepte les deux orientations (portrait / paysage)
-        ratio_normalized = max(ratio, 1 / ratio)
-
-        if abs(ratio_normalized - _CARD_RATIO) > _RATIO_TOLERANCE:
-            continue
-
-        # Confidence proportionnelle à la surface occupée (cap à 1.0)
-        confidence = min(area / image_area * 10.0, 1.0)
-        if confidence > best_confidence:
-            best_confidence = confidence
-            found = True
-
-    return {"card_detected": found, "confidence": round(best_confidence, 3)}
+    return {"card_detected": best_confidence > 0.0, "confidence": round(best_confidence, 3)}
 
 
 # ── Helpers internes Story 4.1 ────────────────────────────────────────────────
@@ -179,10 +301,60 @@ def _order_points(pts: np.ndarray) -> np.ndarray:
     return rect
 
 
+def _card_quad(
+    gray: np.ndarray,
+    image_area: int,
+    offset: tuple[int, int] = (0, 0),
+    min_area_fraction: float = _MIN_AREA_FRACTION,
+) -> np.ndarray | None:
+    """Flou + Canny + contours sur gray (image entière, niveau de pyramide ou fenêtre) → meilleur quad carte."""
+    context = get_vision_context()
+    blurred = cv2.GaussianBlur(gray, (5, 5), 0, dst=context.buffer("card_blurred", gray.shape))
+    edges = _canny_auto(blurred, sigma=0.33, edges=context.buffer("card_edges", gray.shape))
+    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE, offset=offset)
+    candidates = extract_card_candidates(contours, image_area, min_area_fraction=min_area_fraction)
+    return candidates[0]["quad"] if len(candidates) else None
+
+
+def _coarse_card_window(gray: np.ndarray) -> tuple[int, int, int, int] | None:
+    """Fenêtre (x0, y0, x1, y1) autour de la carte trouvée sur le niveau de pyramide ~_PYRAMID_WIDTH px.
+
+    Returns:
+        None si l'image est déjà à cette largeur (pas de niveau grossier) ou
+        si la carte n'y est pas trouvée.
+    """
+    context = get_vision_context()
+    level, factor = gray, 1
+    while level.shape[1] >= 2 * _PYRAMID_WIDTH:
+        factor *= 2
+        size = ((level.shape[0] + 1) // 2, (level.shape[1] + 1) // 2)
+        level = cv2.pyrDown(level, dst=context.buffer(f"card_pyramid_{factor}", size))
+    if factor == 1:
+        return None
+    # Seuil de surface abaissé : une carte à la limite des 4 % peut y tomber
+    # juste en dessous (quantification) — la fenêtre pleine résolution tranche
+    quad = _card_quad(level, level.shape[0] * level.shape[1], min_area_fraction=_COARSE_MIN_AREA_FRACTION)
+    if quad is None:
+        return None
+
+    h, w = gray.shape
+    pts = quad.astype(np.float32) * factor
+    (x0, y0), (x1, y1) = pts.min(axis=0), pts.max(axis=0)
+    # Marge : imprécision du niveau grossier (quelques px × factor) + bord de la carte
+    pad = _REFINE_PADDING * max(x1 - x0, y1 - y0) + 4 * factor
+    return (
+        max(0, int(x0 - pad)), max(0, int(y0 - pad)),
+        min(w, int(np.ceil(x1 + pad))), min(h, int(np.ceil(y1 + pad))),
+    )
+
+
 def _find_card_corners(img: np.ndarray) -> tuple:
-    """Cherche les 4 coins de la carte bancaire dans l'image.
+    """Cherche les 4 coins de la carte bancaire dans l'image (niveaux de gris ou BGR).
 
     Améliorations :
+      - Recherche grossière sur un niveau de pyramide (~512 px), puis à pleine
+        résolution dans une fenêtre autour du quad trouvé seulement ; image
+        entière si l'une ou l'autre échoue
       - Seuils Canny auto-adaptatifs
       - Raffinement sub-pixel des coins (cornerSubPix) pour homographie précise
 
@@ -192,40 +364,21 @@ def _find_card_corners(img: np.ndarray) -> tuple:
     """
     image_area = img.shape[0] * img.shape[1]
 
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    blurred = cv2.GaussianBlur(gray, (5, 5), 0)
-    edges = _canny_auto(blurred, sigma=0.33)
-    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-
-    best_corners = None
-    best_area = 0.0
-
-    for cnt in contours:
-        perimeter = cv2.arcLength(cnt, True)
-        approx = cv2.approxPolyDP(cnt, 0.02 * perimeter, True)
-
-        if len(approx) != 4:
-            continue
-
-        area = cv2.contourArea(approx)
-        if area < _MIN_AREA_FRACTION * image_area:
-            continue
-
-        x, y, w, h = cv2.boundingRect(approx)
-        if h == 0:
-            continue
-        ratio = w / h
-        ratio_normalized = max(ratio, 1 / ratio)
-
-        if abs(ratio_normalized - _CARD_RATIO) > _RATIO_TOLERANCE:
-            continue
-
-        if area > best_area:
-            best_area = area
-            best_corners = approx.reshape(4, 2).astype(np.float32)
-
-    if best_corners is None:
+    gray = img
+    if img.ndim == 3:
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY, dst=get_vision_context().buffer("card_gray", img.shape[:2]))
+
+    quad = None
+    window = _coarse_card_window(gray)
+    if window is not None:
+        x0, y0, x1, y1 = window
+        quad = _card_quad(gray[y0:y1, x0:x1], image_area, offset=(x0, y0))
+    if quad is None:
+        # Escalade : recherche pleine résolution sur toute l'image
+        quad = _card_quad(gray, image_area)
+    if quad is None:
         return None, True  # calibration_warning
+    best_corners = quad.astype(np.float32)
 
     # ── Raffinement sub-pixel des coins (améliore la précision de l'homographie)
     # cornerSubPix affine chaque coin à ±0.01 px au lieu de ±1 px
@@ -242,7 +395,7 @@ def _find_card_corners(img: np.ndarray) -> tuple:
 
 
 def _detect_joint_contour(img: np.ndarray) -> tuple:
-    """Détecte le contour principal (joint) sur l'image corrigée.
+    """Détecte le contour principal (joint) sur l'image corrigée (niveaux de gris ou BGR).
 
     Améliorations :
       - CLAHE pour égaliser le contraste (éclairage non uniforme sur chantier)
@@ -250,6 +403,7 @@ def _detect_joint_contour(img: np.ndarray) -> tuple:
       - Dilation morphologique pour fermer les lacunes du contour
       - minAreaRect pour mesurer les vraies dimensions (insensible à l'inclinaison)
       - Filtre de taille : exclut les contours < 1 % de l'image (bruit)
+      - approxPolyDP à tolérance en mm (contour_tolerance_mm / 2)
 
     Returns:
         (points: list[list[int]], (width_px: float, height_px: float), holes_raw: list[tuple])
@@ -259,20 +413,23 @@ def _detect_joint_contour(img: np.ndarray) -> tuple:
     h, w = img.shape[:2]
     min_contour_area = 0.01 * h * w  # Ignore les contours < 1 % de l'image
 
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    context = get_vision_context()
+    shape = (h, w)
+    gray = img
+    if img.ndim == 3:
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY, dst=context.buffer("joint_gray", shape))
 
     # CLAHE — égalisation adaptative du contraste local
     # Corrige les zones d'ombre/surexposition sans altérer la géométrie
-    clahe = cv2.createCLAHE(clipLimit=2.5, tileGridSize=(8, 8))
-    enhanced = clahe.apply(gray)
+    enhanced = context.clahe.apply(gray, dst=context.buffer("joint_enhanced", shape))
 
-    blurred = cv2.GaussianBlur(enhanced, (5, 5), 0)
-    edges = _canny_auto(blurred, sigma=0.4)  # sigma légèrement plus large pour le joint
+    blurred = cv2.GaussianBlur(enhanced, (5, 5), 0, dst=context.buffer("joint_blurred", shape))
+    # sigma légèrement plus large pour le joint
+    edges = _canny_auto(blurred, sigma=0.4, edges=context.buffer("joint_edges", shape))
 
     # Dilation morphologique — ferme les lacunes dans le contour du joint
     # (arêtes manquantes dues aux variations de texture du joint)
-    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
-    edges = cv2.dilate(edges, kernel, iterations=1)
+    edges = cv2.dilate(edges, _JOINT_KERNEL, dst=context.buffer("joint_dilated", shape), iterations=1)
 
     contours, hierarchy = cv2.findContours(edges, cv2.RETR_CCOMP, cv2.CHAIN_APPROX_SIMPLE)
 
@@ -291,8 +448,10 @@ def _detect_joint_contour(img: np.ndarray) -> tuple:
 
     largest_idx = max(outer_valid, key=lambda i: cv2.contourArea(contours[i]))
     largest = contours[largest_idx]
-    perimeter = cv2.arcLength(largest, True)
-    approx = cv2.approxPolyDP(largest, 0.01 * perimeter, True)
+    # Simplification à tolérance fixe en mm (moitié de CONTOUR_TOLERANCE_MM, le
+    # reste pour l'ajustement d'arcs du DXF) — et non plus 1 % du périmètre
+    epsilon = settings.contour_tolerance_mm / 2.0 * _SCALE
+    approx = cv2.approxPolyDP(largest, epsilon, True)
     pts = approx.reshape(-1, 2).tolist()
 
     # ── minAreaRect : dimensions réelles indépendantes de l'orientation ──
@@ -309,8 +468,7 @@ def _detect_joint_contour(img: np.ndarray) -> tuple:
             continue
         if cv2.contourArea(cnt) < min_hole_area:
             continue
-        h_perim = cv2.arcLength(cnt, True)
-        h_approx = cv2.approxPolyDP(cnt, 0.01 * h_perim, True)
+        h_approx = cv2.approxPolyDP(cnt, epsilon, True)
         h_pts = h_approx.reshape(-1, 2).tolist()
         (_, _), (h_rw, h_rh), _ = cv2.minAreaRect(cnt)
         holes_raw.append((h_pts, float(max(h_rw, h_rh)), float(min(h_rw, h_rh))))
@@ -318,77 +476,95 @@ def _detect_joint_contour(img: np.ndarray) -> tuple:
     return pts, (width_px, height_px), holes_raw
 
 
+def _card_geometry(ordered: np.ndarray, norm_size: np.ndarray) -> tuple[list, list]:
+    """Géométrie carte en coordonnées normalisées, réutilisée par /submit.
+
+    Args:
+        ordered: coins carte TL, TR, BR, BL (float32 4×2) dans un repère de taille norm_size.
+        norm_size: (largeur, hauteur) de l'image entière dans ce repère.
+
+    Returns:
+        (card_quad normalisé, homographie 3×3 normalisé → carte rectifiée en px)
+    """
+    H = cv2.getPerspectiveTransform(ordered.astype(np.float32), _DST_PTS)
+    H_norm = H @ np.diag([norm_size[0], norm_size[1], 1.0])
+    return (ordered / norm_size).tolist(), (H_norm / H_norm[2, 2]).tolist()
+
+
 # ── API publique Story 4.1 ────────────────────────────────────────────────────
 
 
-def process_image(image_bytes: bytes) -> dict:
+def process_image(image_bytes: bytes | np.ndarray) -> dict:
     """Pipeline complet d'analyse : carte → homographie → perspective → contour joint → dimensions.
 
     Args:
-        image_bytes: contenu brut du fichier JPEG.
+        image_bytes: contenu brut du fichier JPEG, ou tableau BGR déjà décodé (pdf_to_array).
 
     Returns:
         {
             "contour_points": list[list[float]],  # normalisé [0,1] dans l'image originale
             "dimensions": {"width_mm": float, "height_mm": float},
             "calibration_warning": bool,
+            "holes": list[dict],
+            "card_quad": list[list[float]] | None,   # TL, TR, BR, BL normalisés [0,1]
+            "homography": list[list[float]] | None,  # 3×3 : normalisé → carte rectifiée (px)
+            "scale_factor": float,                   # px de traitement par px original
         }
 
     Raises:
         ValueError: si l'image JPEG ne peut pas être décodée.
     """
-    arr = np.frombuffer(image_bytes, dtype=np.uint8)
-    img = cv2.imdecode(arr, cv2.IMREAD_COLOR)
-    if img is None:
-        raise ValueError("Impossible de décoder l'image JPEG.")
-
-    orig_h, orig_w = img.shape[:2]
-
-    # ── Normalisation résolution ──
+    # ── Décodage réduit + normalisation résolution ──
     # Stabilise le comportement quel que soit le capteur (iPhone 17 jusqu'à ~48 MP).
     # On normalise AVANT toute détection, et on retrace les coordonnées en fin de pipeline.
-    proc_img, scale_down = _resize_for_processing(img)
-    proc_h, proc_w = proc_img.shape[:2]
+    # Décodage directement en niveaux de gris : toute l'analyse travaille sur un canal
+    with stage("decode"):
+        proc_img, scale, (orig_w, orig_h) = _decode_for_processing(image_bytes, grayscale=True)
+    if proc_img is None:
+        raise ValueError("Impossible de décoder l'image JPEG.")
+
+    # Taille de l'image originale exprimée en pixels de traitement : un point
+    # proc_img (x, y) vaut (x / scale, y / scale) dans l'originale.
+    norm_size = np.array([orig_w * scale, orig_h * scale], dtype=np.float32)
 
     # Étape 1 : coins de la carte (sur image normalisée)
-    corners, calibration_warning = _find_card_corners(proc_img)
+    with stage("card"):
+        corners, calibration_warning = _find_card_corners(proc_img)
+    if corners is not None:
+        milestone("card_found")
 
     # Étape 2 : correction perspective
-    if corners is not None:
-        ordered = _order_points(corners)
-        dst_pts = np.array(
-            [
-                [0, 0],
-                [_DST_W - 1, 0],
-                [_DST_W - 1, _DST_H - 1],
-                [0, _DST_H - 1],
-            ],
-            dtype=np.float32,
-        )
-        H = cv2.getPerspectiveTransform(ordered, dst_pts)
-        H_inv = np.linalg.inv(H)
-        warped = cv2.warpPerspective(proc_img, H, (_DST_W, _DST_H))
-    else:
-        # Pas de homographie disponible : redimensionnement simple
-        H_inv = None
-        warped = cv2.resize(proc_img, (_DST_W, _DST_H))
+    with stage("warp"):
+        warped = get_vision_context().buffer("warped", (_DST_H, _DST_W))
+        if corners is not None:
+            ordered = _order_points(corners)
+            H = cv2.getPerspectiveTransform(ordered, _DST_PTS)
+            H_inv = np.linalg.inv(H)
+            warped = cv2.warpPerspective(proc_img, H, (_DST_W, _DST_H), dst=warped)
+            card_quad, homography = _card_geometry(ordered, norm_size)
+        else:
+            # Pas de homographie disponible : redimensionnement simple
+            H_inv = None
+            warped = cv2.resize(proc_img, (_DST_W, _DST_H), dst=warped)
+            card_quad = None
+            homography = None
 
     # Étape 3 : détection contour joint sur image corrigée
-    contour_warped, (w_px, h_px), holes_raw = _detect_joint_contour(warped)
+    with stage("contour"):
+        contour_warped, (w_px, h_px), holes_raw = _detect_joint_contour(warped)
 
     # Étape 4 : dimensions en mm
     width_mm = w_px / _SCALE
     height_mm = h_px / _SCALE
 
     # Étape 5 : remappage contour → coordonnées image originale (normalisées)
-    # Les coins ont été détectés sur proc_img (scale_down appliqué).
-    # H_inv ramène en coordonnées proc_img → on divise par proc_img.shape pour normaliser.
+    # Les coins ont été détectés sur proc_img (décodage réduit + resize).
+    # H_inv ramène en coordonnées proc_img → on divise par norm_size (taille originale
+    # × scale) pour normaliser exactement par rapport à l'image originale.
     if H_inv is not None and contour_warped:
         pts_warped = np.array(contour_warped, dtype=np.float32).reshape(-1, 1, 2)
         pts_proc = cv2.perspectiveTransform(pts_warped, H_inv)
-        # Normalisation par les dimensions de proc_img (pas orig pour conserver la cohérence
-        # avec l'homographie calculée sur proc_img)
-        pts_norm = pts_proc.reshape(-1, 2) / np.array([proc_w, proc_h], dtype=np.float32)
+        pts_norm = pts_proc.reshape(-1, 2) / norm_size
         contour_normalized = pts_norm.tolist()
     elif contour_warped:
         # Scaling proportionnel vers l'image originale
@@ -405,7 +581,7 @@ def process_image(image_bytes: bytes) -> dict:
         if H_inv is not None and h_pts:
             pts_w = np.array(h_pts, dtype=np.float32).reshape(-1, 1, 2)
             pts_p = cv2.perspectiveTransform(pts_w, H_inv)
-            h_norm = (pts_p.reshape(-1, 2) / np.array([proc_w, proc_h], dtype=np.float32)).tolist()
+            h_norm = (pts_p.reshape(-1, 2) / norm_size).tolist()
         elif h_pts:
             pts_arr = np.array(h_pts, dtype=np.float32)
             pts_arr[:, 0] /= _DST_W
@@ -427,38 +603,135 @@ def process_image(image_bytes: bytes) -> dict:
         },
         "calibration_warning": calibration_warning,
         "holes": holes_normalized,
+        "card_quad": card_quad,
+        "homography": homography,
+        "scale_factor": round(scale, 6),
     }
 
 
-def generate_contour_png(
-    image_bytes: bytes,
-    contour_points: list[list[float]],
-    width_mm: float = 0.0,
-    height_mm: float = 0.0,
-    holes: list[dict] | None = None,
-) -> bytes:
-    """Génère un PNG annoté : masque carte, contour joint, bounding boxes et dimensions en mm.
+def _resolve_card_quad(
+    card_quad: list[list[float]] | None,
+    homography: list[list[float]] | None,
+) -> np.ndarray | None:
+    """Valide la géométrie carte transmise par le client (issue de process_image()).
 
-    Args:
-        image_bytes: Bytes JPEG de l'image originale.
-        contour_points: Contour du joint normalisé [[x, y], ...] avec x,y ∈ [0,1].
-        width_mm: Largeur du joint en mm (pour l'annotation texte).
-        height_mm: Hauteur du joint en mm (pour l'annotation texte).
-        holes: Liste des trous internes avec leurs contours et dimensions.
+    Le quad seul suffit ; l'homographie seule permet de le reconstruire. Si les
+    deux sont fournis, l'homographie doit projeter le quad sur les coins de la
+    carte rectifiée à _HOMOGRAPHY_TOLERANCE_PX près.
 
     Returns:
-        Bytes JPEG (qualité 100) de l'image pleine résolution avec toutes les annotations OpenCV.
+        Coins normalisés float32 4×2 (TL, TR, BR, BL), ou None si absents/incohérents
+        (l'appelant retombe alors sur la détection).
+    """
+    H = None
+    if homography is not None:
+        try:
+            H = np.array(homography, dtype=np.float64)
+        except (TypeError, ValueError):
+            return None
+        if H.shape != (3, 3) or not np.all(np.isfinite(H)) or abs(np.linalg.det(H)) < 1e-12:
+            return None
+
+    if card_quad is not None:
+        try:
+            quad = np.array(card_quad, dtype=np.float32)
+        except (TypeError, ValueError):
+            return None
+        if quad.shape != (4, 2) or not np.all(np.isfinite(quad)):
+            return None
+    elif H is not None:
+        quad = cv2.perspectiveTransform(
+            _DST_PTS.reshape(-1, 1, 2).astype(np.float64), np.linalg.inv(H)
+        ).reshape(4, 2).astype(np.float32)
+    else:
+        return None
 
-    Raises:
-        ValueError: Si l'image ne peut pas être décodée.
+    if np.any(quad < -_QUAD_BOUNDS_MARGIN) or np.any(quad > 1.0 + _QUAD_BOUNDS_MARGIN):
+        return None
+    if not cv2.isContourConvex(quad.reshape(-1, 1, 2)):
+        return None
+    if cv2.contourArea(quad) < _MIN_AREA_FRACTION:
+        return None
+
+    if H is not None and card_quad is not None:
+        projected = cv2.perspectiveTransform(quad.reshape(-1, 1, 2).astype(np.float64), H)
+        if np.max(np.abs(projected.reshape(4, 2) - _DST_PTS)) > _HOMOGRAPHY_TOLERANCE_PX:
+            return None
+
+    return quad
+
+
+# ── Story 5.2 — profils de rendu du PNG contour ─────────────────────────────
+# Seul endroit où sont fixés les paramètres d'encodage :
+#   - "preview" : largeur plafonnée, JPEG q85 (ou WebP) — affichage et partage
+#   - "archive" : pleine résolution, JPEG q100 — rendu historique, sans dégradation
+RENDER_PROFILES: dict[str, dict] = {
+    "preview": {"max_width": 1600, "jpeg_quality": 85, "webp_quality": 80},
+    "archive": {"max_width": None, "jpeg_quality": 100, "webp_quality": None},
+}
+
+
+def _fit_width(img: np.ndarray, max_width: int | None) -> np.ndarray:
+    """Réduit img à max_width px de large (INTER_AREA) ; inchangée si déjà plus étroite."""
+    h, w = img.shape[:2]
+    if max_width is None or w <= max_width:
+        return img
+    return cv2.resize(img, (max_width, max(1, round(h * max_width / w))), interpolation=cv2.INTER_AREA)
+
+
+def _encode_render(canvas: np.ndarray, profile: str, webp: bool = False) -> tuple[bytes, str]:
+    """Encode un rendu selon RENDER_PROFILES[profile].
+
+    WebP n'est produit que si le profil le propose (webp_quality non None) ;
+    sinon JPEG.
+
+    Returns:
+        (bytes encodés, type MIME)
     """
-    arr = np.frombuffer(image_bytes, dtype=np.uint8)
-    img = cv2.imdecode(arr, cv2.IMREAD_COLOR)
-    if img is None:
-        raise ValueError("Image invalide — impossible de décoder le JPEG.")
+    params = RENDER_PROFILES[profile]
+    if webp and params["webp_quality"] is not None:
+        _, encoded = cv2.imencode(".webp", canvas, [int(cv2.IMWRITE_WEBP_QUALITY), params["webp_quality"]])
+        return encoded.tobytes(), "image/webp"
+    _, encoded = cv2.imencode(".jpg", canvas, [int(cv2.IMWRITE_JPEG_QUALITY), params["jpeg_quality"]])
+    return encoded.tobytes(), "image/jpeg"
 
-    # Annotation sur l'image pleine résolution (zéro dégradation par resize)
-    canvas = img.copy()
+
+def _to_pixels(points: list[list[float]], w: int, h: int) -> np.ndarray:
+    """Points normalisés [[x, y], ...] → tableau int32 N×2 en pixels (troncature, comme int())."""
+    return (np.asarray(points, dtype=np.float64).reshape(-1, 2) * (w, h)).astype(np.int32)
+
+
+def _blend_card_mask(canvas: np.ndarray, card_pts: np.ndarray) -> None:
+    """Masque semi-transparent de la carte, fusionné en place dans son rectangle englobant.
+
+    Hors du polygone la couche masque est identique au canevas : limiter
+    addWeighted au rectangle englobant donne le même rendu qu'en plein cadre,
+    sans copie pleine image.
+    """
+    h_c, w_c = canvas.shape[:2]
+    x, y, bw, bh = cv2.boundingRect(card_pts)
+    x0, y0, x1, y1 = max(x, 0), max(y, 0), min(x + bw, w_c), min(y + bh, h_c)
+    if x1 <= x0 or y1 <= y0:
+        return
+    roi = canvas[y0:y1, x0:x1]
+    mask_layer = roi.copy()
+    cv2.drawContours(mask_layer, [card_pts - (x0, y0)], 0, (50, 200, 80), -1)
+    cv2.addWeighted(roi, 0.78, mask_layer, 0.22, 0, dst=roi)
+
+
+def _annotate(
+    canvas: np.ndarray,
+    quad: np.ndarray | None,
+    contour_points: list[list[float]],
+    width_mm: float,
+    height_mm: float,
+    holes: list[dict] | None,
+) -> np.ndarray:
+    """Trace en place masque carte, contour joint, bounding boxes et dimensions sur canvas.
+
+    quad : coins carte normalisés (TL, TR, BR, BL) ou None (pas de masque).
+    Épaisseurs et polices suivent la résolution de canvas : un rendu preview reste lisible.
+    """
     h_c, w_c = canvas.shape[:2]
 
     # Épaisseur et taille de police adaptées à la résolution
@@ -466,24 +739,14 @@ def generate_contour_png(
     line_thickness = max(2, int(font_scale * 2.5))
 
     # ── Masque semi-transparent sur la carte détectée ──────────────────────
-    # Détection sur image normalisée pour fiabilité, coins remappés en pleine résolution
-    proc_canvas, scale_down = _resize_for_processing(img)
-    corners, _ = _find_card_corners(proc_canvas)
-    if corners is not None:
-        if scale_down < 1.0:
-            corners = corners / scale_down
-        mask_layer = canvas.copy()
-        card_pts = corners.reshape((-1, 1, 2)).astype(np.int32)
-        cv2.drawContours(mask_layer, [card_pts], 0, (50, 200, 80), -1)
-        canvas = cv2.addWeighted(canvas, 0.78, mask_layer, 0.22, 0)
+    if quad is not None:
+        card_pts = (quad * np.array([w_c, h_c], dtype=np.float32)).astype(np.int32).reshape(-1, 1, 2)
+        _blend_card_mask(canvas, card_pts)
         cv2.drawContours(canvas, [card_pts], 0, (50, 220, 80), 2)
 
     # ── Contour principal du joint ──────────────────────────────────────────
     if contour_points:
-        pts = np.array(
-            [[int(pt[0] * w_c), int(pt[1] * h_c)] for pt in contour_points],
-            dtype=np.int32,
-        )
+        pts = _to_pixels(contour_points, w_c, h_c)
         cv2.polylines(canvas, [pts], isClosed=True, color=(0, 255, 0), thickness=line_thickness)
 
         # Bounding box + label dimensions globales
@@ -503,10 +766,7 @@ def generate_contour_png(
             h_h_mm = hole.get("height_mm", 0.0)
             if not h_pts_norm:
                 continue
-            hp = np.array(
-                [[int(pt[0] * w_c), int(pt[1] * h_c)] for pt in h_pts_norm],
-                dtype=np.int32,
-            )
+            hp = _to_pixels(h_pts_norm, w_c, h_c)
             cv2.polylines(canvas, [hp], isClosed=True, color=(0, 120, 255), thickness=max(1, line_thickness - 1))
             if len(hp) >= 2:
                 hx, hy, hw, hh = cv2.boundingRect(hp)
@@ -516,5 +776,120 @@ def generate_contour_png(
                 cv2.putText(canvas, hole_label, (hx, hty), cv2.FONT_HERSHEY_SIMPLEX,
                             font_scale * 0.8, (50, 170, 255), max(1, line_thickness - 1), cv2.LINE_AA)
 
-    _, encoded = cv2.imencode('.jpg', canvas, [int(cv2.IMWRITE_JPEG_QUALITY), 100])
-    return encoded.tobytes()
+    return canvas
+
+
+def render_contour_images(
+    image_bytes: bytes | np.ndarray,
+    contour_points: list[list[float]],
+    width_mm: float = 0.0,
+    height_mm: float = 0.0,
+    holes: list[dict] | None = None,
+    card_quad: list[list[float]] | None = None,
+    homography: list[list[float]] | None = None,
+    profiles: tuple[str, ...] = ("archive",),
+    webp: bool = False,
+) -> dict[str, tuple[bytes, str]]:
+    """Rendus annotés du contour, un par profil demandé (voir RENDER_PROFILES).
+
+    L'image est décodée une seule fois : pleine résolution si "archive" est
+    demandé, sinon décodage JPEG réduit au plus près de la largeur preview.
+    Un tableau BGR (PDF rastérisé) est utilisé tel quel, sans être modifié.
+    Chaque profil est annoté à sa propre résolution (traits et textes lisibles).
+
+    Si la géométrie carte de process_image() est fournie (card_quad et/ou
+    homography) et cohérente, le masque carte est tracé sans relancer la
+    détection ; sinon détection sur l'image normalisée.
+
+    Args:
+        image_bytes: Bytes JPEG de l'image originale, ou tableau BGR (pdf_to_array).
+        contour_points: Contour du joint normalisé [[x, y], ...] avec x,y ∈ [0,1].
+        width_mm: Largeur du joint en mm (pour l'annotation texte).
+        height_mm: Hauteur du joint en mm (pour l'annotation texte).
+        holes: Liste des trous internes avec leurs contours et dimensions.
+        card_quad: Coins carte normalisés (TL, TR, BR, BL) issus de process_image().
+        homography: Homographie normalisé → carte rectifiée issue de process_image().
+        profiles: Profils à produire ("preview", "archive").
+        webp: Encode en WebP les profils qui le proposent (preview).
+
+    Returns:
+        {profil: (bytes encodés, type MIME)} dans l'ordre de `profiles`.
+
+    Raises:
+        ValueError: Profil inconnu, ou image impossible à décoder.
+    """
+    unknown = [p for p in profiles if p not in RENDER_PROFILES]
+    if unknown or not profiles:
+        raise ValueError(f"Profil de rendu inconnu : {', '.join(unknown) or '(aucun)'}.")
+
+    # Buffers appartenant à l'appelant : jamais annotés en place
+    foreign: list[np.ndarray] = []
+    if isinstance(image_bytes, np.ndarray):
+        img = image_bytes
+        foreign.append(img)
+    else:
+        widths = [RENDER_PROFILES[p]["max_width"] for p in profiles]
+        target_width = None if None in widths else max(widths)
+        size = read_image_size(image_bytes) if target_width else None
+        if size is not None:
+            # max_width est un plafond : il suffit que le grand côté décodé l'atteigne
+            # (decode_image raisonne sur le petit côté, à cause de l'orientation EXIF)
+            target_width = -(-target_width * min(size) // max(size))
+        with stage("png_decode"):
+            img, _, _ = decode_image(image_bytes, target_width)
+    if img is None:
+        raise ValueError("Image invalide — impossible de décoder le JPEG.")
+    h_i, w_i = img.shape[:2]
+
+    # Géométrie issue de process_image() si cohérente ; sinon détection sur image
+    # normalisée pour fiabilité, coins ramenés en coordonnées normalisées
+    with stage("png_card"):
+        quad = _resolve_card_quad(card_quad, homography)
+        if quad is None:
+            proc_canvas, scale_down = _resize_for_processing(img)
+            corners, _ = _find_card_corners(proc_canvas)
+            if corners is not None:
+                quad = corners / scale_down / np.array([w_i, h_i], dtype=np.float32)
+
+    # Annotation en place : toutes les bases sont préparées avant de dessiner
+    # (une preview est réduite depuis l'image vierge) et un même buffer ne sert
+    # qu'à un seul profil — l'archive dessine directement sur l'image décodée.
+    bases: dict[str, np.ndarray] = {}
+    with stage("png_resize"):
+        for profile in profiles:
+            base = _fit_width(img, RENDER_PROFILES[profile]["max_width"])
+            shared = any(b is base for b in (*foreign, *bases.values()))
+            bases[profile] = base.copy() if shared else base
+    del img, foreign
+
+    renders: dict[str, tuple[bytes, str]] = {}
+    for profile in profiles:
+        canvas = _annotate(bases.pop(profile), quad, contour_points, width_mm, height_mm, holes)
+        with stage("png_encode"):
+            renders[profile] = _encode_render(canvas, profile, webp)
+    return renders
+
+
+def generate_contour_png(
+    image_bytes: bytes | np.ndarray,
+    contour_points: list[list[float]],
+    width_mm: float = 0.0,
+    height_mm: float = 0.0,
+    holes: list[dict] | None = None,
+    card_quad: list[list[float]] | None = None,
+    homography: list[list[float]] | None = None,
+    profile: str = "archive",
+) -> bytes:
+    """Génère l'image annotée d'un seul profil (par défaut "archive" : JPEG q100 pleine résolution).
+
+    Voir render_contour_images() pour les arguments.
+
+    Returns:
+        Bytes JPEG de l'image annotée au profil demandé.
+
+    Raises:
+        ValueError: Si l'image ne peut pas être décodée.
+    """
+    return render_contour_images(
+        image_bytes, contour_points, width_mm, height_mm, holes, card_quad, homography, (profile,),
+    )[profile][0]
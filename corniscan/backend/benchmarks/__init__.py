@@ -0,0 +1 @@
+"""Benchmarks CorniScan — lancer depuis backend/ : python -m benchmarks.<module>."""
@@ -0,0 +1,91 @@
+"""Benchmark pire cas : extraction des candidats carte sur fond très texturé.
+
+Usage (depuis backend/) :
+    python -m benchmarks.bench_card_candidates [--repeat 20]
+
+Compare la boucle historique contour par contour (arcLength / approxPolyDP /
+contourArea / boundingRect sur chaque contour) à extract_card_candidates()
+(pré-filtre vectorisé + tri + arrêt anticipé), à partir des mêmes contours.
+Le nombre de contours par scène est indiqué : graviers, grillage, bois brut
+en produisent des milliers.
+"""
+
+import argparse
+
+import numpy as np
+import cv2
+
+from app.services.card_candidates import (
+    _CARD_RATIO,
+    _MIN_AREA_FRACTION,
+    _RATIO_TOLERANCE,
+    best_card_quad,
+)
+from app.services.vision_service import _canny_auto
+from benchmarks.common import measure, print_table
+
+# (largeur, hauteur, taille du grain de texture en px)
+_SCENES = {
+    "1080p grain 2px": (1920, 1080, 2),
+    "1080p grain 4px": (1920, 1080, 4),
+    "2048 grain 3px": (2048, 1536, 3),
+}
+
+
+def _legacy_best_quad(contours, image_area: int) -> tuple[float, np.ndarray | None]:
+    """Boucle d'origine de detect_card() / _find_card_corners()."""
+    best_area, best_quad = 0.0, None
+    for cnt in contours:
+        approx = cv2.approxPolyDP(cnt, 0.02 * cv2.arcLength(cnt, True), True)
+        if len(approx) != 4:
+            continue
+        area = cv2.contourArea(approx)
+        if area < _MIN_AREA_FRACTION * image_area:
+            continue
+        _, _, w, h = cv2.boundingRect(approx)
+        if h == 0:
+            continue
+        if abs(max(w / h, h / w) - _CARD_RATIO) > _RATIO_TOLERANCE:
+            continue
+        if area > best_area:
+            best_area, best_quad = area, approx.reshape(4, 2)
+    return min(best_area / image_area * 10.0, 1.0), best_quad
+
+
+def _textured_contours(width: int, height: int, grain: int) -> list:
+    """Contours d'un fond damier aléatoire (pire cas) contenant une carte détourée."""
+    rng = np.random.default_rng(0)
+    cells = rng.integers(0, 2, size=(height // grain, width // grain), dtype=np.uint8) * 200
+    gray = cv2.resize(cells, (width, height), interpolation=cv2.INTER_NEAREST)
+    card_w = int(width * 0.4)
+    x0, y0 = (width - card_w) // 2, height // 4
+    cv2.rectangle(gray, (x0 - 8, y0 - 8), (x0 + card_w + 8, y0 + int(card_w / 1.586) + 8), 0, -1)
+    cv2.rectangle(gray, (x0, y0), (x0 + card_w, y0 + int(card_w / 1.586)), 255, -1)
+    blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+    contours, _ = cv2.findContours(_canny_auto(blurred, sigma=0.33), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    return contours
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = []
+    for label, (w, h, grain) in _SCENES.items():
+        contours = _textured_contours(w, h, grain)
+        legacy, unified = _legacy_best_quad(contours, w * h), best_card_quad(contours, w * h)
+        assert legacy[1] is not None and np.array_equal(legacy[1], unified[1])
+        for name, fn in (("legacy loop", _legacy_best_quad), ("card_candidates", best_card_quad)):
+            rows.append({
+                "scene": label,
+                "contours": len(contours),
+                "function": name,
+                **measure(fn, contours, w * h, repeat=args.repeat),
+            })
+
+    print_table(rows, ["scene", "contours", "function", "p50_ms", "p95_ms", "p99_ms", "alloc_peak_kib"])
+
+
+if __name__ == "__main__":
+    main()
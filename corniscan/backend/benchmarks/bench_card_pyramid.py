@@ -0,0 +1,103 @@
+"""Benchmark de la recherche carte grossière → fine (vision_service._find_card_corners).
+
+Usage (depuis backend/) :
+    python -m benchmarks.bench_card_pyramid [--sizes 2,12,48] [--seeds 3] [--repeat 10] [--json out.json]
+
+Pour chaque scène du corpus (benchmarks.scenes : tailles × graines × largeur
+de carte 35 % / 22 %), décodée à la résolution de traitement, chronomètre
+_find_card_corners() — niveau de pyramide ~512 px puis fenêtre pleine
+résolution — et la référence plein cadre (flou + Canny + contours sur toute
+l'image 2048 px, chemin d'avant la pyramide). Précision : écart max des
+coins à la vérité terrain et entre les deux chemins (px de traitement).
+Une image sans carte mesure le coût de l'escalade (niveau grossier vide →
+plein cadre).
+"""
+
+import argparse
+import sys
+
+import numpy as np
+import cv2
+
+from app.services.card_candidates import extract_card_candidates
+from app.services.vision_service import (
+    _canny_auto,
+    _coarse_card_window,
+    _decode_for_processing,
+    _find_card_corners,
+    _order_points,
+)
+from benchmarks.common import measure, print_table, write_json
+from benchmarks.scenes import make_scene
+
+_COLUMNS = ["scene", "detector", "p50_ms", "p95_ms", "alloc_peak_kib", "coarse_hit", "err_px", "vs_full_px"]
+_CARD_FRACTIONS = (0.35, 0.22)
+
+
+def full_frame_corners(img: np.ndarray) -> tuple:
+    """Référence : recherche carte sur l'image entière à pleine résolution de traitement."""
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    edges = _canny_auto(cv2.GaussianBlur(gray, (5, 5), 0), sigma=0.33)
+    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    candidates = extract_card_candidates(contours, img.shape[0] * img.shape[1])
+    if len(candidates) == 0:
+        return None, True
+    criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.001)
+    corners = cv2.cornerSubPix(
+        gray, candidates[0]["quad"].astype(np.float32).reshape(-1, 1, 2), (11, 11), (-1, -1), criteria,
+    )
+    return corners.reshape(4, 2), False
+
+
+def _error(corners: np.ndarray | None, reference: np.ndarray | None) -> float | str:
+    if corners is None or reference is None:
+        return "-" if corners is None and reference is None else "miss"
+    return round(float(np.hypot(*(_order_points(corners) - reference).T).max()), 3)
+
+
+def bench_image(label: str, img: np.ndarray, truth: np.ndarray | None, repeat: int) -> list[dict]:
+    full, _ = full_frame_corners(img)
+    full = _order_points(full) if full is not None else None
+    coarse_hit = _coarse_card_window(cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)) is not None
+    rows = []
+    for name, fn in (("pyramid", _find_card_corners), ("full frame", full_frame_corners)):
+        corners, _ = fn(img)
+        rows.append({
+            "scene": label, "detector": name, **measure(fn, img, repeat=repeat, warmup=1),
+            "coarse_hit": coarse_hit if name == "pyramid" else "",
+            "err_px": _error(corners, truth), "vs_full_px": _error(corners, full),
+        })
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="2,12,48", help="tailles photo en MP (séparées par des virgules)")
+    parser.add_argument("--seeds", type=int, default=3, help="graines de texture par taille")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--json", help="écrit les résultats dans ce fichier JSON")
+    args = parser.parse_args()
+
+    rows = []
+    for mp in (float(s) for s in args.sizes.split(",") if s):
+        for fraction in _CARD_FRACTIONS:
+            for seed in range(args.seeds):
+                scene = make_scene(mp, seed=seed, card_fraction=fraction)
+                img, _, _ = _decode_for_processing(scene["jpeg"])
+                truth = np.array(scene["truth"]["card_corners"]) * (img.shape[1], img.shape[0])
+                label = f"{mp:g}MP carte {fraction:.0%} #{seed}"
+                print(f"… {label}", file=sys.stderr)
+                rows += bench_image(label, img, truth, args.repeat)
+                del scene
+
+    rng = np.random.default_rng(0)
+    noise = cv2.resize(rng.integers(60, 110, (96, 128), dtype=np.uint8), (2048, 1536), interpolation=cv2.INTER_LINEAR)
+    rows += bench_image("sans carte 2048", cv2.cvtColor(noise, cv2.COLOR_GRAY2BGR), None, args.repeat)
+
+    print_table(rows, _COLUMNS)
+    if args.json:
+        write_json(args.json, rows, sizes=args.sizes, seeds=args.seeds, repeat=args.repeat)
+
+
+if __name__ == "__main__":
+    main()
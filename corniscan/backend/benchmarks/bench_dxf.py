@@ -0,0 +1,105 @@
+"""Benchmark de la génération DXF (dxf_service.generate_dxf_report) face à l'écriture ezdxf complète.
+
+Usage (depuis backend/) :
+    python -m benchmarks.bench_dxf [--vertices 100,1000,10000,50000] [--holes 3] [--repeat 20] [--json out.json]
+
+Pour chaque taille de contour (ellipse bruitée, trous ronds de 64 sommets),
+chronomètre generate_dxf_report() — squelette R2018 pré-écrit, sommets
+formatés en bytes — avec compression à tolérance (arcs, cercles) puis sans
+(--tolerance 0), et la référence ezdxf (ezdxf.new + add_lwpolyline + write
+dans un StringIO, chemin d'avant le squelette). Indique sommets écrits,
+arcs, cercles, écart max et taille du fichier.
+"""
+
+import argparse
+import io
+
+import ezdxf
+import numpy as np
+
+from app.core.config import settings
+from app.services.dxf_service import generate_dxf_report
+from benchmarks.common import measure, print_table, write_json
+
+_COLUMNS = [
+    "vertices", "writer", "p50_ms", "p95_ms", "alloc_peak_kib", "vertices_out", "arcs", "circles", "max_dev_mm",
+    "size_kib",
+]
+
+
+def ezdxf_reference(contour_points, width_mm: float, height_mm: float, holes: list[dict] | None = None) -> bytes:
+    """Référence : document complet construit et écrit par ezdxf à chaque appel."""
+    pts = np.array(contour_points, dtype=float)
+    origin = pts.min(axis=0)
+    extent = np.ptp(pts, axis=0)
+    extent[extent <= 1e-9] = 1.0
+    scale = np.array([width_mm, height_mm]) / extent
+
+    doc = ezdxf.new("R2018")
+    doc.header["$INSUNITS"] = 4
+    msp = doc.modelspace()
+    msp.add_lwpolyline(((pts - origin) * scale).tolist()).closed = True
+    for hole in holes or ():
+        msp.add_lwpolyline(((np.array(hole["contour_points"]) - origin) * scale).tolist()).closed = True
+    stream = io.StringIO()
+    doc.write(stream)
+    return stream.getvalue().encode("utf-8")
+
+
+def _ellipse(vertices: int, center: tuple[float, float], radius: tuple[float, float], seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    angles = np.linspace(0, 2 * np.pi, vertices, endpoint=False)
+    wobble = 1.0 + 0.0002 * rng.standard_normal(vertices)
+    return np.column_stack([
+        center[0] + radius[0] * wobble * np.cos(angles),
+        center[1] + radius[1] * wobble * np.sin(angles),
+    ]).tolist()
+
+
+def bench_contour(vertices: int, holes: int, tolerance: float, repeat: int) -> list[dict]:
+    # Boîte 0.9 × 0.6 → 120 × 80 mm : même échelle en x et y, les trous restent ronds
+    contour = _ellipse(vertices, (0.5, 0.5), (0.45, 0.3))
+    hole_list = [
+        {"contour_points": _ellipse(64, (0.3 + 0.2 * i, 0.5), (0.05, 0.05), seed=i + 1)} for i in range(holes)
+    ]
+    args = (contour, 120.0, 80.0, hole_list)
+    rows = []
+    for name, tol in ((f"compressed {tolerance:g} mm", tolerance), ("exact", 0.0)):
+        _, report = generate_dxf_report(*args, tolerance_mm=tol)
+        stats = measure(generate_dxf_report, *args, tol, repeat=repeat, warmup=2)
+        rows.append({
+            "vertices": vertices, "writer": name, **stats, "vertices_out": report["vertices_out"],
+            "arcs": report["arcs"], "circles": report["circles"], "max_dev_mm": report["max_deviation_mm"],
+            "size_kib": round(report["dxf_bytes"] / 1024, 1),
+        })
+    size_kib = round(len(ezdxf_reference(*args)) / 1024, 1)
+    stats = measure(ezdxf_reference, *args, repeat=repeat, warmup=2)
+    rows.append({
+        "vertices": vertices, "writer": "ezdxf", **stats, "vertices_out": vertices + 64 * holes,
+        "arcs": 0, "circles": 0, "max_dev_mm": 0.0, "size_kib": size_kib,
+    })
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vertices", default="100,1000,10000,50000", help="sommets du contour (séparés par des virgules)")
+    parser.add_argument("--holes", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=settings.contour_tolerance_mm / 2, help="mm")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--json", help="écrit les résultats dans ce fichier JSON")
+    args = parser.parse_args()
+
+    rows = []
+    for vertices in (int(v) for v in args.vertices.split(",") if v):
+        rows += bench_contour(vertices, args.holes, args.tolerance, args.repeat)
+
+    print_table(rows, _COLUMNS)
+    if args.json:
+        write_json(
+            args.json, rows, vertices=args.vertices, holes=args.holes, tolerance=args.tolerance, repeat=args.repeat,
+        )
+
+
+if __name__ == "__main__":
+    main()
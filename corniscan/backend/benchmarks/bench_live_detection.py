@@ -0,0 +1,48 @@
+"""Benchmark détection live : detect_card() (BGR) vs detect_card_live() (niveaux de gris),
+plein cadre et suivi (fenêtre ROI autour du quad de la frame précédente).
+
+Usage (depuis backend/) :
+    python -m benchmarks.bench_live_detection [--repeat 30]
+
+Mesure par frame la latence (p50/p95/p99) et le pic d'allocation tracemalloc
+sur des frames caméra typiques (canvas.toBlob JPEG 60 %) et sur des photos pleine
+résolution.
+"""
+
+import argparse
+
+from app.services.live_detection import detect_card_live
+from app.services.vision_service import detect_card
+from benchmarks.common import make_card_frame, measure, print_table
+
+_FRAMES = {
+    "720p q60": (1280, 720, 60),
+    "1080p q60": (1920, 1080, 60),
+    "12MP q90": (4032, 3024, 90),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    rows = []
+    for label, (w, h, q) in _FRAMES.items():
+        frame = make_card_frame(w, h, quality=q)
+        live = detect_card_live(frame)
+        assert detect_card(frame)["card_detected"] == live["card_detected"]
+        for name, fn in (("detect_card", detect_card), ("detect_card_live", detect_card_live)):
+            rows.append({"frame": label, "function": name, **measure(fn, frame, repeat=args.repeat)})
+        if live["quad"] is not None:
+            rows.append({
+                "frame": label,
+                "function": "detect_card_live roi",
+                **measure(detect_card_live, frame, live["quad"], repeat=args.repeat),
+            })
+
+    print_table(rows, ["frame", "function", "p50_ms", "p95_ms", "p99_ms", "alloc_peak_kib"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""Benchmark par étape du pipeline vision_service + dxf_service.
+
+Usage (depuis backend/) :
+    python -m benchmarks.bench_pipeline [--sizes 2,12] [--holes 3] [--repeat 10] [--runs 3]
+        [--json resultats.json] [--baseline benchmarks/baselines/pipeline.json]
+        [--save-baseline] [--ignore-environment]
+
+Scènes synthétiques déterministes (benchmarks.scenes) : photo carte + joint à N
+trous (--sizes, en MP), plus des PDF (A4 et A0 vectoriels, A4 avec photo
+12 MP embarquée). Chaque étape est chronométrée isolément, sur la sortie de
+l'étape précédente :
+
+    pdf_raster (tableau BGR, sans decode) | decode → resize → find_card_corners → warp → detect_joint_contour
+    → remap → generate_dxf → generate_contour_png (dont encode) ; process_image = total
+
+Pour les PDF, pdf_jpeg_roundtrip mesure l'ancien chemin (rendu 150 DPI → JPEG
+→ décodage) à titre de comparaison, et pdf_vector l'analyse directe des tracés
+vectoriels (pdf_vectors), avec sa précision — sans objet pour un PDF photo.
+
+Latences p50/p95/p99, pic tracemalloc et pic de RSS par étape ; précision
+(erreur coins carte en px, erreur dimensions en mm) sur la ligne process_image.
+Le tout est mesuré --runs fois ; le tableau (et la référence) garde la passe
+médiane de chaque étape. Si une référence existe, une étape régresse quand
+même sa passe la plus rapide reste plus lente que la référence de --tolerance
+et de plus du bruit de mesure (--min-delta ms, ou l'écart p95 − p50 de la
+référence s'il est plus grand) : une passe ralentie par la machine (fréquence
+CPU, cache froid, autre processus) ne fait pas échouer le benchmark ; une
+régression visible sur toutes les passes, si (code de sortie 1). Tailles par
+défaut = celles de la référence enregistrée (2 et 12 MP) ; 48 et 200 MP via
+--sizes, hors garde tant que la référence ne les contient pas (signalé).
+
+La garde n'a de sens qu'à machine égale : si l'environnement enregistré dans
+la référence (machine, CPU, threads OpenCV, versions) diffère de l'environnement
+courant, la comparaison est sautée avec un avertissement (--ignore-environment
+pour comparer quand même). Réenregistrer avec --save-baseline sur la machine
+de CI.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+import cv2
+import fitz  # pymupdf
+
+from app.services.dxf_service import generate_dxf
+from app.services.image_decoder import decode_image
+from app.services.pdf_vectors import analyse_pdf_vectors
+from app.services.vision_service import (
+    _DST_H,
+    _DST_PTS,
+    _DST_W,
+    _MAX_PROCESSING_WIDTH,
+    _detect_joint_contour,
+    _find_card_corners,
+    _order_points,
+    _resize_for_processing,
+    generate_contour_png,
+    pdf_to_array,
+    process_image,
+)
+from benchmarks.common import (
+    compare_to_baseline,
+    environment_mismatch,
+    measure,
+    pick_rows,
+    print_table,
+    write_json,
+)
+from benchmarks.scenes import make_scene, make_scene_pdf
+
+_DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "pipeline.json")
+_COLUMNS = [
+    "scene", "stage", "p50_ms", "p95_ms", "p99_ms", "alloc_peak_kib", "rss_peak_mib",
+    "card_err_px", "width_err_mm", "height_err_mm",
+]
+
+
+def _warp(proc: np.ndarray, corners: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Étape 2 de process_image() : homographie + warpPerspective."""
+    H = cv2.getPerspectiveTransform(_order_points(corners), _DST_PTS)
+    return cv2.warpPerspective(proc, H, (_DST_W, _DST_H)), np.linalg.inv(H)
+
+
+def _remap(contour: list, holes_raw: list, H_inv: np.ndarray, norm_size: np.ndarray) -> list:
+    """Étapes 5-6 de process_image() : contour + trous → coordonnées normalisées."""
+    out = []
+    for pts in [contour] + [h[0] for h in holes_raw]:
+        warped = np.array(pts, dtype=np.float32).reshape(-1, 1, 2)
+        out.append((cv2.perspectiveTransform(warped, H_inv).reshape(-1, 2) / norm_size).tolist())
+    return out
+
+
+def _encode_full(image_bytes: bytes) -> bytes:
+    """Part encodage de generate_contour_png() : JPEG qualité 100 pleine résolution."""
+    img, _, _ = decode_image(image_bytes)
+    return cv2.imencode(".jpg", img, [int(cv2.IMWRITE_JPEG_QUALITY), 100])[1].tobytes()
+
+
+def _pdf_jpeg_roundtrip(pdf: bytes) -> np.ndarray:
+    """Ancien chemin PDF : rendu 150 DPI plafonné, encodage JPEG, puis décodage par le pipeline."""
+    with fitz.open(stream=pdf, filetype="pdf") as doc:
+        page = doc[0]
+        zoom = min(150 / 72, _MAX_PROCESSING_WIDTH / page.rect.width)
+        jpeg = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csRGB).tobytes("jpeg")
+    return decode_image(jpeg, _MAX_PROCESSING_WIDTH)[0]
+
+
+def _accuracy(result: dict, truth: dict, size: tuple[float, float]) -> dict:
+    if result["card_quad"] is None:
+        return {"card_err_px": None, "width_err_mm": None, "height_err_mm": None}
+    err = (np.array(result["card_quad"]) - np.array(truth["card_corners"])) * np.array(size)
+    return {
+        "card_err_px": round(float(np.abs(err).max()), 2),
+        "width_err_mm": round(abs(result["dimensions"]["width_mm"] - truth["width_mm"]), 2),
+        "height_err_mm": round(abs(result["dimensions"]["height_mm"] - truth["height_mm"]), 2),
+    }
+
+
+def bench_scene(
+    label: str, image_bytes: bytes | np.ndarray, truth: dict, size, repeat: int, pdf: bytes | None = None,
+) -> list[dict]:
+    """Chronomètre chaque étape du pipeline sur une scène (PDF : image_bytes = page rastérisée)."""
+    rows = []
+
+    def stage(name: str, fn, *args, **extra) -> None:
+        rows.append({"scene": label, "stage": name, **measure(fn, *args, repeat=repeat, warmup=1), **extra})
+
+    if pdf is not None:
+        stage("pdf_raster", pdf_to_array, pdf)
+        stage("pdf_jpeg_roundtrip", _pdf_jpeg_roundtrip, pdf)
+        vector = analyse_pdf_vectors(pdf)
+        if vector is not None:
+            stage("pdf_vector", analyse_pdf_vectors, pdf, **_accuracy(vector, truth, size))
+        decoded, decode_scale, (orig_w, orig_h) = image_bytes, 1.0, (image_bytes.shape[1], image_bytes.shape[0])
+    else:
+        decoded, decode_scale, (orig_w, orig_h) = decode_image(image_bytes, _MAX_PROCESSING_WIDTH)
+        stage("decode", decode_image, image_bytes, _MAX_PROCESSING_WIDTH)
+    proc, resize_scale = _resize_for_processing(decoded)
+    stage("resize", _resize_for_processing, decoded)
+
+    corners, _ = _find_card_corners(proc)
+    stage("find_card_corners", _find_card_corners, proc)
+    if corners is None:
+        raise SystemExit(f"{label} : carte non détectée — scène invalide")
+
+    warped, H_inv = _warp(proc, corners)
+    stage("warp", _warp, proc, corners)
+    contour, _, holes_raw = _detect_joint_contour(warped)
+    stage("detect_joint_contour", _detect_joint_contour, warped)
+    scale = decode_scale * resize_scale
+    norm_size = np.array([orig_w * scale, orig_h * scale], dtype=np.float32)
+    stage("remap", _remap, contour, holes_raw, H_inv, norm_size)
+
+    result = process_image(image_bytes)
+    stage("process_image", process_image, image_bytes, **_accuracy(result, truth, size))
+
+    dims = result["dimensions"]
+    stage("generate_dxf", generate_dxf, result["contour_points"], dims["width_mm"], dims["height_mm"], result["holes"])
+    stage(
+        "generate_contour_png", generate_contour_png, image_bytes, result["contour_points"],
+        dims["width_mm"], dims["height_mm"], result["holes"], result["card_quad"], result["homography"],
+    )
+    if pdf is None:
+        stage("encode", _encode_full, image_bytes)
+    return rows
+
+
+def bench_all(args) -> list[dict]:
+    """Une passe complète : scènes photo (--sizes) puis PDF."""
+    rows = []
+    for mp in (float(s) for s in args.sizes.split(",") if s):
+        scene = make_scene(mp, holes=args.holes)
+        label = f"photo {mp:g}MP"
+        print(f"… {label} {scene['size'][0]}×{scene['size'][1]}", file=sys.stderr)
+        rows += bench_scene(label, scene["jpeg"], scene["truth"], scene["size"], args.repeat)
+        del scene
+
+    if not args.no_pdf:
+        pdfs = {
+            "pdf A4 vector": make_scene_pdf("A4", holes=args.holes),
+            "pdf A0 vector": make_scene_pdf("A0", holes=args.holes),
+            "pdf A4 photo 12MP": make_scene_pdf("A4", holes=args.holes, photo_megapixels=12),
+        }
+        for label, scene in pdfs.items():
+            print(f"… {label}", file=sys.stderr)
+            page = pdf_to_array(scene["pdf"])
+            size = (page.shape[1], page.shape[0])
+            rows += bench_scene(label, page, scene["truth"], size, args.repeat, pdf=scene["pdf"])
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="2,12", help="tailles photo en MP (séparées par des virgules)")
+    parser.add_argument("--holes", type=int, default=3)
+    parser.add_argument("--no-pdf", action="store_true", help="ignorer les scènes PDF")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--runs", type=int, default=3, help="passes complètes (médiane par étape)")
+    parser.add_argument("--json", help="écrit les résultats dans ce fichier JSON")
+    parser.add_argument("--baseline", default=_DEFAULT_BASELINE, help="référence JSON à comparer")
+    parser.add_argument("--save-baseline", action="store_true", help="remplace la référence par ces résultats")
+    parser.add_argument("--metric", default="p50_ms")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="régression relative tolérée")
+    parser.add_argument("--min-delta", type=float, default=2.0, help="plancher de bruit (ms)")
+    parser.add_argument(
+        "--ignore-environment", action="store_true", help="comparer même si la référence vient d'une autre machine",
+    )
+    args = parser.parse_args()
+
+    runs = []
+    for run in range(1, max(1, args.runs) + 1):
+        print(f"— passe {run}/{args.runs}", file=sys.stderr)
+        runs.append(bench_all(args))
+    rows = pick_rows(runs, ("scene", "stage"), args.metric)
+
+    print_table(rows, _COLUMNS)
+
+    meta = {"sizes": args.sizes, "holes": args.holes, "repeat": args.repeat, "runs": args.runs}
+    if args.json:
+        write_json(args.json, rows, **meta)
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        write_json(args.baseline, rows, **meta)
+        print(f"Référence enregistrée : {args.baseline}")
+        return
+
+    if os.path.exists(args.baseline):
+        mismatch = environment_mismatch(args.baseline)
+        if mismatch and not args.ignore_environment:
+            print(f"\n/!\\ Référence {args.baseline} enregistrée dans un autre environnement :", file=sys.stderr)
+            for line in mismatch:
+                print(f"/!\\   {line}", file=sys.stderr)
+            print("/!\\ Comparaison sautée (--ignore-environment pour forcer).", file=sys.stderr)
+            return
+        with open(args.baseline, encoding="utf-8") as f:
+            covered = {(r["scene"], r["stage"]) for r in json.load(f)["results"]}
+        uncovered = sorted({r["scene"] for r in rows if (r["scene"], r["stage"]) not in covered})
+        if uncovered:
+            print(f"\n/!\\ Hors référence (non comparé) : {', '.join(uncovered)}", file=sys.stderr)
+        regressions = compare_to_baseline(
+            pick_rows(runs, ("scene", "stage"), args.metric, rank="fastest"),
+            args.baseline, ("scene", "stage"), args.metric, args.tolerance, args.min_delta, spread="p95_ms",
+        )
+        if regressions:
+            print(f"\n!!! {len(regressions)} RÉGRESSION(S) vs {args.baseline} :", file=sys.stderr)
+            for line in regressions:
+                print(f"!!!   {line}", file=sys.stderr)
+            sys.exit(1)
+        print(f"\nAucune régression vs {args.baseline} ({args.metric}, tolérance {args.tolerance:.0%}).")
+
+
+if __name__ == "__main__":
+    main()
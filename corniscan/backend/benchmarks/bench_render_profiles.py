@@ -0,0 +1,78 @@
+"""Benchmark des profils de rendu du contour (vision_service.RENDER_PROFILES).
+
+Usage (depuis backend/) :
+    python -m benchmarks.bench_render_profiles [--sizes 12,48] [--holes 3] [--repeat 5] [--json out.json]
+
+Pour chaque scène synthétique (benchmarks.scenes), chronomètre
+render_contour_images() par profil — preview JPEG, preview WebP, archive,
+preview + archive — avec la géométrie carte de process_image() (pas de
+détection), et indique la taille du fichier produit et ses dimensions.
+"""
+
+import argparse
+import sys
+
+import numpy as np
+import cv2
+
+from app.services.vision_service import process_image, render_contour_images
+from benchmarks.common import measure, print_table, write_json
+from benchmarks.scenes import make_scene
+
+# libellé → (profils, webp)
+_VARIANTS = {
+    "preview jpeg": (("preview",), False),
+    "preview webp": (("preview",), True),
+    "archive": (("archive",), False),
+    "preview+archive": (("preview", "archive"), False),
+}
+_COLUMNS = ["scene", "profile", "p50_ms", "p95_ms", "alloc_peak_kib", "rss_peak_mib", "output", "size_kib"]
+
+
+def _describe(renders: dict[str, tuple[bytes, str]]) -> tuple[str, float]:
+    """("1600×1200 webp + 8000×6000 jpeg", taille totale en KiB)."""
+    parts = []
+    for data, media_type in renders.values():
+        h, w = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_UNCHANGED).shape[:2]
+        parts.append(f"{w}×{h} {media_type.split('/')[1]}")
+    return " + ".join(parts), round(sum(len(data) for data, _ in renders.values()) / 1024, 1)
+
+
+def bench_scene(label: str, image_bytes: bytes, repeat: int) -> list[dict]:
+    result = process_image(image_bytes)
+    dims = result["dimensions"]
+    args = (
+        image_bytes, result["contour_points"], dims["width_mm"], dims["height_mm"], result["holes"],
+        result["card_quad"], result["homography"],
+    )
+    rows = []
+    for name, (profiles, webp) in _VARIANTS.items():
+        output, size_kib = _describe(render_contour_images(*args, profiles=profiles, webp=webp))
+        stats = measure(lambda: render_contour_images(*args, profiles=profiles, webp=webp), repeat=repeat, warmup=1)
+        rows.append({"scene": label, "profile": name, **stats, "output": output, "size_kib": size_kib})
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="12,48", help="tailles photo en MP (séparées par des virgules)")
+    parser.add_argument("--holes", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="écrit les résultats dans ce fichier JSON")
+    args = parser.parse_args()
+
+    rows = []
+    for mp in (float(s) for s in args.sizes.split(",") if s):
+        scene = make_scene(mp, holes=args.holes)
+        label = f"photo {mp:g}MP"
+        print(f"… {label} {scene['size'][0]}×{scene['size'][1]}", file=sys.stderr)
+        rows += bench_scene(label, scene["jpeg"], args.repeat)
+        del scene
+
+    print_table(rows, _COLUMNS)
+    if args.json:
+        write_json(args.json, rows, sizes=args.sizes, holes=args.holes, repeat=args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Benchmark de charge du gouverneur de threads OpenCV (thread_governor) sur le pool vision.
+
+Usage (depuis backend/) :
+    python -m benchmarks.bench_thread_governor [--workers 2] [--budget 0] [--clients 1,2,8]
+        [--requests 24] [--size 12] [--json out.json]
+
+Pour chaque mode ("opencv" : réglage OpenCV par défaut, tous les cœurs dans
+chaque worker ; "single" : 1 thread ; "adaptive" : budget réparti entre les
+tâches en cours), un VisionExecutor à --workers processus reçoit --requests
+analyses complètes (process_task, photo de --size MP) envoyées par --clients
+clients en boucle fermée. Latence de bout en bout (file comprise) p50/p99,
+débit et nombres de threads attribués par le gouverneur.
+
+Les écarts n'apparaissent qu'avec plusieurs cœurs : sur une machine à 1 cœur,
+les trois modes sont équivalents (budget = 1).
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+
+from app.core.metrics import vision_opencv_threads
+from app.services.scan_tasks import process_task
+from app.services.thread_governor import MODES, ThreadGovernor, available_cpus
+from app.services.vision_executor import VisionExecutor
+from benchmarks.common import percentile, print_table, write_json
+from benchmarks.scenes import make_scene
+
+_COLUMNS = ["mode", "clients", "requests", "p50_ms", "p99_ms", "req_per_s", "threads"]
+
+
+async def _load(executor: VisionExecutor, jpeg: bytes, clients: int, requests: int) -> tuple[list[float], float]:
+    """clients boucles fermées se partageant `requests` analyses : (latences ms, durée totale s)."""
+    remaining = iter(range(requests))
+    latencies: list[float] = []
+
+    async def client() -> None:
+        for _ in remaining:
+            t0 = time.perf_counter()
+            await executor.run(process_task, jpeg, False)
+            latencies.append((time.perf_counter() - t0) * 1000.0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    return latencies, time.perf_counter() - t0
+
+
+def _decisions(budget: int) -> dict[str, float]:
+    return {str(n): vision_opencv_threads.value(str(n)) for n in range(budget, 0, -1)}
+
+
+async def bench_mode(mode: str, args, jpeg: bytes, client_counts: list[int]) -> list[dict]:
+    governor = ThreadGovernor(mode, args.budget)
+    executor = VisionExecutor(args.workers, queue_size=max(client_counts), governor=governor)
+    executor.start()
+    rows = []
+    try:
+        await executor.run(process_task, jpeg, False)  # workers préchauffés, pyramides et buffers alloués
+        for clients in client_counts:
+            before = _decisions(governor.budget)
+            latencies, elapsed = await _load(executor, jpeg, clients, args.requests)
+            used = {n: v - before[n] for n, v in _decisions(governor.budget).items() if v > before[n]}
+            rows.append({
+                "mode": mode, "clients": clients, "requests": args.requests,
+                "p50_ms": round(percentile(latencies, 50), 1),
+                "p99_ms": round(percentile(latencies, 99), 1),
+                "req_per_s": round(args.requests / elapsed, 2),
+                "threads": " ".join(f"{n}×{int(v)}" for n, v in used.items()) or "-",
+            })
+    finally:
+        executor.shutdown()
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=2, help="processus du pool vision")
+    parser.add_argument("--budget", type=int, default=0, help="cœurs répartis (0 = cœurs disponibles)")
+    parser.add_argument("--clients", default="1,2,8", help="clients concurrents (séparés par des virgules)")
+    parser.add_argument("--requests", type=int, default=24, help="analyses par palier de charge")
+    parser.add_argument("--size", type=float, default=12, help="taille photo en MP")
+    parser.add_argument("--json", help="écrit les résultats dans ce fichier JSON")
+    args = parser.parse_args()
+
+    jpeg = make_scene(args.size)["jpeg"]
+    client_counts = [int(c) for c in args.clients.split(",") if c]
+    rows = []
+    for mode in MODES:
+        print(f"… {mode}", file=sys.stderr)
+        rows += asyncio.run(bench_mode(mode, args, jpeg, client_counts))
+
+    print_table(rows, _COLUMNS)
+    if args.json:
+        write_json(
+            args.json, rows, workers=args.workers, budget=args.budget or available_cpus(),
+            clients=args.clients, requests=args.requests, size=args.size,
+        )
+
+
+if __name__ == "__main__":
+    main()
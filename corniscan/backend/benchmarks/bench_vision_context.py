@@ -0,0 +1,113 @@
+"""Benchmark des buffers de travail par thread (vision_context) et de la médiane par histogramme.
+
+Usage (depuis backend/) :
+    python -m benchmarks.bench_vision_context [--sizes 2,12,48] [--repeat 20] [--json out.json]
+
+Pour chaque scène (benchmarks.scenes), décodée à la résolution de traitement :
+  - médiane Canny : np.median (tri partiel de tous les pixels) contre
+    l'histogramme 256 niveaux (vision_service._median_u8)
+  - contour joint sur la carte rectifiée : chemin d'avant (BGR, cvtColor,
+    createCLAHE, noyau et images intermédiaires alloués à chaque appel)
+    contre _detect_joint_contour() sur le canal gris avec buffers réutilisés
+  - recherche carte : _find_card_corners() sur l'image BGR (cvtColor à chaque
+    appel) contre l'image décodée directement en gris
+alloc_peak_kib = pic d'allocations d'un appel en régime établi ; same =
+résultat identique au chemin d'avant.
+"""
+
+import argparse
+import sys
+
+import numpy as np
+import cv2
+
+from app.core.config import settings
+from app.services.vision_service import (
+    _DST_H,
+    _DST_PTS,
+    _DST_W,
+    _SCALE,
+    _decode_for_processing,
+    _detect_joint_contour,
+    _find_card_corners,
+    _median_u8,
+    _order_points,
+)
+from benchmarks.common import measure, print_table, write_json
+from benchmarks.scenes import make_scene
+
+_COLUMNS = ["scene", "step", "variant", "p50_ms", "p95_ms", "alloc_peak_kib", "same"]
+
+
+def legacy_joint_contour(img: np.ndarray) -> list:
+    """Référence : détection joint d'avant vision_context (contour principal seulement)."""
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    enhanced = cv2.createCLAHE(clipLimit=2.5, tileGridSize=(8, 8)).apply(gray)
+    blurred = cv2.GaussianBlur(enhanced, (5, 5), 0)
+    median = float(np.median(blurred))
+    lower, upper = int(max(0, 0.6 * median)), int(min(255, 1.4 * median))
+    edges = cv2.Canny(blurred, lower, upper) if upper > lower and upper >= 20 else cv2.Canny(blurred, 30, 100)
+    edges = cv2.dilate(edges, cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3)), iterations=1)
+    contours, _ = cv2.findContours(edges, cv2.RETR_CCOMP, cv2.CHAIN_APPROX_SIMPLE)
+    largest = max(contours, key=cv2.contourArea)
+    return cv2.approxPolyDP(largest, settings.contour_tolerance_mm / 2.0 * _SCALE, True).reshape(-1, 2).tolist()
+
+
+def bench_scene(label: str, jpeg: bytes, repeat: int) -> list[dict]:
+    bgr, _, _ = _decode_for_processing(jpeg)
+    gray, _, _ = _decode_for_processing(jpeg, grayscale=True)
+    corners, _ = _find_card_corners(bgr)
+    if corners is None:
+        return []
+    H = cv2.getPerspectiveTransform(_order_points(corners), _DST_PTS)
+    warped_bgr = cv2.warpPerspective(bgr, H, (_DST_W, _DST_H))
+    warped_gray = cv2.cvtColor(warped_bgr, cv2.COLOR_BGR2GRAY)
+    blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+
+    legacy_contour = legacy_joint_contour(warped_bgr)
+    gray_corners, _ = _find_card_corners(gray)
+    steps = (
+        ("median", (
+            ("np.median", lambda: float(np.median(blurred)), True),
+            ("histogram", lambda: _median_u8(blurred), _median_u8(blurred) == float(np.median(blurred))),
+        )),
+        ("joint contour", (
+            ("allocating", lambda: legacy_joint_contour(warped_bgr), True),
+            ("context", lambda: _detect_joint_contour(warped_gray), _detect_joint_contour(warped_gray)[0] == legacy_contour),
+        )),
+        ("card corners", (
+            ("bgr input", lambda: _find_card_corners(bgr), True),
+            ("gray decode", lambda: _find_card_corners(gray), gray_corners is not None
+             and float(np.abs(gray_corners - corners).max()) < 0.5),
+        )),
+    )
+    rows = []
+    for step, variants in steps:
+        for variant, fn, same in variants:
+            rows.append({
+                "scene": label, "step": step, "variant": variant,
+                **measure(fn, repeat=repeat, warmup=2), "same": same,
+            })
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="2,12,48", help="tailles photo en MP (séparées par des virgules)")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--json", help="écrit les résultats dans ce fichier JSON")
+    args = parser.parse_args()
+
+    rows = []
+    for mp in (float(s) for s in args.sizes.split(",") if s):
+        label = f"{mp:g}MP"
+        print(f"… {label}", file=sys.stderr)
+        rows += bench_scene(label, make_scene(mp)["jpeg"], args.repeat)
+
+    print_table(rows, _COLUMNS)
+    if args.json:
+        write_json(args.json, rows, sizes=args.sizes, repeat=args.repeat)
+
+
+if __name__ == "__main__":
+    main()
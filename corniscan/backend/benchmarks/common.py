@@ -0,0 +1,226 @@
+"""Outils partagés des benchmarks : génération de frames, chronométrage, allocations,
+sortie JSON et comparaison à une référence."""
+
+import json
+import os
+import platform
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+import cv2
+
+
+def make_card_frame(width: int, height: int, quality: int = 90, seed: int = 0) -> bytes:
+    """JPEG déterministe : fond texturé + carte bancaire blanche légèrement inclinée."""
+    rng = np.random.default_rng(seed)
+    img = rng.integers(40, 90, size=(height, width, 3), dtype=np.uint8)
+    img = cv2.GaussianBlur(img, (0, 0), 3)
+    card_w = width * 0.4
+    card_h = card_w / 1.586
+    # Inclinaison faible : le filtre ratio porte sur le rectangle englobant
+    box = cv2.boxPoints(((width / 2, height / 2), (card_w, card_h), 2.0)).astype(np.int32)
+    cv2.fillConvexPoly(img, box, (235, 235, 235))
+    _, encoded = cv2.imencode(".jpg", img, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
+    return encoded.tobytes()
+
+
+def percentile(values: list[float], q: float) -> float:
+    return float(np.percentile(np.asarray(values), q)) if values else 0.0
+
+
+def _rss_bytes() -> int:
+    """RSS courant du processus (/proc/self/statm), ou pic ru_maxrss hors Linux."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+class RssSampler:
+    """Pic de RSS pendant un bloc `with`, échantillonné par un thread toutes les `interval` s.
+
+    OpenCV relâche le GIL pendant ses calculs : le thread d'échantillonnage
+    voit donc aussi les buffers natifs temporaires, invisibles pour tracemalloc.
+    """
+
+    def __init__(self, interval: float = 0.002) -> None:
+        self.interval = interval
+        self.baseline = 0
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, _rss_bytes())
+
+    def __enter__(self) -> "RssSampler":
+        self.baseline = self.peak = _rss_bytes()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, _rss_bytes())
+
+    @property
+    def delta_mib(self) -> float:
+        return (self.peak - self.baseline) / (1024.0 * 1024.0)
+
+
+def measure(fn, *args, repeat: int = 30, warmup: int = 3) -> dict:
+    """Exécute fn(*args) `repeat` fois et retourne latences (ms) et allocations par appel.
+
+    Les allocations sont mesurées par tracemalloc (tableaux NumPy retournés par
+    OpenCV inclus) et le pic de RSS par RssSampler dans une seconde passe, pour
+    ne pas fausser les latences.
+    """
+    for _ in range(warmup):
+        fn(*args)
+
+    latencies = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(*args)
+        latencies.append((time.perf_counter() - t0) * 1000.0)
+
+    peaks = []
+    rss_peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(max(3, repeat // 5)):
+            base, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            with RssSampler() as rss:
+                fn(*args)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - base)
+            rss_peaks.append(rss.delta_mib)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "mean_ms": round(float(np.mean(latencies)), 3),
+        "alloc_peak_kib": round(float(np.median(peaks)) / 1024.0, 1),
+        "rss_peak_mib": round(float(np.max(rss_peaks)), 1),
+    }
+
+
+def print_table(rows: list[dict], columns: list[str]) -> None:
+    widths = {c: max(len(c), *(len(str(r.get(c, ""))) for r in rows)) for c in columns}
+    print("  ".join(c.ljust(widths[c]) for c in columns))
+    for r in rows:
+        print("  ".join(str(r.get(c, "")).ljust(widths[c]) for c in columns))
+
+
+def environment() -> dict:
+    """Versions et machine — à joindre à toute sortie JSON (les mesures n'ont de sens qu'à machine égale)."""
+    import fitz  # pymupdf
+    import ezdxf
+
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "pymupdf": fitz.VersionBind,
+        "ezdxf": ezdxf.__version__,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "opencv_threads": cv2.getNumThreads(),
+    }
+
+
+def write_json(path: str, rows: list[dict], **meta) -> None:
+    """Écrit les résultats au format JSON : {"environment", "meta", "results"}."""
+    payload = {"environment": environment(), "meta": meta, "results": rows}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+# Environnement qui doit être identique pour qu'une comparaison de latences ait un sens
+_GATE_ENVIRONMENT_KEYS = ("machine", "cpus", "opencv_threads", "python", "numpy", "opencv", "pymupdf", "ezdxf")
+
+
+def environment_mismatch(baseline_path: str) -> list[str]:
+    """Différences entre l'environnement enregistré dans la référence et l'environnement courant.
+
+    Returns:
+        Messages "clé : référence → courant" (liste vide si identiques).
+    """
+    with open(baseline_path, encoding="utf-8") as f:
+        recorded = json.load(f).get("environment", {})
+    current = environment()
+    return [
+        f"{key} : {recorded.get(key)} → {current.get(key)}"
+        for key in _GATE_ENVIRONMENT_KEYS
+        if recorded.get(key) != current.get(key)
+    ]
+
+
+def pick_rows(
+    runs: list[list[dict]], keys: tuple[str, ...], metric: str = "p50_ms", rank: str = "median",
+) -> list[dict]:
+    """Par clé, la ligne d'une passe choisie selon metric parmi plusieurs passes.
+
+    rank="median" : passe médiane (écarts d'une passe isolée absorbés) ;
+    rank="fastest" : passe la plus rapide — un ralentissement n'y apparaît
+    que s'il touche toutes les passes. Ordre des lignes : celui de la
+    première passe.
+    """
+    by_key: dict[tuple, list[dict]] = {}
+    for rows in runs:
+        for row in rows:
+            by_key.setdefault(tuple(row[k] for k in keys), []).append(row)
+    return [
+        sorted(candidates, key=lambda r: r[metric])[(len(candidates) - 1) // 2 if rank == "median" else 0]
+        for candidates in by_key.values()
+    ]
+
+
+def compare_to_baseline(
+    rows: list[dict],
+    baseline_path: str,
+    keys: tuple[str, ...],
+    metric: str = "p50_ms",
+    tolerance: float = 0.25,
+    min_delta: float = 2.0,
+    spread: str | None = None,
+) -> list[str]:
+    """Compare `rows` à un fichier JSON produit par write_json().
+
+    Une ligne régresse si metric dépasse la référence de plus de `tolerance`
+    (relatif) ET de plus du bruit de mesure : `min_delta` (absolu), relevé à
+    l'écart spread − metric de la référence si elle est plus dispersée
+    (spread="p95_ms" : une étape bruitée tolère son propre bruit).
+    Les lignes absentes de la référence sont ignorées.
+
+    Returns:
+        Messages de régression (liste vide si aucune).
+    """
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {tuple(r[k] for k in keys): r for r in json.load(f)["results"]}
+
+    regressions = []
+    for row in rows:
+        ref = baseline.get(tuple(row[k] for k in keys))
+        if ref is None or metric not in ref:
+            continue
+        current, previous = row[metric], ref[metric]
+        noise = max(min_delta, ref.get(spread, previous) - previous) if spread else min_delta
+        if current > previous * (1.0 + tolerance) and current - previous > noise:
+            label = " / ".join(str(row[k]) for k in keys)
+            regressions.append(f"{label}: {metric} {previous} → {current} (+{(current / previous - 1) * 100:.0f} %)")
+    return regressions
@@ -0,0 +1,150 @@
+"""Scènes synthétiques déterministes pour les benchmarks pipeline : carte + joint à N trous.
+
+Chaque scène connaît sa vérité terrain (coins carte normalisés, dimensions du
+joint en mm) : un benchmark peut ainsi vérifier qu'une optimisation ne dégrade
+pas le résultat, pas seulement qu'elle va plus vite.
+
+Géométrie (repère carte, en mm) : carte 85.6 × 53.98 légèrement inclinée, joint
+sombre _JOINT_W_MM × _JOINT_H_MM centré sur la carte, trous circulaires alignés.
+"""
+
+import math
+
+import numpy as np
+import cv2
+import fitz  # pymupdf
+
+_CARD_W_MM = 85.6
+_CARD_H_MM = 53.98
+_JOINT_W_MM = 60.0
+_JOINT_H_MM = 34.0
+_HOLE_D_MM = 5.0
+_TILT_DEG = 2.0  # le filtre ratio carte porte sur le rectangle englobant
+
+_CARD_COLOR = 235
+_JOINT_COLOR = 35
+
+
+def _joint_polygons_mm(holes: int) -> tuple[np.ndarray, list[tuple[float, float]]]:
+    """Contour du joint (rectangle à coins chanfreinés) et centres des trous, repère carte (mm)."""
+    x0 = (_CARD_W_MM - _JOINT_W_MM) / 2
+    y0 = (_CARD_H_MM - _JOINT_H_MM) / 2
+    x1, y1, c = x0 + _JOINT_W_MM, y0 + _JOINT_H_MM, 3.0
+    outline = np.array(
+        [[x0 + c, y0], [x1 - c, y0], [x1, y0 + c], [x1, y1 - c],
+         [x1 - c, y1], [x0 + c, y1], [x0, y1 - c], [x0, y0 + c]],
+        dtype=np.float64,
+    )
+    step = _JOINT_W_MM / (holes + 1)
+    centers = [(x0 + step * (i + 1), _CARD_H_MM / 2) for i in range(holes)]
+    return outline, centers
+
+
+def _card_to_image(width: int, height: int, card_fraction: float) -> np.ndarray:
+    """Matrice affine 2×3 repère carte (mm) → image (px) : carte centrée, inclinée de _TILT_DEG."""
+    px_per_mm = width * card_fraction / _CARD_W_MM
+    a = math.radians(_TILT_DEG)
+    cos, sin = math.cos(a) * px_per_mm, math.sin(a) * px_per_mm
+    cx, cy = _CARD_W_MM / 2, _CARD_H_MM / 2
+    return np.array(
+        [[cos, -sin, width / 2 - (cos * cx - sin * cy)],
+         [sin, cos, height / 2 - (sin * cx + cos * cy)]],
+        dtype=np.float64,
+    )
+
+
+def _apply(affine: np.ndarray, pts_mm: np.ndarray) -> np.ndarray:
+    return pts_mm @ affine[:, :2].T + affine[:, 2]
+
+
+def _truth(affine: np.ndarray, width: int, height: int, holes: int) -> dict:
+    card_mm = np.array([[0, 0], [_CARD_W_MM, 0], [_CARD_W_MM, _CARD_H_MM], [0, _CARD_H_MM]])
+    corners = _apply(affine, card_mm) / (width, height)
+    return {
+        "card_corners": corners.round(5).tolist(),  # TL, TR, BR, BL normalisés
+        "width_mm": _JOINT_W_MM,
+        "height_mm": _JOINT_H_MM,
+        "holes": holes,
+    }
+
+
+def make_scene(
+    megapixels: float, holes: int = 3, seed: int = 0, quality: int = 90, card_fraction: float = 0.35,
+) -> dict:
+    """Photo JPEG 4:3 de `megapixels` MP : fond texturé, carte, joint à `holes` trous.
+
+    card_fraction : largeur de la carte rapportée à celle de la photo.
+
+    Returns:
+        {"jpeg": bytes, "size": (w, h), "truth": {"card_corners", "width_mm", "height_mm", "holes"}}
+    """
+    width = int(round(math.sqrt(megapixels * 1e6 * 4 / 3)))
+    height = int(round(width * 3 / 4))
+
+    # Texture générée en basse résolution puis agrandie (déterministe, rapide même à 200 MP)
+    rng = np.random.default_rng(seed)
+    texture = rng.integers(60, 110, size=(max(2, height // 16), max(2, width // 16)), dtype=np.uint8)
+    gray = cv2.resize(texture, (width, height), interpolation=cv2.INTER_LINEAR)
+
+    affine = _card_to_image(width, height, card_fraction=card_fraction)
+    card_mm = np.array([[0, 0], [_CARD_W_MM, 0], [_CARD_W_MM, _CARD_H_MM], [0, _CARD_H_MM]])
+    outline_mm, centers_mm = _joint_polygons_mm(holes)
+    px_per_mm = math.hypot(affine[0, 0], affine[1, 0])
+
+    shift = 4  # sous-pixel : coordonnées en 1/16 px
+    def to_px(pts_mm: np.ndarray) -> np.ndarray:
+        return np.round(_apply(affine, pts_mm) * (1 << shift)).astype(np.int32)
+
+    cv2.fillPoly(gray, [to_px(card_mm)], _CARD_COLOR, cv2.LINE_AA, shift)
+    cv2.fillPoly(gray, [to_px(outline_mm)], _JOINT_COLOR, cv2.LINE_AA, shift)
+    for center in to_px(np.array(centers_mm).reshape(-1, 2)):
+        radius = int(round(_HOLE_D_MM / 2 * px_per_mm * (1 << shift)))
+        cv2.circle(gray, tuple(int(v) for v in center), radius, _CARD_COLOR, -1, cv2.LINE_AA, shift)
+
+    img = cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+    del gray
+    _, encoded = cv2.imencode(".jpg", img, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
+    return {"jpeg": encoded.tobytes(), "size": (width, height), "truth": _truth(affine, width, height, holes)}
+
+
+# Formats de page PDF (points typographiques, portrait)
+PAGE_FORMATS = {"A4": (595.0, 842.0), "A0": (2384.0, 3370.0)}
+
+
+def make_scene_pdf(page_format: str = "A4", holes: int = 3, photo_megapixels: float | None = None) -> dict:
+    """PDF d'une page : scène vectorielle, ou photo JPEG embarquée si photo_megapixels.
+
+    Returns:
+        {"pdf": bytes, "size": (w_pt, h_pt), "truth": {...}} — coins normalisés sur la page.
+    """
+    page_w, page_h = PAGE_FORMATS[page_format]
+    doc = fitz.open()
+    page = doc.new_page(width=page_w, height=page_h)
+
+    if photo_megapixels is not None:
+        scene = make_scene(photo_megapixels, holes=holes)
+        img_w, img_h = scene["size"]
+        # Photo 4:3 centrée en pleine largeur
+        rect_h = page_w * img_h / img_w
+        top = (page_h - rect_h) / 2
+        page.insert_image(fitz.Rect(0, top, page_w, top + rect_h), stream=scene["jpeg"])
+        corners = np.array(scene["truth"]["card_corners"]) * (page_w, rect_h) + (0, top)
+        truth = {**scene["truth"], "card_corners": (corners / (page_w, page_h)).round(5).tolist()}
+    else:
+        affine = _card_to_image(int(page_w), int(page_h), card_fraction=0.35)
+        card_mm = np.array([[0, 0], [_CARD_W_MM, 0], [_CARD_W_MM, _CARD_H_MM], [0, _CARD_H_MM]])
+        outline_mm, centers_mm = _joint_polygons_mm(holes)
+        px_per_mm = math.hypot(affine[0, 0], affine[1, 0])
+        gray = (80 / 255, 80 / 255, 80 / 255)
+        page.draw_rect(page.rect, color=gray, fill=gray)
+        card = (_CARD_COLOR / 255,) * 3
+        joint = (_JOINT_COLOR / 255,) * 3
+        page.draw_polyline([tuple(p) for p in _apply(affine, card_mm)], color=card, fill=card, closePath=True)
+        page.draw_polyline([tuple(p) for p in _apply(affine, outline_mm)], color=joint, fill=joint, closePath=True)
+        for center in _apply(affine, np.array(centers_mm).reshape(-1, 2)):
+            page.draw_circle(tuple(center), _HOLE_D_MM / 2 * px_per_mm, color=card, fill=card)
+        truth = _truth(affine, int(page_w), int(page_h), holes)
+
+    pdf = doc.tobytes()
+    doc.close()
+    return {"pdf": pdf, "size": (page_w, page_h), "truth": truth}
@@ -1,9 +1,14 @@
 """Fixtures partagées pour les tests CorniScan."""
 
-import pytest
-from fastapi.testclient import TestClient
+import os
 
-from app.main import app
+# Pipeline vision dans un pool de threads : les monkeypatch des services restent visibles
+os.environ.setdefault("VISION_WORKERS", "0")
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
 
 
 @pytest.fixture
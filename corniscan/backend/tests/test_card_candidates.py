@@ -0,0 +1,93 @@
+"""Tests extraction des quadrilatères candidats — card_candidates.extract_card_candidates()."""
+
+import numpy as np
+import cv2
+
+
+def _edges(img: np.ndarray) -> list:
+    from app.services.vision_service import _canny_auto
+
+    blurred = cv2.GaussianBlur(cv2.cvtColor(img, cv2.COLOR_BGR2GRAY), (5, 5), 0)
+    contours, _ = cv2.findContours(_canny_auto(blurred, sigma=0.33), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    return contours
+
+
+def _textured_scene(with_card: bool = True, seed: int = 0) -> np.ndarray:
+    """Fond très texturé (milliers de petits contours) + deux cartes de tailles différentes."""
+    rng = np.random.default_rng(seed)
+    img = (rng.integers(0, 2, size=(120, 160), dtype=np.uint8) * 200).astype(np.uint8)
+    img = cv2.resize(img, (640, 480), interpolation=cv2.INTER_NEAREST)
+    img = cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+    if with_card:
+        for x0, y0, w in ((40, 40, 300), (400, 300, 190)):
+            cv2.rectangle(img, (x0 - 6, y0 - 6), (x0 + w + 6, y0 + int(w / 1.586) + 6), (0, 0, 0), -1)
+            cv2.rectangle(img, (x0, y0), (x0 + w, y0 + int(w / 1.586)), (255, 255, 255), -1)
+    return img
+
+
+def test_extract_returns_structured_candidates_sorted_by_area() -> None:
+    """Deux cartes → deux candidats (quad, area, ratio, score), le plus grand en premier."""
+    from app.services.card_candidates import CANDIDATE_DTYPE, extract_card_candidates
+
+    contours = _edges(_textured_scene())
+    candidates = extract_card_candidates(contours, 640 * 480, exhaustive=True)
+
+    assert candidates.dtype == CANDIDATE_DTYPE
+    assert len(candidates) == 2
+    assert candidates["area"][0] > candidates["area"][1]
+    assert np.all(np.abs(candidates["ratio"] - 1.586) < 0.12)
+    assert np.all((candidates["score"] > 0.0) & (candidates["score"] <= 1.0))
+    assert candidates["quad"].shape == (2, 4, 2)
+
+
+def test_early_stop_keeps_the_same_best_candidate() -> None:
+    """Arrêt anticipé → même meilleur candidat que l'examen exhaustif, moins de candidats."""
+    from app.services.card_candidates import extract_card_candidates
+
+    contours = _edges(_textured_scene())
+    exhaustive = extract_card_candidates(contours, 640 * 480, exhaustive=True)
+    early = extract_card_candidates(contours, 640 * 480)
+
+    assert len(early) == 1
+    assert np.array_equal(early[0]["quad"], exhaustive[0]["quad"])
+    assert early[0]["area"] == exhaustive[0]["area"]
+
+
+def test_extract_matches_reference_loop() -> None:
+    """Même résultat que la boucle contour par contour historique (plus grand quad au ratio carte)."""
+    from app.services.card_candidates import (
+        _CARD_RATIO,
+        _MIN_AREA_FRACTION,
+        _RATIO_TOLERANCE,
+        best_card_quad,
+    )
+
+    for seed in range(3):
+        contours = _edges(_textured_scene(seed=seed))
+        image_area = 640 * 480
+        best_area, best_quad = 0.0, None
+        for cnt in contours:
+            approx = cv2.approxPolyDP(cnt, 0.02 * cv2.arcLength(cnt, True), True)
+            if len(approx) != 4:
+                continue
+            area = cv2.contourArea(approx)
+            _, _, w, h = cv2.boundingRect(approx)
+            if area < _MIN_AREA_FRACTION * image_area or h == 0:
+                continue
+            if abs(max(w / h, h / w) - _CARD_RATIO) > _RATIO_TOLERANCE:
+                continue
+            if area > best_area:
+                best_area, best_quad = area, approx.reshape(4, 2)
+
+        confidence, quad = best_card_quad(contours, image_area)
+        assert np.array_equal(quad, best_quad)
+        assert confidence == min(best_area / image_area * 10.0, 1.0)
+
+
+def test_extract_without_card_or_contours() -> None:
+    """Fond texturé seul ou liste vide → tableau vide, (0.0, None)."""
+    from app.services.card_candidates import best_card_quad, extract_card_candidates
+
+    assert len(extract_card_candidates(_edges(_textured_scene(with_card=False)), 640 * 480)) == 0
+    assert len(extract_card_candidates((), 640 * 480)) == 0
+    assert best_card_quad((), 640 * 480) == (0.0, None)
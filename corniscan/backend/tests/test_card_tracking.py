@@ -0,0 +1,160 @@
+"""Tests suivi carte entre frames live — card_tracking + LiveCardDetector.detect(roi=...)."""
+
+import io
+
+import numpy as np
+import cv2
+from fastapi.testclient import TestClient
+
+from tests.test_scan import _auth_header, _make_jpeg, _make_jpeg_with_card
+
+
+def _jpeg_with_card_at(x0: int, y0: int, width: int = 640, height: int = 480) -> bytes:
+    img = np.zeros((height, width, 3), dtype=np.uint8)
+    cv2.rectangle(img, (x0, y0), (x0 + 240, y0 + 151), (255, 255, 255), -1)
+    _, encoded = cv2.imencode(".jpg", img)
+    return encoded.tobytes()
+
+
+# ── LiveCardDetector.detect(roi=...) ─────────────────────────────────────────
+
+
+def test_detect_returns_normalised_quad() -> None:
+    """Carte détectée → quad normalisé [0, 1] autour de la carte, recherche plein cadre."""
+    from app.services.live_detection import LiveCardDetector
+
+    result = LiveCardDetector().detect(_make_jpeg_with_card())
+
+    assert result["roi"] is False
+    quad = np.array(result["quad"])
+    assert quad.shape == (4, 2)
+    assert np.all((quad >= 0.0) & (quad <= 1.0))
+    assert abs(quad[:, 0].min() - 0.25) < 0.02
+
+
+def test_detect_with_roi_matches_full_frame() -> None:
+    """Recherche dans la fenêtre ROI → même verdict et même quad qu'en plein cadre."""
+    from app.services.live_detection import LiveCardDetector
+
+    detector = LiveCardDetector()
+    full = detector.detect(_make_jpeg_with_card())
+    tracked = detector.detect(_make_jpeg_with_card(), roi=full["quad"])
+
+    assert tracked["roi"] is True
+    assert tracked["card_detected"] is True
+    assert np.allclose(tracked["quad"], full["quad"], atol=0.01)
+    assert abs(tracked["confidence"] - full["confidence"]) < 0.05
+
+
+def test_detect_with_roi_follows_small_motion() -> None:
+    """Carte légèrement déplacée entre deux frames → toujours trouvée dans la fenêtre ROI."""
+    from app.services.live_detection import LiveCardDetector
+
+    detector = LiveCardDetector()
+    previous = detector.detect(_jpeg_with_card_at(200, 160))
+    moved = detector.detect(_jpeg_with_card_at(230, 175), roi=previous["quad"])
+
+    assert moved["roi"] is True
+    assert moved["card_detected"] is True
+
+
+def test_detect_falls_back_to_full_frame_on_roi_miss() -> None:
+    """Carte sortie de la fenêtre ROI → recherche plein cadre."""
+    from app.services.live_detection import LiveCardDetector
+
+    detector = LiveCardDetector()
+    previous = detector.detect(_jpeg_with_card_at(20, 20))
+    far = detector.detect(_jpeg_with_card_at(380, 310), roi=previous["quad"])
+
+    assert far["roi"] is False
+    assert far["card_detected"] is True
+
+
+def test_detect_ignores_invalid_roi() -> None:
+    """ROI mal formée → recherche plein cadre sans exception."""
+    from app.services.live_detection import LiveCardDetector
+
+    result = LiveCardDetector().detect(_make_jpeg_with_card(), roi=[[0.1, "x"]])
+
+    assert result["roi"] is False
+    assert result["card_detected"] is True
+
+
+# ── TrackingState / CardTrackerRegistry ──────────────────────────────────────
+
+
+def test_tracking_state_forces_periodic_full_frame_refresh() -> None:
+    """Après refresh_every frames suivies → plus de ROI pour la frame suivante."""
+    from app.services.card_tracking import TrackingState
+
+    state = TrackingState(refresh_every=2)
+    quad = [[0.1, 0.1], [0.5, 0.1], [0.5, 0.4], [0.1, 0.4]]
+    assert state.roi_hint() is None
+
+    state.update(quad, used_roi=False)
+    assert state.roi_hint() == quad
+    state.update(quad, used_roi=True)
+    assert state.roi_hint() == quad
+    state.update(quad, used_roi=True)
+    assert state.roi_hint() is None
+
+    state.update(quad, used_roi=False)
+    assert state.roi_hint() == quad
+    state.update(None, used_roi=False)
+    assert state.roi_hint() is None
+
+
+def test_registry_expires_idle_sessions() -> None:
+    """Session sans frame depuis plus de ttl_seconds → état oublié."""
+    from app.services.card_tracking import CardTrackerRegistry
+
+    now = [0.0]
+    registry = CardTrackerRegistry(ttl_seconds=30.0, refresh_every=10, clock=lambda: now[0])
+    registry.get("alice:").update([[0.1, 0.1]] * 4, used_roi=False)
+    registry.get("bob:")
+
+    now[0] = 20.0
+    assert registry.get("alice:").quad is not None
+    now[0] = 45.0
+    assert len(registry) == 2
+    assert registry.get("alice:").quad is not None
+    now[0] = 80.0
+    assert registry.get("alice:").quad is None
+    assert len(registry) == 1
+
+
+# ── POST /detect-card ────────────────────────────────────────────────────────
+
+
+def test_detect_card_endpoint_tracks_session(client: TestClient) -> None:
+    """Frames successives d'une session → quad mémorisé, contrat public inchangé."""
+    from app.services.card_tracking import card_trackers
+
+    card_trackers.clear()
+    headers = {**_auth_header(), "X-Scan-Session": "cam-1"}
+    for frame, expected in ((_make_jpeg_with_card(), True), (_make_jpeg_with_card(), True), (_make_jpeg(), False)):
+        response = client.post(
+            "/api/v1/scan/detect-card",
+            files={"file": ("frame.jpg", io.BytesIO(frame), "image/jpeg")},
+            headers=headers,
+        )
+        assert response.status_code == 200
+        assert response.json()["card_detected"] is expected
+        assert set(response.json()) == {"card_detected", "confidence"}
+        assert (card_trackers.get("alice:cam-1").quad is not None) is expected
+    card_trackers.clear()
+
+
+def test_detect_card_endpoint_without_session_header_does_not_track(client: TestClient) -> None:
+    """Sans X-Scan-Session → aucun état partagé entre les appareils d'un même utilisateur."""
+    from app.services.card_tracking import card_trackers
+
+    card_trackers.clear()
+    response = client.post(
+        "/api/v1/scan/detect-card",
+        files={"file": ("frame.jpg", io.BytesIO(_make_jpeg_with_card()), "image/jpeg")},
+        headers=_auth_header(),
+    )
+
+    assert response.json()["card_detected"] is True
+    assert len(card_trackers) == 0
@@ -0,0 +1,97 @@
+"""Tests WS /api/v1/scan/detect-card/ws — détection carte live en flux."""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.core.security import create_access_token
+from tests.test_scan import _make_jpeg, _make_jpeg_with_card
+
+_WS_URL = "/api/v1/scan/detect-card/ws"
+
+
+def _token() -> str:
+    return create_access_token({"sub": "alice", "role": "operator", "force_password_change": False})
+
+
+def test_ws_authenticates_then_answers_each_frame(client: TestClient) -> None:
+    """Token valide → ack puis une réponse par frame, même contrat que le POST."""
+    with client.websocket_connect(_WS_URL) as ws:
+        ws.send_json({"token": _token()})
+        assert ws.receive_json() == {"authenticated": True}
+
+        ws.send_bytes(_make_jpeg_with_card())
+        detected = ws.receive_json()
+        ws.send_bytes(_make_jpeg())
+        blank = ws.receive_json()
+
+    assert detected["card_detected"] is True
+    assert detected["confidence"] > 0.0
+    assert blank["card_detected"] is False
+    assert blank["frame"] > detected["frame"]
+
+
+@pytest.mark.parametrize("first_message", ['{"token": "invalid"}', "not-json", '{"no_token": 1}'])
+def test_ws_rejects_invalid_authentication(client: TestClient, first_message: str) -> None:
+    """Premier message sans token valide → fermeture 1008."""
+    with client.websocket_connect(_WS_URL) as ws:
+        ws.send_text(first_message)
+        with pytest.raises(WebSocketDisconnect) as exc_info:
+            ws.receive_json()
+
+    assert exc_info.value.code == 1008
+
+
+def test_ws_rejects_binary_before_authentication(client: TestClient) -> None:
+    """Frame envoyée avant le token → fermeture 1008."""
+    with client.websocket_connect(_WS_URL) as ws:
+        ws.send_bytes(_make_jpeg())
+        with pytest.raises(WebSocketDisconnect) as exc_info:
+            ws.receive_json()
+
+    assert exc_info.value.code == 1008
+
+
+def test_ws_invalid_frame_is_answered_not_detected(client: TestClient) -> None:
+    """Frame non JPEG → card_detected = False, la session continue."""
+    with client.websocket_connect(_WS_URL) as ws:
+        ws.send_json({"token": _token()})
+        ws.receive_json()
+        ws.send_bytes(b"not-an-image")
+        assert ws.receive_json()["card_detected"] is False
+        ws.send_bytes(_make_jpeg_with_card())
+        assert ws.receive_json()["card_detected"] is True
+
+
+def test_ws_unexpected_error_closes_with_1011(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Erreur inattendue du pool vision → fermeture 1011 au lieu d'une session muette."""
+    from app.services.vision_executor import vision_executor
+
+    async def failing_run(*args):
+        raise RuntimeError("worker mort")
+
+    monkeypatch.setattr(vision_executor, "run", failing_run)
+    with client.websocket_connect(_WS_URL) as ws:
+        ws.send_json({"token": _token()})
+        ws.receive_json()
+        ws.send_bytes(_make_jpeg_with_card())
+        with pytest.raises(WebSocketDisconnect) as exc_info:
+            ws.receive_json()
+
+    assert exc_info.value.code == 1011
+
+
+async def test_latest_frame_slot_keeps_only_newest_frame() -> None:
+    """Frames arrivées pendant une analyse → seule la plus récente est retenue."""
+    from app.routers.scan import _LatestFrameSlot
+
+    slot = _LatestFrameSlot()
+    for frame in (b"f1", b"f2", b"f3"):
+        slot.put(frame)
+
+    assert await slot.take() == (3, b"f3")
+    assert slot.dropped == 2
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(slot.take(), 0.05)
@@ -76,3 +76,118 @@ def test_generate_dxf_works_with_3_points() -> None:
 
     result = generate_dxf([[0.0, 0.0], [1.0, 0.0], [0.5, 1.0]], width_mm=10.0, height_mm=10.0)
     assert isinstance(result, bytes)
+
+
+def test_generate_dxf_writes_holes_with_unique_handles() -> None:
+    """Trous → une LWPOLYLINE fermée chacun ; handles uniques, $HANDSEED au-delà, audit ezdxf sans erreur."""
+    from app.services.dxf_service import generate_dxf
+
+    holes = [
+        {"contour_points": [[0.3, 0.3], [0.4, 0.3], [0.35, 0.4]]},
+        {"contour_points": [[0.5, 0.5], [0.6, 0.5]]},  # < 3 points : ignoré
+        {"contour_points": [[0.6, 0.6], [0.7, 0.6], [0.7, 0.7], [0.6, 0.7]]},
+    ]
+    doc = _parse_dxf(generate_dxf(CONTOUR_4PTS, width_mm=30.5, height_mm=20.0, holes=holes))
+    polylines = [e for e in doc.modelspace() if e.dxftype() == "LWPOLYLINE"]
+    handles = [int(e.dxf.handle, 16) for e in polylines]
+
+    assert [len(e) for e in polylines] == [4, 3, 4]
+    assert all(e.is_closed for e in polylines)
+    assert len(set(handles)) == 3
+    assert int(doc.header["$HANDSEED"], 16) > max(handles)
+    assert not doc.audit().has_errors
+
+
+def test_generate_dxf_matches_ezdxf_coordinates() -> None:
+    """Sans compression : sommets identiques (à 1e-6 mm près) à ceux d'un document construit par ezdxf."""
+    import numpy as np
+
+    from app.services.dxf_service import generate_dxf
+
+    angles = np.linspace(0, 2 * np.pi, 500, endpoint=False)
+    contour = np.column_stack([0.5 + 0.4 * np.cos(angles), 0.5 + 0.3 * np.sin(angles)])
+    width_mm, height_mm = 82.0, 41.5
+
+    polyline = next(iter(_parse_dxf(generate_dxf(contour.tolist(), width_mm, height_mm, tolerance_mm=0)).modelspace()))
+    expected = (contour - contour.min(axis=0)) / np.ptp(contour, axis=0) * [width_mm, height_mm]
+
+    np.testing.assert_allclose(np.array(polyline.get_points("xy")), expected, atol=1e-6)
+
+
+def _circle_points(cx: float, cy: float, r: float, n: int) -> list[list[float]]:
+    import numpy as np
+
+    angles = np.linspace(0, 2 * np.pi, n, endpoint=False)
+    return np.column_stack([cx + r * np.cos(angles), cy + r * np.sin(angles)]).tolist()
+
+
+def test_generate_dxf_report_fits_arcs_and_circle_holes() -> None:
+    """Joint rond → quelques arcs (bulges) dans la tolérance ; trou rond → CIRCLE ; rapport cohérent."""
+    import numpy as np
+
+    from app.services.dxf_service import generate_dxf_report
+
+    contour = _circle_points(0.5, 0.5, 0.5, 720)
+    holes = [{"contour_points": _circle_points(0.5, 0.5, 0.1, 120)}]
+
+    dxf_bytes, report = generate_dxf_report(contour, 100.0, 100.0, holes, tolerance_mm=0.05)
+    doc = _parse_dxf(dxf_bytes)
+    polyline = next(e for e in doc.modelspace() if e.dxftype() == "LWPOLYLINE")
+    circle = next(e for e in doc.modelspace() if e.dxftype() == "CIRCLE")
+
+    assert report["vertices_in"] == 840
+    assert report["vertices_out"] == len(polyline) <= 4
+    assert report["arcs"] == len(polyline) and report["circles"] == 1
+    assert report["max_deviation_mm"] <= 0.05
+    assert report["dxf_bytes"] == len(dxf_bytes)
+    assert polyline.is_closed
+    # Arc de bulge b sur une corde c : flèche b·c/2 — la polyligne retrace le cercle de 50 mm
+    for (x, y, _, _, bulge), (nx, ny, *_) in zip(polyline, list(polyline)[1:] + list(polyline)[:1]):
+        half = np.hypot(nx - x, ny - y) / 2
+        radius = half * (1 + bulge**2) / (2 * abs(bulge))
+        assert abs(radius - 50.0) < 0.05
+    assert abs(circle.dxf.radius - 10.0) < 0.05
+    assert np.allclose((circle.dxf.center.x, circle.dxf.center.y), (50.0, 50.0), atol=0.05)
+    assert not doc.audit().has_errors
+
+
+def test_compress_hole_keeps_large_detected_hole_round() -> None:
+    """Trou Ø40 mm détecté puis simplifié par approxPolyDP (1 px) → CIRCLE à la tolérance DXF par défaut."""
+    import cv2
+    import numpy as np
+
+    from app.core.config import settings
+    from app.services.contour_geometry import compress_hole
+    from app.services.vision_service import _SCALE
+
+    mask = np.zeros((600, 600), dtype=np.uint8)
+    cv2.circle(mask, (300, 300), int(20 * _SCALE), 255, -1)
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    simplified = cv2.approxPolyDP(contours[0], settings.contour_tolerance_mm / 2.0 * _SCALE, True).reshape(-1, 2)
+    tolerance = settings.contour_tolerance_mm / 2.0  # défaut de generate_dxf_report
+
+    compressed = compress_hole(simplified / _SCALE, tolerance)
+
+    assert len(simplified) > 40
+    assert "circle" in compressed
+    assert abs(compressed["circle"][1] - 20.0) < tolerance
+    assert compressed["deviation"] <= tolerance
+
+
+def test_compress_closed_rounded_rectangle() -> None:
+    """Rectangle à coins arrondis (aucun coin net) : 4 arcs + 4 côtés droits, aucun arc coupé en deux."""
+    import numpy as np
+
+    from app.services.contour_geometry import compress_closed
+
+    points = []
+    for cx, cy, start in [(90, 50, 0.0), (10, 50, np.pi / 2), (10, 10, np.pi), (90, 10, 1.5 * np.pi)]:
+        for t in np.linspace(start, start + np.pi / 2, 40):
+            points.append((cx + 10 * np.cos(t), cy + 10 * np.sin(t)))
+
+    vertices, bulges, deviation = compress_closed(np.array(points), 0.05)
+
+    assert np.count_nonzero(bulges) == 4
+    assert np.count_nonzero(bulges == 0.0) == len(vertices) - 4 <= 6
+    assert (np.abs(bulges[bulges != 0]) > 0.35).all()  # ≈ quarts de cercle (tan(π/8) ≈ 0.41)
+    assert deviation <= 0.05
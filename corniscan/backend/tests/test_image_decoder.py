@@ -0,0 +1,174 @@
+"""Tests décodage réduit piloté par l'en-tête — image_decoder + intégration vision_service."""
+
+import numpy as np
+import cv2
+import pytest
+
+
+def _encode(img: np.ndarray, ext: str = ".jpg") -> bytes:
+    _, encoded = cv2.imencode(ext, img)
+    return encoded.tobytes()
+
+
+def _scene_with_card(width: int, height: int) -> np.ndarray:
+    """Fond sombre + carte blanche (ratio 1.586) centrée, ≈ 50 % de la largeur."""
+    img = np.zeros((height, width, 3), dtype=np.uint8)
+    card_w = int(width * 0.50)
+    card_h = int(card_w / 1.586)
+    x0 = (width - card_w) // 2
+    y0 = (height - card_h) // 2
+    cv2.rectangle(img, (x0, y0), (x0 + card_w, y0 + card_h), (255, 255, 255), -1)
+    return img
+
+
+# ── read_image_size ───────────────────────────────────────────────────────────
+
+
+def test_read_image_size_jpeg() -> None:
+    """Les dimensions JPEG sont lues depuis le marqueur SOF."""
+    from app.services.image_decoder import read_image_size
+
+    data = _encode(np.zeros((301, 517, 3), dtype=np.uint8))
+    assert read_image_size(data) == (517, 301)
+
+
+def test_read_image_size_png() -> None:
+    """Les dimensions PNG sont lues depuis le chunk IHDR."""
+    from app.services.image_decoder import read_image_size
+
+    data = _encode(np.zeros((90, 120, 3), dtype=np.uint8), ".png")
+    assert read_image_size(data) == (120, 90)
+
+
+@pytest.mark.parametrize("data", [b"", b"not-an-image", b"\xff\xd8\xff", b"\x89PNG\r\n\x1a\n"])
+def test_read_image_size_invalid(data: bytes) -> None:
+    """En-tête absent ou tronqué → None sans exception."""
+    from app.services.image_decoder import read_image_size
+
+    assert read_image_size(data) is None
+
+
+# ── choose_reduction / decode_image ───────────────────────────────────────────
+
+
+@pytest.mark.parametrize(
+    ("size", "expected"),
+    [((640, 480), 1), ((4032, 3024), 1), ((8064, 6048), 2), ((16320, 12240), 4)],
+)
+def test_choose_reduction_keeps_short_side_above_target(size: tuple, expected: int) -> None:
+    """Le dénominateur garde le plus petit côté ≥ la largeur cible."""
+    from app.services.image_decoder import choose_reduction
+
+    assert choose_reduction(*size, target_width=2048) == expected
+
+
+def test_decode_image_reduces_large_jpeg() -> None:
+    """JPEG large → décodé à 1/d avec scale = 1/d et dimensions originales conservées."""
+    from app.services.image_decoder import decode_image
+
+    data = _encode(np.zeros((2400, 3200, 3), dtype=np.uint8))
+    img, scale, orig_size = decode_image(data, target_width=1000)
+
+    assert orig_size == (3200, 2400)
+    assert scale == 0.5
+    assert img.shape[:2] == (1200, 1600)
+
+
+def test_decode_image_grayscale_single_channel() -> None:
+    """grayscale=True → image 2D (un seul canal)."""
+    from app.services.image_decoder import decode_image
+
+    data = _encode(np.zeros((800, 1000, 3), dtype=np.uint8))
+    img, scale, _ = decode_image(data, target_width=200, grayscale=True)
+
+    assert img.ndim == 2
+    assert scale == 0.25
+
+
+def test_decode_image_full_resolution_without_target() -> None:
+    """Sans largeur cible → décodage pleine résolution, scale = 1."""
+    from app.services.image_decoder import decode_image
+
+    data = _encode(np.zeros((400, 600, 3), dtype=np.uint8))
+    img, scale, orig_size = decode_image(data)
+
+    assert img.shape[:2] == (400, 600)
+    assert scale == 1.0
+    assert orig_size == (600, 400)
+
+
+def test_decode_image_invalid_bytes() -> None:
+    """Contenu invalide → image None."""
+    from app.services.image_decoder import decode_image
+
+    img, _, _ = decode_image(b"not-an-image", target_width=2048)
+    assert img is None
+
+
+# ── Intégration vision_service ────────────────────────────────────────────────
+
+
+def test_process_image_reduced_decode_matches_full_decode() -> None:
+    """Le contour normalisé d'une grande image (décodage réduit) reste aligné
+    sur celui de la même scène à résolution de traitement."""
+    from app.services.vision_service import process_image
+
+    small = process_image(_encode(_scene_with_card(2048, 1536)))
+    large = process_image(_encode(_scene_with_card(8192, 6144)))
+
+    assert small["calibration_warning"] is False
+    assert large["calibration_warning"] is False
+    small_pts = np.array(small["contour_points"])
+    large_pts = np.array(large["contour_points"])
+    assert np.allclose(small_pts.min(axis=0), large_pts.min(axis=0), atol=0.01)
+    assert np.allclose(small_pts.max(axis=0), large_pts.max(axis=0), atol=0.01)
+
+
+def test_pdf_to_image_bytes_caps_width() -> None:
+    """Le rendu PDF est plafonné à max_width px."""
+    import fitz
+
+    from app.services.image_decoder import read_image_size
+    from app.services.vision_service import pdf_to_image_bytes
+
+    doc = fitz.open()
+    doc.new_page(width=2384, height=3370)  # A0 en points
+    jpeg = pdf_to_image_bytes(doc.tobytes(), max_width=2048)
+
+    width, _ = read_image_size(jpeg)
+    assert width <= 2048
+
+
+def test_pdf_to_array_targets_processing_width_in_bgr() -> None:
+    """Rendu direct en tableau BGR : A0 réduit à la largeur cible, A4 à 150 DPI (pas de sur-échantillonnage)."""
+    import fitz
+
+    from app.services.vision_service import _MAX_PROCESSING_WIDTH, pdf_to_array
+
+    for width, height, expected in ((595, 842, 1240), (2384, 3370, _MAX_PROCESSING_WIDTH)):  # A4, A0 en points
+        doc = fitz.open()
+        doc.new_page(width=width, height=height).draw_rect(
+            fitz.Rect(0, 0, width, height), color=None, fill=(1, 0, 0),  # rouge
+        )
+
+        page = pdf_to_array(doc.tobytes())
+
+        assert page.shape[1] == expected
+        assert page.flags.owndata
+        assert tuple(page[10, 10]) == (0, 0, 255)
+
+
+def test_process_task_pdf_skips_jpeg_roundtrip(monkeypatch: pytest.MonkeyPatch) -> None:
+    """PDF → process_image reçoit le tableau rastérisé, sans JPEG intermédiaire."""
+    import fitz
+
+    import app.services.scan_tasks as scan_tasks
+
+    doc = fitz.open()
+    doc.new_page(width=595, height=842)
+    received = []
+    monkeypatch.setattr(scan_tasks, "process_image", lambda image: received.append(image) or {})
+
+    scan_tasks.process_task(doc.tobytes(), True)
+
+    assert isinstance(received[0], np.ndarray)
@@ -0,0 +1,82 @@
+"""Tests détection carte live — live_detection.detect_card_live()."""
+
+import threading
+
+import numpy as np
+import cv2
+
+from tests.test_scan import _make_jpeg, _make_jpeg_with_card
+
+
+def test_detect_card_live_same_contract_as_detect_card() -> None:
+    """Mêmes clés (+ quad / roi pour le suivi) et même verdict que detect_card()."""
+    from app.services.live_detection import detect_card_live
+    from app.services.vision_service import detect_card
+
+    for frame in (_make_jpeg(), _make_jpeg_with_card()):
+        live = detect_card_live(frame)
+        reference = detect_card(frame)
+        assert set(live) == {"card_detected", "confidence", "quad", "roi"}
+        assert live["card_detected"] is reference["card_detected"]
+        assert isinstance(live["confidence"], float)
+
+
+def test_detect_card_live_detects_card() -> None:
+    """Image avec carte → card_detected = True."""
+    from app.services.live_detection import detect_card_live
+
+    result = detect_card_live(_make_jpeg_with_card())
+    assert result["card_detected"] is True
+    assert result["confidence"] > 0.0
+
+
+def test_detect_card_live_invalid_bytes() -> None:
+    """Données invalides → card_detected = False sans exception."""
+    from app.services.live_detection import detect_card_live
+
+    assert detect_card_live(b"not-an-image") == {
+        "card_detected": False, "confidence": 0.0, "quad": None, "roi": False,
+    }
+
+
+def test_detect_card_live_large_frame_is_normalised() -> None:
+    """Frame plus large que _MAX_PROCESSING_WIDTH → détection identique."""
+    from app.services.live_detection import detect_card_live
+
+    assert detect_card_live(_make_jpeg_with_card(3000, 2250))["card_detected"] is True
+
+
+def test_live_detector_reuses_buffers_between_frames() -> None:
+    """Deux frames de même taille → mêmes buffers de travail (pas de réallocation)."""
+    from app.services.live_detection import LiveCardDetector
+
+    detector = LiveCardDetector()
+    detector.detect(_make_jpeg_with_card())
+    first = {name: buf for name, buf in detector._buffers.items()}
+    detector.detect(_make_jpeg())
+
+    assert first
+    assert all(detector._buffers[name] is buf for name, buf in first.items())
+
+
+def test_get_live_detector_is_per_thread() -> None:
+    """Chaque worker (thread) possède son propre détecteur."""
+    from app.services.live_detection import get_live_detector
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(get_live_detector()))
+    thread.start()
+    thread.join()
+
+    assert get_live_detector() is get_live_detector()
+    assert other[0] is not get_live_detector()
+
+
+def test_detect_card_live_grayscale_input() -> None:
+    """Une frame JPEG niveaux de gris est acceptée telle quelle."""
+    from app.services.live_detection import detect_card_live
+
+    img = np.zeros((480, 640), dtype=np.uint8)
+    cv2.rectangle(img, (160, 140), (480, 341), 255, -1)
+    _, encoded = cv2.imencode(".jpg", img)
+    assert detect_card_live(encoded.tobytes())["card_detected"] is True
@@ -0,0 +1,110 @@
+"""Tests métriques Prometheus — core/metrics + GET /api/v1/metrics."""
+
+import io
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from tests.test_scan import _auth_header, _make_jpeg_with_card
+
+_METRICS_TOKEN = "scrape-secret"
+
+
+def scrape(client: TestClient, monkeypatch: pytest.MonkeyPatch):
+    """GET /api/v1/metrics avec un METRICS_TOKEN configuré pour le test."""
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "metrics_token", _METRICS_TOKEN)
+    return client.get("/api/v1/metrics", headers={"Authorization": f"Bearer {_METRICS_TOKEN}"})
+
+
+def test_histogram_renders_cumulative_buckets() -> None:
+    """Buckets cumulés (le ≤), +Inf, _sum et _count ; labels échappés."""
+    from app.core.metrics import Histogram
+
+    histogram = Histogram("t_seconds", "Test.", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, 'a"b')
+
+    lines = histogram.render()
+    assert lines[:2] == ["# HELP t_seconds Test.", "# TYPE t_seconds histogram"]
+    assert 't_seconds_bucket{route="a\\"b",le="0.1"} 2' in lines
+    assert 't_seconds_bucket{route="a\\"b",le="1"} 3' in lines
+    assert 't_seconds_bucket{route="a\\"b",le="+Inf"} 4' in lines
+    assert 't_seconds_sum{route="a\\"b"} 3.65' in lines
+    assert 't_seconds_count{route="a\\"b"} 4' in lines
+
+
+def test_counter_sums_per_thread_shards() -> None:
+    """Incréments concurrents sans verrou → total exact (un fragment par thread)."""
+    from app.core.metrics import Counter
+
+    counter = Counter("t_total", "Test.", ("kind",))
+
+    def work() -> None:
+        for _ in range(1000):
+            counter.inc("x")
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert counter.value("x") == 8000
+    assert 't_total{kind="x"} 8000' in counter.render()
+
+
+def test_bcrypt_durations_are_recorded() -> None:
+    """hash_password / verify_password → histogramme bcrypt par opération."""
+    from app.core.metrics import bcrypt_duration
+    from app.core.security import hash_password, verify_password
+
+    before = bcrypt_duration.count("hash"), bcrypt_duration.count("verify")
+    verify_password("secret", hash_password("secret"))
+
+    assert bcrypt_duration.count("hash") == before[0] + 1
+    assert bcrypt_duration.count("verify") == before[1] + 1
+
+
+def test_metrics_endpoint_exposes_routes_stages_and_executor(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Après un /detect-card → latence par route, étapes vision, file, cache, mégapixels revenus à 0."""
+    from app.core.metrics import vision_megapixels_in_flight
+
+    client.post(
+        "/api/v1/scan/detect-card",
+        files={"file": ("frame.jpg", io.BytesIO(_make_jpeg_with_card()), "image/jpeg")},
+        headers=_auth_header(),
+    )
+    response = scrape(client, monkeypatch)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert 'corniscan_http_request_duration_seconds_count{route="/api/v1/scan/detect-card",method="POST",status="200"}' in body
+    assert 'corniscan_vision_stage_duration_seconds_bucket{stage="decode",le="+Inf"}' in body
+    assert "corniscan_vision_queue_depth 0" in body
+    assert "# TYPE corniscan_vision_cache_hits_total counter" in body
+    assert "corniscan_vision_cache_misses_total " in body
+    assert "# TYPE corniscan_vision_cache_bytes gauge" in body
+    assert vision_megapixels_in_flight.value() == 0.0
+
+
+def test_metrics_endpoint_requires_token(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    """METRICS_TOKEN défini → 401 sans Bearer ou avec un mauvais, 200 avec le bon."""
+    assert scrape(client, monkeypatch).status_code == 200
+    assert client.get("/api/v1/metrics").status_code == 401
+    assert client.get("/api/v1/metrics", headers={"Authorization": "Bearer autre"}).status_code == 401
+
+
+def test_metrics_endpoint_hidden_without_token(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    """METRICS_TOKEN vide (défaut) → endpoint non exposé, même avec un Bearer quelconque."""
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "metrics_token", "")
+
+    assert client.get("/api/v1/metrics").status_code == 404
+    assert client.get("/api/v1/metrics", headers={"Authorization": "Bearer "}).status_code == 404
@@ -0,0 +1,132 @@
+"""Tests analyse vectorielle des PDF — pdf_vectors (exports CAO)."""
+
+import fitz
+import numpy as np
+import cv2
+import pytest
+
+from app.services.pdf_vectors import analyse_pdf_vectors
+
+_MM = 72 / 25.4  # points PDF par mm
+
+
+def _cad_pdf(rotation: int = 0, frame: bool = True) -> bytes:
+    """Export CAO 1:1 : cadre de page, joint 120 × 40 mm, deux trous Ø10 dont un avec repère de centre."""
+    doc = fitz.open()
+    page = doc.new_page()  # A4
+    if frame:
+        page.draw_rect(fitz.Rect(20, 20, 575, 822))
+    x0, y0 = 100, 100
+    page.draw_polyline(
+        [(x0, y0), (x0 + 120 * _MM, y0), (x0 + 120 * _MM, y0 + 40 * _MM), (x0, y0 + 40 * _MM)], closePath=True,
+    )
+    page.draw_circle((x0 + 20 * _MM, y0 + 20 * _MM), 5 * _MM)
+    page.draw_circle((x0 + 100 * _MM, y0 + 20 * _MM), 5 * _MM)
+    page.draw_circle((x0 + 100 * _MM, y0 + 20 * _MM), 1 * _MM)  # détail intérieur au trou
+    page.set_rotation(rotation)
+    return doc.tobytes()
+
+
+def test_cad_pdf_dimensions_in_mm() -> None:
+    """Unités PDF → mm exactes, cadre ignoré, trous directs seulement ; sans carte → échelle signalée."""
+    result = analyse_pdf_vectors(_cad_pdf())
+
+    assert result["dimensions"] == {"width_mm": 120.0, "height_mm": 40.0}
+    assert [(h["width_mm"], h["height_mm"]) for h in result["holes"]] == [(10.0, 10.0), (10.0, 10.0)]
+    assert result["calibration_warning"] is True
+    assert result["card_quad"] is None
+    assert set(result) == {
+        "contour_points", "dimensions", "calibration_warning", "holes", "card_quad", "homography", "scale_factor",
+    }
+
+
+def test_cad_pdf_rotated_page_matches_raster_orientation() -> None:
+    """Page tournée de 90° → contour normalisé dans le repère de la page affichée."""
+    pts = np.array(analyse_pdf_vectors(_cad_pdf(rotation=90))["contour_points"])
+    w, h = fitz.open(stream=_cad_pdf(rotation=90), filetype="pdf")[0].rect.br
+
+    # Joint horizontal sur la page non tournée → vertical sur la page affichée
+    extent = (pts.max(axis=0) - pts.min(axis=0)) * (w, h)
+    assert extent[1] > extent[0]
+    assert pts.min() >= 0.0 and pts.max() <= 1.0
+
+
+def test_duplicates_dropped_but_inscribed_circle_kept() -> None:
+    """Remplissage + trait du même tracé → un seul ; trou rond dans un bossage carré de même taille → conservé."""
+    from app.services.pdf_vectors import _closed_paths, _dedupe
+
+    doc = fitz.open()
+    page = doc.new_page()
+    page.draw_rect(fitz.Rect(100, 100, 200, 200), color=(0, 0, 0), fill=(1, 1, 1))
+    page.draw_rect(fitz.Rect(100, 100, 200, 200))
+    page.draw_circle((150, 150), 50)
+
+    kept = _dedupe(_closed_paths(page.get_drawings()))
+
+    assert sorted(len(pts) for pts in kept) == [4, 64]
+
+
+def test_vector_card_calibrates_scale() -> None:
+    """Carte bancaire vectorielle → étalonnage sur la carte (pas sur les unités PDF)."""
+    doc = fitz.open()
+    page = doc.new_page()
+    scale = 2.0  # 2 pt par mm — ni 1:1 ni unités PDF
+    page.draw_rect(fitz.Rect(100, 100, 100 + 85.6 * scale, 100 + 53.98 * scale), fill=(1, 1, 1))
+    page.draw_rect(fitz.Rect(120, 120, 120 + 50 * scale, 120 + 30 * scale), fill=(0, 0, 0))
+
+    result = analyse_pdf_vectors(doc.tobytes())
+
+    assert result["dimensions"] == {"width_mm": 50.0, "height_mm": 30.0}
+    assert result["calibration_warning"] is False
+    assert result["card_quad"] is not None
+    quad = np.array(result["card_quad"], dtype=np.float32).reshape(-1, 1, 2)
+    projected = cv2.perspectiveTransform(quad.astype(np.float64), np.array(result["homography"]))
+    assert np.allclose(projected.reshape(4, 2)[2], [855, 538], atol=1.0)
+
+
+@pytest.mark.parametrize("content", ["lines", "photo", "title block", "table", "small photo", "hatch"])
+def test_no_vector_geometry_falls_back(content: str) -> None:
+    """Pas de chemin fermé, photo, ou mise en page sans carte qui n'est pas un joint seul → None (analyse raster)."""
+    doc = fitz.open()
+    page = doc.new_page()
+    if content == "lines":
+        page.draw_line((100, 100), (300, 100))
+        page.draw_line((100, 200), (300, 250))
+    elif content == "title block":
+        page.draw_rect(fitz.Rect(100, 100, 300, 200))
+        page.draw_rect(fitz.Rect(350, 700, 550, 800))
+    elif content == "table":
+        page.draw_rect(fitz.Rect(100, 100, 400, 300))
+        for row in range(4):
+            for col in range(3):
+                page.draw_rect(fitz.Rect(100 + col * 100, 100 + row * 50, 200 + col * 100, 150 + row * 50))
+    elif content == "small photo":
+        _, jpeg = cv2.imencode(".jpg", np.full((30, 40, 3), 128, dtype=np.uint8))
+        page.insert_image(fitz.Rect(400, 600, 480, 660), stream=jpeg.tobytes())
+        page.draw_rect(fitz.Rect(100, 100, 300, 200))
+    elif content == "hatch":
+        page.draw_rect(fitz.Rect(50, 50, 550, 750))
+        for i in range(10):
+            for j in range(10):
+                page.draw_rect(fitz.Rect(60 + i * 40, 60 + j * 40, 80 + i * 40, 80 + j * 40))
+    else:
+        _, jpeg = cv2.imencode(".jpg", np.full((300, 400, 3), 128, dtype=np.uint8))
+        page.insert_image(page.rect, stream=jpeg.tobytes())
+        page.draw_rect(fitz.Rect(100, 100, 300, 200))
+
+    assert analyse_pdf_vectors(doc.tobytes()) is None
+
+
+def test_process_task_prefers_vector_geometry(monkeypatch: pytest.MonkeyPatch) -> None:
+    """PDF vectoriel → pas de rastérisation ; désactivé par PDF_VECTOR_ANALYSIS=false."""
+    import app.services.scan_tasks as scan_tasks
+
+    raster_calls = []
+    monkeypatch.setattr(scan_tasks, "process_image", lambda image: raster_calls.append(image) or {})
+
+    vector = scan_tasks.process_task(_cad_pdf(), True)
+    monkeypatch.setattr(scan_tasks.settings, "pdf_vector_analysis", False)
+    scan_tasks.process_task(_cad_pdf(), True)
+
+    assert vector["dimensions"]["width_mm"] == 120.0
+    assert len(raster_calls) == 1
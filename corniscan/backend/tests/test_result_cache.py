@@ -0,0 +1,243 @@
+"""Tests cache des résultats vision — result_cache + intégration /scan/process, /scan/submit."""
+
+import io
+
+import pytest
+from fastapi.testclient import TestClient
+
+from tests.test_scan import _auth_header, _make_jpeg_with_card, _submit_payload
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def _empty_vision_cache():
+    from app.services.result_cache import vision_cache
+
+    vision_cache.clear()
+    yield
+    vision_cache.clear()
+
+
+# ── ResultCache ───────────────────────────────────────────────────────────────
+
+
+def test_upload_digest_is_stable_and_content_addressed() -> None:
+    """Même contenu → même empreinte ; contenu différent → empreinte différente."""
+    from app.services.result_cache import upload_digest
+
+    assert upload_digest(b"abc") == upload_digest(memoryview(b"abc"))
+    assert upload_digest(b"abc") != upload_digest(b"abd")
+    assert len(upload_digest(b"abc")) == 32
+
+
+def test_cache_hit_and_miss_counters() -> None:
+    """Lecture absente → miss ; lecture présente → hit."""
+    from app.services.result_cache import ResultCache
+
+    cache = ResultCache(max_bytes=1024, ttl_seconds=60)
+    assert cache.get("process", "k") is None
+    cache.put("process", "k", {"a": 1})
+
+    assert cache.get("process", "k") == {"a": 1}
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_cache_returns_independent_copies() -> None:
+    """Modifier une valeur lue ne modifie pas le cache."""
+    from app.services.result_cache import ResultCache
+
+    cache = ResultCache(max_bytes=1024, ttl_seconds=60)
+    cache.put("process", "k", {"points": [[0.1, 0.2]]})
+    cache.get("process", "k")["points"].append([9, 9])
+
+    assert cache.get("process", "k") == {"points": [[0.1, 0.2]]}
+
+
+def test_cache_namespaces_are_isolated() -> None:
+    """Même empreinte, espaces de noms différents → entrées distinctes."""
+    from app.services.result_cache import ResultCache
+
+    cache = ResultCache(max_bytes=1024, ttl_seconds=60)
+    cache.put("process", "k", 1)
+
+    assert cache.get("card", "k") is None
+
+
+def test_cache_evicts_least_recently_used_over_budget() -> None:
+    """Budget dépassé → l'entrée la moins récemment utilisée est évincée."""
+    from app.services.result_cache import ResultCache
+
+    cache = ResultCache(max_bytes=25, ttl_seconds=60)
+    cache.put("p", "a", "x" * 8)
+    cache.put("p", "b", "y" * 8)
+    cache.get("p", "a")              # "a" devient la plus récente
+    cache.put("p", "c", "z" * 8)     # 3 × 10 octets JSON > 25 → éviction de "b"
+
+    assert cache.get("p", "b") is None
+    assert cache.get("p", "a") == "x" * 8
+    assert cache.stats()["bytes"] <= 25
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_entries_expire_after_ttl() -> None:
+    """Entrée plus vieille que le TTL → absente."""
+    from app.services.result_cache import ResultCache
+
+    clock = _FakeClock()
+    cache = ResultCache(max_bytes=1024, ttl_seconds=10, clock=clock)
+    cache.put("p", "k", 1)
+    clock.now = 10.5
+
+    assert cache.get("p", "k") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_cache_disabled_stores_nothing() -> None:
+    """enabled=False → put sans effet, get toujours None."""
+    from app.services.result_cache import ResultCache
+
+    cache = ResultCache(max_bytes=1024, ttl_seconds=60, enabled=False)
+    cache.put("p", "k", 1)
+
+    assert cache.get("p", "k") is None
+    assert cache.stats()["entries"] == 0
+
+
+# ── Intégration routeur ───────────────────────────────────────────────────────
+
+
+def test_process_endpoint_identical_upload_served_from_cache(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Deuxième upload identique → même réponse sans relancer process_image()."""
+    import app.services.scan_tasks as scan_tasks
+
+    calls = []
+    real = scan_tasks.process_image
+    monkeypatch.setattr(scan_tasks, "process_image", lambda data: calls.append(1) or real(data))
+    jpeg = _make_jpeg_with_card()
+
+    responses = [
+        client.post(
+            "/api/v1/scan/process",
+            files={"file": ("photo.jpg", io.BytesIO(jpeg), "image/jpeg")},
+            headers=_auth_header(),
+        )
+        for _ in range(2)
+    ]
+
+    assert [r.status_code for r in responses] == [200, 200]
+    assert responses[0].json() == responses[1].json()
+    assert calls == [1]
+
+
+def test_process_cache_key_separates_input_kind_page_and_vector_mode(monkeypatch: pytest.MonkeyPatch) -> None:
+    from app.core.config import settings
+    from app.routers.scan import _cache_key
+
+    keys = {_cache_key("d", False), _cache_key("d", True, 0), _cache_key("d", True, 1)}
+    monkeypatch.setattr(settings, "pdf_vector_analysis", not settings.pdf_vector_analysis)
+    keys.add(_cache_key("d", True, 0))
+
+    assert len(keys) == 4
+
+
+def test_process_endpoint_same_bytes_as_pdf_then_image_not_shared(client: TestClient) -> None:
+    """PDF analysé puis mêmes octets envoyés comme image → pas de résultat PDF resservi (422 du décodage)."""
+    from tests.test_pdf_vectors import _cad_pdf
+
+    pdf = _cad_pdf()
+    as_pdf = client.post(
+        "/api/v1/scan/process",
+        files={"file": ("plan.pdf", io.BytesIO(pdf), "application/pdf")},
+        headers=_auth_header(),
+    )
+    as_image = client.post(
+        "/api/v1/scan/process",
+        files={"file": ("photo.jpg", io.BytesIO(pdf), "image/jpeg")},
+        headers=_auth_header(),
+    )
+
+    assert as_pdf.status_code == 200
+    assert as_image.status_code == 422
+
+
+def test_process_endpoint_hashes_upload_off_the_event_loop(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Empreinte (jusqu'à 20 Mo hachés) et en-tête lus dans un thread, pas dans la boucle asyncio."""
+    import asyncio
+
+    import app.routers.scan as scan_router
+
+    loops = []
+
+    def digest(data) -> str:
+        try:
+            loops.append(asyncio.get_running_loop())
+        except RuntimeError:
+            loops.append(None)
+        return "0" * 32
+
+    monkeypatch.setattr(scan_router, "upload_digest", digest)
+    response = client.post(
+        "/api/v1/scan/process",
+        files={"file": ("photo.jpg", io.BytesIO(_make_jpeg_with_card()), "image/jpeg")},
+        headers=_auth_header(),
+    )
+
+    assert response.status_code == 200
+    assert loops == [None]
+
+
+def test_process_endpoint_cache_disabled(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Cache désactivé → chaque upload repasse par le pipeline."""
+    import app.services.scan_tasks as scan_tasks
+    from app.services.result_cache import vision_cache
+
+    monkeypatch.setattr(vision_cache, "enabled", False)
+    calls = []
+    real = scan_tasks.process_image
+    monkeypatch.setattr(scan_tasks, "process_image", lambda data: calls.append(1) or real(data))
+    jpeg = _make_jpeg_with_card()
+
+    for _ in range(2):
+        client.post(
+            "/api/v1/scan/process",
+            files={"file": ("photo.jpg", io.BytesIO(jpeg), "image/jpeg")},
+            headers=_auth_header(),
+        )
+
+    assert calls == [1, 1]
+
+
+def test_submit_endpoint_reuses_cached_card_geometry(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Photo déjà passée par /process → /submit trace le masque carte sans détection."""
+    import app.services.vision_service as vision
+
+    jpeg = _make_jpeg_with_card()
+    client.post(
+        "/api/v1/scan/process",
+        files={"file": ("photo.jpg", io.BytesIO(jpeg), "image/jpeg")},
+        headers=_auth_header(),
+    )
+    calls = []
+    monkeypatch.setattr(vision, "_find_card_corners", lambda img: calls.append(1) or (None, True))
+
+    payload = _submit_payload(jpeg)
+    response = client.post(
+        "/api/v1/scan/submit", files=payload["files"], data=payload["data"], headers=_auth_header(),
+    )
+
+    assert response.status_code == 200
+    assert calls == []
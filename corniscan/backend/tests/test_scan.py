@@ -339,3 +339,313 @@ def test_submit_endpoint_returns_422_on_invalid_contour(client: TestClient) -> N
         headers=_auth_header(),
     )
     assert response.status_code == 422
+
+
+# ── Tests recherche carte grossière → fine ───────────────────────────────────
+
+
+def _card_frame(width: int = 2048, height: int = 1536) -> tuple[np.ndarray, np.ndarray]:
+    """Frame BGR texturée avec carte, et ses coins TL, TR, BR, BL (px)."""
+    rng = np.random.default_rng(0)
+    gray = cv2.resize(rng.integers(60, 110, (height // 16, width // 16), dtype=np.uint8), (width, height))
+    card_w, card_h = int(width * 0.3), int(width * 0.3 / 1.586)
+    x0, y0 = width // 3, height // 4
+    cv2.rectangle(gray, (x0, y0), (x0 + card_w, y0 + card_h), 235, -1)
+    corners = np.array([[x0, y0], [x0 + card_w, y0], [x0 + card_w, y0 + card_h], [x0, y0 + card_h]], np.float32)
+    return cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR), corners
+
+
+def test_find_card_corners_refines_coarse_window(monkeypatch: pytest.MonkeyPatch) -> None:
+    """2048 px → niveau 512 px puis fenêtre autour de la carte : pas de recherche plein cadre, coins exacts."""
+    import app.services.vision_service as vision
+
+    img, expected = _card_frame()
+    searched = []
+    real = vision._card_quad
+    monkeypatch.setattr(vision, "_card_quad", lambda gray, *a, **kw: searched.append(gray.shape) or real(gray, *a, **kw))
+
+    corners, warning = vision._find_card_corners(img)
+
+    assert warning is False
+    assert searched[0] == (384, 512)
+    assert len(searched) == 2 and searched[1][0] * searched[1][1] < 0.2 * img.shape[0] * img.shape[1]
+    assert np.abs(vision._order_points(corners) - expected).max() < 1.5
+
+
+def test_find_card_corners_escalates_to_full_frame(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Carte introuvable au niveau grossier → recherche pleine résolution sur toute l'image."""
+    import app.services.vision_service as vision
+
+    img, expected = _card_frame()
+    monkeypatch.setattr(vision, "_coarse_card_window", lambda gray: None)
+
+    corners, warning = vision._find_card_corners(img)
+
+    assert warning is False
+    assert np.abs(vision._order_points(corners) - expected).max() < 1.5
+
+
+# ── Tests géométrie carte réutilisée entre /process et /submit ───────────────
+
+
+def test_process_image_returns_card_geometry() -> None:
+    """Carte détectée → card_quad normalisé + homographie cohérente + scale_factor."""
+    from app.services.vision_service import _DST_PTS, process_image
+
+    result = process_image(_make_jpeg_with_card())
+
+    quad = np.array(result["card_quad"], dtype=np.float64)
+    assert quad.shape == (4, 2)
+    assert np.all((quad >= 0.0) & (quad <= 1.0))
+    H = np.array(result["homography"], dtype=np.float64)
+    projected = cv2.perspectiveTransform(quad.reshape(-1, 1, 2), H).reshape(4, 2)
+    assert np.allclose(projected, _DST_PTS, atol=0.5)
+    assert result["scale_factor"] == 1.0
+
+
+def test_process_image_no_card_geometry_on_blank_image() -> None:
+    """Aucune carte → card_quad et homography à None."""
+    from app.services.vision_service import process_image
+
+    result = process_image(_make_jpeg())
+
+    assert result["card_quad"] is None
+    assert result["homography"] is None
+
+
+def test_generate_contour_png_skips_detection_with_card_geometry(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Géométrie cohérente fournie → _find_card_corners n'est pas appelé."""
+    import app.services.vision_service as vision
+
+    jpeg = _make_jpeg_with_card()
+    result = vision.process_image(jpeg)
+    calls = []
+    monkeypatch.setattr(vision, "_find_card_corners", lambda img: calls.append(img) or (None, True))
+
+    png = vision.generate_contour_png(
+        jpeg, result["contour_points"], 30.0, 20.0,
+        card_quad=result["card_quad"], homography=result["homography"],
+    )
+
+    assert png[:2] == b"\xff\xd8"
+    assert calls == []
+
+
+@pytest.mark.parametrize(
+    ("card_quad", "homography"),
+    [
+        (None, None),
+        ([[0.1, 0.1], [0.2, 0.1]], None),                               # forme invalide
+        ([[0.1, 0.1], [0.9, 0.1], [0.1, 0.9], [0.9, 0.9]], None),       # non convexe (croisé)
+        ([[0.5, 0.5], [0.51, 0.5], [0.51, 0.51], [0.5, 0.51]], None),   # trop petit
+        ([[0.1, 0.1], [0.9, 0.1], [0.9, 0.9], [0.1, 0.9]], [[1, 0, 0], [0, 1, 0], [0, 0, 1]]),  # incohérent
+    ],
+)
+def test_generate_contour_png_falls_back_on_invalid_geometry(
+    monkeypatch: pytest.MonkeyPatch, card_quad: list | None, homography: list | None,
+) -> None:
+    """Géométrie absente ou incohérente → repli sur la détection."""
+    import app.services.vision_service as vision
+
+    calls = []
+    real = vision._find_card_corners
+    monkeypatch.setattr(vision, "_find_card_corners", lambda img: calls.append(1) or real(img))
+
+    vision.generate_contour_png(
+        _make_jpeg_with_card(), [[0.1, 0.2], [0.9, 0.2], [0.9, 0.8]], 30.0, 20.0,
+        card_quad=card_quad, homography=homography,
+    )
+
+    assert calls == [1]
+
+
+def test_render_contour_images_preview_is_capped() -> None:
+    """Profil preview → largeur plafonnée, JPEG plus léger que l'archive ; WebP sur demande."""
+    from app.services.vision_service import RENDER_PROFILES, render_contour_images
+
+    max_width = RENDER_PROFILES["preview"]["max_width"]
+    jpeg = _make_jpeg_with_card(width=max_width * 2, height=max_width * 3 // 2)
+    points = [[0.1, 0.2], [0.9, 0.2], [0.9, 0.8]]
+
+    renders = render_contour_images(jpeg, points, 30.0, 20.0, profiles=("preview", "archive"))
+    webp = render_contour_images(jpeg, points, 30.0, 20.0, profiles=("preview",), webp=True)
+
+    preview = cv2.imdecode(np.frombuffer(renders["preview"][0], np.uint8), cv2.IMREAD_COLOR)
+    archive = cv2.imdecode(np.frombuffer(renders["archive"][0], np.uint8), cv2.IMREAD_COLOR)
+    assert preview.shape[1] == max_width
+    assert archive.shape[1] == max_width * 2
+    assert len(renders["preview"][0]) < len(renders["archive"][0])
+    assert webp["preview"][1] == "image/webp"
+
+
+def test_blend_card_mask_matches_full_frame_blend() -> None:
+    """Fusion limitée au rectangle englobant (en place) = addWeighted plein cadre historique."""
+    from app.services.vision_service import _blend_card_mask
+
+    rng = np.random.default_rng(0)
+    img = rng.integers(0, 256, size=(300, 400, 3), dtype=np.uint8)
+    # Quad partiellement hors cadre : le rectangle englobant est rogné
+    card_pts = np.array([[50, -20], [420, 40], [380, 250], [30, 200]], dtype=np.int32).reshape(-1, 1, 2)
+
+    mask_layer = img.copy()
+    cv2.drawContours(mask_layer, [card_pts], 0, (50, 200, 80), -1)
+    expected = cv2.addWeighted(img, 0.78, mask_layer, 0.22, 0)
+    _blend_card_mask(img, card_pts)
+
+    assert np.array_equal(img, expected)
+
+
+def test_render_contour_images_rejects_unknown_profile() -> None:
+    """Profil inconnu → ValueError (422 côté routeur)."""
+    from app.services.vision_service import render_contour_images
+
+    with pytest.raises(ValueError):
+        render_contour_images(_make_jpeg_with_card(), [], profiles=("thumbnail",))
+
+
+def test_resolve_card_quad_from_homography_only() -> None:
+    """Homographie seule → quad reconstruit par l'inverse."""
+    from app.services.vision_service import _resolve_card_quad, process_image
+
+    result = process_image(_make_jpeg_with_card())
+    quad = _resolve_card_quad(None, result["homography"])
+
+    assert np.allclose(quad, np.array(result["card_quad"]), atol=1e-3)
+
+
+def test_submit_endpoint_accepts_card_geometry(client: TestClient) -> None:
+    """card_quad + homography transmis à /submit → 200 avec les 3 fichiers."""
+    import json as _json
+
+    jpeg = _make_jpeg_with_card()
+    processed = client.post(
+        "/api/v1/scan/process",
+        files={"file": ("photo.jpg", io.BytesIO(jpeg), "image/jpeg")},
+        headers=_auth_header(),
+    ).json()
+    payload = _submit_payload(jpeg)
+    payload["data"]["card_quad"] = _json.dumps(processed["card_quad"])
+    payload["data"]["homography"] = _json.dumps(processed["homography"])
+
+    response = client.post(
+        "/api/v1/scan/submit",
+        files=payload["files"],
+        data=payload["data"],
+        headers=_auth_header(),
+    )
+
+    assert response.status_code == 200
+    assert set(response.json()) == {"dxf", "image", "contour", "geometry"}
+
+
+# ── Tests POST /api/v1/scan/process-pages (PDF multi-pages) ──────────────────
+
+
+def _multipage_pdf(pages: int) -> bytes:
+    """PDF CAO 1:1 : page n → joint rectangulaire de (40 + 10·n) × 20 mm."""
+    import fitz
+
+    mm = 72 / 25.4
+    doc = fitz.open()
+    for n in range(pages):
+        page = doc.new_page()
+        page.draw_rect(fitz.Rect(100, 100, 100 + (40 + 10 * n) * mm, 100 + 20 * mm))
+    return doc.tobytes()
+
+
+def _post_pages(client: TestClient, pdf: bytes, pages: str = ""):
+    return client.post(
+        f"/api/v1/scan/process-pages?pages={pages}",
+        files={"file": ("plans.pdf", io.BytesIO(pdf), "application/pdf")},
+        headers=_auth_header(),
+    )
+
+
+@pytest.mark.parametrize(
+    ("spec", "expected"),
+    [("", [0, 1, 2, 3, 4]), ("2", [1]), ("1-2,5", [0, 1, 4]), ("4-", [3, 4]), ("3,1-3", [2, 0, 1])],
+)
+def test_parse_pages(spec: str, expected: list[int]) -> None:
+    from app.routers.scan import _parse_pages
+
+    assert _parse_pages(spec, 5) == expected
+
+
+def test_process_pages_streams_one_line_per_page(client: TestClient) -> None:
+    """Une ligne NDJSON par page demandée, avec les dimensions de chaque plan."""
+    import json as _json
+
+    response = _post_pages(client, _multipage_pdf(4), "1,3-4")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [_json.loads(line) for line in response.text.splitlines()]
+    widths = {line["page"]: line["result"]["dimensions"]["width_mm"] for line in lines}
+    assert widths == {1: 40.0, 3: 60.0, 4: 70.0}
+
+
+def test_process_pages_reports_page_errors_without_aborting(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Une page en échec → ligne "error", les autres pages sont livrées."""
+    import json as _json
+
+    import app.services.scan_tasks as scan_tasks
+
+    real = scan_tasks.analyse_pdf_vectors
+
+    def flaky(raw: bytes, page: int = 0):
+        if page == 1:
+            raise ValueError("Page illisible.")
+        return real(raw, page)
+
+    monkeypatch.setattr(scan_tasks, "analyse_pdf_vectors", flaky)
+
+    lines = [_json.loads(line) for line in _post_pages(client, _multipage_pdf(3)).text.splitlines()]
+
+    by_page = {line["page"]: line for line in lines}
+    assert by_page[2]["error"] == {"status": 422, "detail": "Page illisible."}
+    assert "result" in by_page[1] and "result" in by_page[3]
+
+
+@pytest.mark.parametrize("pages", ["0", "2-9", "a-b"])
+def test_process_pages_rejects_invalid_range(client: TestClient, pages: str) -> None:
+    assert _post_pages(client, _multipage_pdf(3), pages).status_code == 422
+
+
+def _post_batch(client: TestClient, files: list[tuple[str, bytes, str]]):
+    return client.post(
+        "/api/v1/scan/process-batch",
+        files=[("files", (name, io.BytesIO(data), media_type)) for name, data, media_type in files],
+        headers=_auth_header(),
+    )
+
+
+def test_process_batch_streams_one_line_per_file(client: TestClient) -> None:
+    """Photos et PDF dans un même multipart → une ligne NDJSON par fichier ; un fichier illisible n'interrompt pas le lot."""
+    import json as _json
+
+    response = _post_batch(client, [
+        ("a.jpg", _make_jpeg_with_card(), "image/jpeg"),
+        ("casse.jpg", b"pas une image", "image/jpeg"),
+        ("plan.pdf", _multipage_pdf(1), "application/pdf"),
+    ])
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    by_index = {line["index"]: line for line in map(_json.loads, response.text.splitlines())}
+    assert sorted(by_index) == [0, 1, 2]
+    assert by_index[0]["filename"] == "a.jpg" and "contour_points" in by_index[0]["result"]
+    assert by_index[1]["error"]["status"] == 422
+    assert by_index[2]["result"]["dimensions"]["width_mm"] == 40.0
+
+
+def test_process_batch_rejects_too_many_files(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "vision_batch_max_files", 1)
+    jpeg = _make_jpeg_with_card()
+
+    response = _post_batch(client, [("a.jpg", jpeg, "image/jpeg"), ("b.jpg", jpeg, "image/jpeg")])
+
+    assert response.status_code == 422
@@ -0,0 +1,163 @@
+"""Tests livraison binaire POST /submit — scan_delivery (multipart/mixed, ZIP)."""
+
+import base64
+import email
+import io
+import json
+import zipfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+from tests.test_scan import _auth_header, _make_jpeg_with_card, _submit_payload
+
+_ARTEFACTS = [
+    ("joint.dxf", "application/dxf", b"0\nSECTION\n" * 200),
+    ("contour.jpg", "image/jpeg", b"\xff\xd8contour\xff\xd9"),
+]
+
+
+def _parse_multipart(content_type: str, body: bytes) -> dict[str, tuple[str, bytes]]:
+    message = email.message_from_bytes(f"Content-Type: {content_type}\r\n\r\n".encode() + body)
+    return {
+        part.get_filename(): (part.get_content_type(), part.get_payload(decode=True))
+        for part in message.get_payload()
+    }
+
+
+@pytest.mark.parametrize(
+    ("accept", "expected"),
+    [
+        ("application/zip", "application/zip"),
+        ("multipart/mixed, application/json", "multipart/mixed"),
+        ("application/json;q=1, application/zip;q=0.5", None),
+        ("application/json;q=0.5, application/zip", "application/zip"),
+        ("application/zip;q=0", None),
+        ("application/zip;q=0, multipart/mixed", "multipart/mixed"),
+        ("application/zip;q=0.4, multipart/mixed;q=0.8", "multipart/mixed"),
+        ("multipart/mixed, application/zip", "multipart/mixed"),
+        ("application/zip;q=abc", None),
+        ("application/json", None),
+        ("", None),
+    ],
+)
+def test_negotiate(accept: str, expected: str | None) -> None:
+    from app.services.scan_delivery import negotiate
+
+    assert negotiate(accept) == expected
+
+
+def test_multipart_stream_roundtrip() -> None:
+    """Parties lisibles par un parseur MIME standard, contenu intact."""
+    from app.services.scan_delivery import multipart_stream
+
+    content_type, chunks = multipart_stream(_ARTEFACTS, boundary="b0undary")
+    parts = _parse_multipart(content_type, b"".join(chunks))
+
+    assert content_type == 'multipart/mixed; boundary="b0undary"'
+    assert parts == {name: (media_type, data) for name, media_type, data in _ARTEFACTS}
+
+
+def test_zip_stream_roundtrip_and_compression() -> None:
+    """Archive valide ; DXF compressé, JPEG stocké tel quel ; émise en plusieurs chunks."""
+    from app.services.scan_delivery import zip_stream
+
+    chunks = list(zip_stream(_ARTEFACTS))
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+
+    assert len(chunks) > 1
+    assert archive.read("joint.dxf") == _ARTEFACTS[0][2]
+    assert archive.getinfo("joint.dxf").compress_type == zipfile.ZIP_DEFLATED
+    assert archive.getinfo("contour.jpg").compress_type == zipfile.ZIP_STORED
+
+
+def _submit(client: TestClient, accept: str | None = None, query: str = ""):
+    payload = _submit_payload(_make_jpeg_with_card())
+    headers = _auth_header()
+    if accept:
+        headers["Accept"] = accept
+    return client.post(f"/api/v1/scan/submit{query}", files=payload["files"], data=payload["data"], headers=headers)
+
+
+def test_submit_zip_mode(client: TestClient) -> None:
+    """Accept: application/zip → DXF, image annotée et original binaires."""
+    response = _submit(client, "application/zip")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    assert archive.namelist() == ["joint.dxf", "contour.jpg", "original.jpg"]
+    assert archive.read("joint.dxf").startswith(b"  0\nSECTION")
+    assert archive.read("original.jpg") == _make_jpeg_with_card()
+    assert "Server-Timing" in response.headers
+
+
+def test_submit_multipart_mode_without_original(client: TestClient) -> None:
+    """Accept: multipart/mixed + include_original=false → deux parties, pas d'écho de l'upload."""
+    response = _submit(client, "multipart/mixed", "?include_original=false")
+
+    assert response.status_code == 200
+    parts = _parse_multipart(response.headers["content-type"], response.content)
+    assert set(parts) == {"joint.dxf", "contour.jpg"}
+    assert json.loads(response.headers["X-DXF-Geometry"])["dxf_bytes"] == len(parts["joint.dxf"][1])
+    assert parts["contour.jpg"][0] == "image/jpeg"
+    assert parts["contour.jpg"][1][:2] == b"\xff\xd8"
+
+
+def test_submit_json_mode_is_default(client: TestClient) -> None:
+    """Sans Accept binaire → JSON base64 + rapport "geometry" ; include_original=false retire "image"."""
+    default = _submit(client)
+    without_original = _submit(client, query="?include_original=false")
+
+    assert list(default.json()) == ["dxf", "image", "contour", "geometry"]
+    assert list(without_original.json()) == ["dxf", "contour", "geometry"]
+    geometry = default.json()["geometry"]
+    assert geometry["dxf_bytes"] == len(base64.b64decode(default.json()["dxf"]))
+    assert 3 <= geometry["vertices_out"] <= geometry["vertices_in"]
+    assert geometry["max_deviation_mm"] <= geometry["tolerance_mm"]
+
+
+def test_submit_render_profiles(client: TestClient) -> None:
+    """?render=preview,archive&webp=true → les deux rendus, preview en WebP."""
+    response = _submit(client, "multipart/mixed", "?render=preview,archive&webp=true&include_original=false")
+
+    assert response.status_code == 200
+    parts = _parse_multipart(response.headers["content-type"], response.content)
+    assert list(parts) == ["joint.dxf", "contour_preview.webp", "contour.jpg"]
+    assert parts["contour_preview.webp"][0] == "image/webp"
+    assert parts["contour_preview.webp"][1][8:12] == b"WEBP"
+
+
+def test_submit_render_preview_json(client: TestClient) -> None:
+    """?render=preview en JSON → champ "contour_preview" seul ; profil inconnu → 422."""
+    preview = _submit(client, query="?render=preview")
+    invalid = _submit(client, query="?render=thumbnail")
+
+    assert list(preview.json()) == ["dxf", "image", "contour_preview", "geometry"]
+    assert invalid.status_code == 422
+
+
+def test_as_completed_bounded_limits_in_flight_and_streams_in_completion_order() -> None:
+    """Au plus `limit` jobs en vol ; résultats dans l'ordre d'achèvement."""
+    import asyncio
+
+    from app.services.scan_delivery import as_completed_bounded
+
+    in_flight, peak = 0, 0
+
+    def job(value: int, delay: float):
+        async def run() -> int:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(delay)
+            in_flight -= 1
+            return value
+        return run
+
+    async def collect() -> list[int]:
+        jobs = [job(1, 0.03), job(2, 0.01), job(3, 0.01), job(4, 0.0)]
+        return [value async for value in as_completed_bounded(jobs, 2)]
+
+    assert asyncio.run(collect()) == [2, 3, 4, 1]
+    assert peak == 2
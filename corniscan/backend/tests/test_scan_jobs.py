@@ -0,0 +1,204 @@
+"""Tests jobs d'analyse asynchrones — scan_jobs + endpoints /scan/jobs (SSE, fichiers, TTL, SQLite)."""
+
+import asyncio
+import io
+import json
+import sqlite3
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.security import create_access_token
+from tests.test_scan import _auth_header, _make_jpeg, _make_jpeg_with_card
+
+
+@pytest.fixture
+def jobs_client():
+    """Client avec lifespan : la boucle (et les exécutants de jobs) vit le temps du test."""
+    from app.main import app
+    from app.services.scan_jobs import scan_jobs
+
+    with TestClient(app) as client:
+        yield client
+    scan_jobs.clear()
+
+
+def _create(client: TestClient, data: bytes, query: str = "", headers: dict | None = None):
+    return client.post(
+        f"/api/v1/scan/jobs{query}",
+        files={"file": ("joint.jpg", io.BytesIO(data), "image/jpeg")},
+        headers=headers or _auth_header(),
+    )
+
+
+def _events(client: TestClient, url: str, headers: dict | None = None) -> list[tuple[str, dict]]:
+    """Flux SSE complet → [(type, données)]."""
+    with client.stream("GET", url, headers=headers or _auth_header()) as response:
+        assert response.headers["content-type"].startswith("text/event-stream")
+        body = "".join(response.iter_text())
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_job_streams_stages_then_artefacts(jobs_client: TestClient) -> None:
+    """202 immédiat → jalons dans l'ordre du pipeline → done, DXF téléchargeable, DELETE efface tout."""
+    from app.services.scan_jobs import JOB_STAGES
+
+    created = _create(jobs_client, _make_jpeg_with_card(), "?render=preview,archive")
+    assert created.status_code == 202
+    job_id = created.json()["job_id"]
+
+    events = _events(jobs_client, created.json()["events_url"])
+
+    assert [data["stage"] for kind, data in events if kind == "stage"] == list(JOB_STAGES)
+    kind, final = events[-1]
+    assert kind == "done"
+    assert final["artefacts"] == ["joint.dxf", "contour_preview.jpg", "contour.jpg"]
+    assert "contour_points" in final["result"]
+    assert jobs_client.get(created.json()["status_url"], headers=_auth_header()).json()["status"] == "done"
+
+    dxf = jobs_client.get(f"/api/v1/scan/jobs/{job_id}/artefacts/joint.dxf", headers=_auth_header())
+    assert dxf.content.startswith(b"  0\nSECTION")
+
+    assert jobs_client.delete(f"/api/v1/scan/jobs/{job_id}", headers=_auth_header()).status_code == 204
+    assert jobs_client.get(f"/api/v1/scan/jobs/{job_id}", headers=_auth_header()).status_code == 404
+
+
+def test_job_without_card_skips_card_found(jobs_client: TestClient) -> None:
+    """Aucune carte détectée → pas de jalon card_found, calibration_warning dans le résultat."""
+    created = _create(jobs_client, _make_jpeg()).json()
+
+    events = _events(jobs_client, created["events_url"])
+
+    assert [data["stage"] for kind, data in events if kind == "stage"] == [
+        "decoded", "contour_extracted", "dxf_ready",
+    ]
+    assert events[-1][0] == "done"
+    assert events[-1][1]["result"]["calibration_warning"] is True
+
+
+def test_job_failure_and_event_replay(jobs_client: TestClient) -> None:
+    """Image illisible → événement "failed" 422 ; Last-Event-ID rejoue la suite seulement ; token de flux en query."""
+    job = _create(jobs_client, b"pas une image").json()
+    events = _events(jobs_client, job["events_url"])
+
+    assert events[-1][0] == "failed"
+    assert events[-1][1]["error"]["status"] == 422
+    replay = _events(jobs_client, job["events_url"], headers={"Last-Event-ID": "2"})
+    assert replay == events[2:]
+
+
+def test_job_events_query_token_is_job_scoped(jobs_client: TestClient) -> None:
+    """?access_token= : JWT de session refusé, token de flux limité à son job et inutilisable en Bearer."""
+    first = _create(jobs_client, _make_jpeg()).json()
+    second = _create(jobs_client, _make_jpeg()).json()
+    session = _auth_header()["Authorization"].split()[1]
+    stream_token = first["events_url"].split("access_token=")[1]
+
+    assert jobs_client.get(f"{first['status_url']}/events?access_token={session}").status_code == 401
+    assert jobs_client.get(f"{second['status_url']}/events?access_token={stream_token}").status_code == 401
+    assert jobs_client.get(first["status_url"], headers={"Authorization": f"Bearer {stream_token}"}).status_code == 401
+    refreshed = jobs_client.get(first["status_url"], headers=_auth_header()).json()["events_url"]
+    assert _events(jobs_client, refreshed, headers={"Accept": "text/event-stream"})[-1][0] == "done"
+
+
+def test_job_is_private_to_its_owner(jobs_client: TestClient) -> None:
+    job = _create(jobs_client, _make_jpeg_with_card()).json()
+    token = create_access_token({"sub": "bob", "role": "operator", "force_password_change": False})
+
+    response = jobs_client.get(job["status_url"], headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 404
+
+
+def test_job_queue_full_returns_503(jobs_client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    from app.services.scan_jobs import scan_jobs
+
+    monkeypatch.setattr(scan_jobs, "max_queued", 0)
+
+    response = _create(jobs_client, _make_jpeg_with_card())
+
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def test_sqlite_jobs_survive_restart_and_expire(tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Job interrompu par un arrêt → relancé au démarrage suivant ; upload effacé à la fin, tout purgé au TTL."""
+    import app.services.scan_jobs as scan_jobs_module
+    from app.services.scan_jobs import ScanJobQueue
+
+    release = threading.Event()
+    real_task = scan_jobs_module.scan_job_task
+
+    def blocking_task(*args):
+        release.wait(5)
+        return real_task(*args)
+
+    monkeypatch.setattr(scan_jobs_module, "scan_job_task", blocking_task)
+    db_path = str(tmp_path / "jobs.sqlite")
+    clock = _FakeClock()
+
+    first = ScanJobQueue(concurrency=1, max_queued=4, ttl_seconds=60, db_path=db_path, clock=clock)
+    job = await first.submit("alice", "joint.jpg", _make_jpeg_with_card(), False)
+    while job.status != "running":
+        await asyncio.sleep(0.01)
+    first.shutdown()
+
+    second = ScanJobQueue(concurrency=1, max_queued=4, ttl_seconds=60, db_path=db_path, clock=clock)
+    second.start()
+    release.set()
+    restored = second.get(job.id, "alice")
+    async for _ in restored.follow():
+        pass
+
+    assert restored.status == "done"
+    assert ("status", {"status": "queued", "restarted": True}) in restored.events
+    with sqlite3.connect(db_path) as db:
+        assert db.execute("SELECT upload FROM scan_jobs").fetchall() == [(None,)]
+        assert db.execute("SELECT count(*) FROM scan_job_artefacts").fetchone() == (2,)
+
+    clock.now += 61
+    assert second.get(job.id, "alice") is None
+    await asyncio.to_thread(second._store.purge, clock())
+    second.shutdown()
+    with sqlite3.connect(db_path) as db:
+        assert db.execute("SELECT count(*) FROM scan_jobs").fetchone() == (0,)
+        assert db.execute("SELECT count(*) FROM scan_job_artefacts").fetchone() == (0,)
+
+
+async def test_spooled_upload_passed_by_path_and_deleted_at_end(tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Upload spoolé : le job garde le fichier (pas les octets) et l'efface en fin de job, base comprise."""
+    import os
+
+    import app.services.scan_jobs as scan_jobs_module
+    from app.core.uploads import SpooledUpload
+    from app.services.scan_jobs import ScanJobQueue
+
+    seen = []
+    monkeypatch.setattr(scan_jobs_module, "scan_job_task", lambda raw, *args: seen.append(raw) or ({}, b"", {}))
+    path = tmp_path / "photo.upload"
+    path.write_bytes(_make_jpeg_with_card())
+    upload = SpooledUpload(str(path), path.stat().st_size)
+
+    queue = ScanJobQueue(concurrency=1, max_queued=4, ttl_seconds=60, db_path=str(tmp_path / "jobs.sqlite"))
+    job = await queue.submit("alice", "joint.jpg", upload, False)
+    async for _ in job.follow():
+        pass
+    queue.shutdown()
+
+    assert job.status == "done"
+    assert isinstance(seen[0], SpooledUpload)
+    assert job.upload is None
+    assert not os.path.exists(path)
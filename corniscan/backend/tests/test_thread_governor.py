@@ -0,0 +1,103 @@
+"""Tests gouverneur de threads OpenCV — thread_governor + VisionExecutor + métriques."""
+
+import cv2
+import pytest
+from fastapi.testclient import TestClient
+
+from tests.test_metrics import scrape
+
+
+@pytest.fixture
+def restore_opencv_threads():
+    """Rétablit le nombre de threads OpenCV du processus de test après le test."""
+    import app.services.thread_governor as governor
+
+    before = cv2.getNumThreads()
+    yield
+    cv2.setNumThreads(before)
+    governor._applied = None
+
+
+def test_adaptive_mode_splits_budget_between_tasks_in_flight() -> None:
+    from app.services.thread_governor import ThreadGovernor
+
+    governor = ThreadGovernor("adaptive", budget=8)
+
+    assert [governor.threads_for(n) for n in (1, 2, 3, 8, 16)] == [8, 4, 2, 1, 1]
+    assert governor.last == 1
+    assert ThreadGovernor("single", budget=8).threads_for(1) == 1
+    assert ThreadGovernor("opencv", budget=8).threads_for(1) is None
+    assert ThreadGovernor().budget >= 1
+
+
+def test_unknown_mode_is_rejected() -> None:
+    from app.services.thread_governor import ThreadGovernor
+
+    with pytest.raises(ValueError, match="inconnu"):
+        ThreadGovernor("turbo")
+
+
+def test_apply_threads_calls_opencv_only_on_change(
+    monkeypatch: pytest.MonkeyPatch, restore_opencv_threads,
+) -> None:
+    import app.services.thread_governor as governor
+
+    calls = []
+    monkeypatch.setattr(governor.cv2, "setNumThreads", calls.append)
+    monkeypatch.setattr(governor, "_applied", None)
+
+    for threads in (4, 4, None, 2, 2, 4):
+        governor.apply_threads(threads)
+
+    assert calls == [4, 2, 4]
+
+
+def _opencv_threads() -> int:
+    return cv2.getNumThreads()
+
+
+async def test_executor_applies_budget_in_worker_process() -> None:
+    """Mode processus : une tâche seule reçoit tout le budget dans son worker."""
+    from app.core.metrics import vision_opencv_threads
+    from app.services.thread_governor import ThreadGovernor
+    from app.services.vision_executor import VisionExecutor
+
+    executor = VisionExecutor(workers=1, queue_size=0, governor=ThreadGovernor("adaptive", budget=3))
+    before = vision_opencv_threads.value("3")
+    try:
+        assert await executor.run(_opencv_threads) == 3
+    finally:
+        executor.shutdown()
+
+    assert executor.governor.last == 3
+    assert vision_opencv_threads.value("3") == before + 1
+
+
+async def test_thread_pool_ignores_governor(restore_opencv_threads) -> None:
+    """Pool de threads : cv2.setNumThreads() est global au processus → gouverneur ignoré."""
+    from app.services.thread_governor import ThreadGovernor
+    from app.services.vision_executor import VisionExecutor
+
+    cv2.setNumThreads(2)
+    executor = VisionExecutor(workers=0, queue_size=0, governor=ThreadGovernor("adaptive", budget=8))
+    try:
+        assert await executor.run(_opencv_threads) == 2
+    finally:
+        executor.shutdown()
+
+    assert executor.governor is None
+
+
+def test_metrics_endpoint_exposes_thread_decisions(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    from app.services.thread_governor import ThreadGovernor
+    from app.services.vision_executor import vision_executor
+
+    # Pool de threads des tests : gouverneur du mode processus simulé
+    governor = ThreadGovernor("adaptive", budget=4)
+    monkeypatch.setattr(vision_executor, "governor", governor)
+    governor.threads_for(1)
+    body = scrape(client, monkeypatch).text
+
+    assert "corniscan_vision_cpu_budget " in body
+    assert "corniscan_vision_opencv_threads " in body
+    assert 'corniscan_vision_opencv_threads_total{threads="' in body
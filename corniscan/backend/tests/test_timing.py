@@ -0,0 +1,124 @@
+"""Tests durées par étape — core/timing + header Server-Timing des endpoints scan."""
+
+import io
+
+import pytest
+from fastapi.testclient import TestClient
+
+from tests.test_scan import _auth_header, _make_jpeg_with_card, _submit_payload
+
+
+@pytest.fixture(autouse=True)
+def _clear_vision_cache():
+    from app.services.result_cache import vision_cache
+
+    vision_cache.clear()
+    yield
+    vision_cache.clear()
+
+
+def _server_timing(response) -> dict[str, float]:
+    entries = (item.strip().split(";dur=") for item in response.headers["Server-Timing"].split(","))
+    return {name: float(dur) for name, dur in entries}
+
+
+def test_stage_is_noop_without_collector() -> None:
+    """Hors collect_timings() → context manager partagé, rien n'est mesuré."""
+    from app.core.timing import stage
+
+    first, second = stage("decode"), stage("card")
+    assert first is second
+    with first:
+        pass
+
+
+def test_collect_timings_accumulates_repeated_stages() -> None:
+    """Étape répétée → durées cumulées ; collecteur isolé par bloc."""
+    from app.core.timing import collect_timings, server_timing_header, stage
+
+    with collect_timings() as outer:
+        for _ in range(3):
+            with stage("hole"):
+                pass
+        with collect_timings() as inner:
+            with stage("decode"):
+                pass
+        with stage("card"):
+            pass
+
+    assert set(outer) == {"hole", "card"}
+    assert set(inner) == {"decode"}
+    assert all(ms >= 0.0 for ms in outer.values())
+    assert server_timing_header({"decode": 12.345, "card": 4.0}) == "decode;dur=12.3, card;dur=4.0"
+
+
+def test_process_emits_server_timing_per_stage(client: TestClient) -> None:
+    """POST /process → Server-Timing décodage, carte, warp, contour, worker et attente."""
+    response = client.post(
+        "/api/v1/scan/process",
+        files={"file": ("photo.jpg", io.BytesIO(_make_jpeg_with_card()), "image/jpeg")},
+        headers=_auth_header(),
+    )
+
+    assert response.status_code == 200
+    timings = _server_timing(response)
+    assert {"cache", "decode", "card", "warp", "contour", "vision", "wait"} <= set(timings)
+    assert "timings" not in response.json()
+
+
+def test_process_timings_field_on_request(client: TestClient) -> None:
+    """?timings=true → champ timings ; relance identique servie par le cache sans étape vision."""
+    for expected_vision in (True, False):
+        response = client.post(
+            "/api/v1/scan/process?timings=true",
+            files={"file": ("photo.jpg", io.BytesIO(_make_jpeg_with_card()), "image/jpeg")},
+            headers=_auth_header(),
+        )
+        assert response.status_code == 200
+        assert ("decode" in response.json()["timings"]) is expected_vision
+        assert "cache" in response.json()["timings"]
+
+
+def test_detect_card_and_submit_emit_server_timing(client: TestClient) -> None:
+    """POST /detect-card et /submit → Server-Timing avec leurs étapes propres."""
+    detect = client.post(
+        "/api/v1/scan/detect-card?timings=true",
+        files={"file": ("frame.jpg", io.BytesIO(_make_jpeg_with_card()), "image/jpeg")},
+        headers=_auth_header(),
+    )
+    payload = _submit_payload(_make_jpeg_with_card())
+    submit = client.post("/api/v1/scan/submit", files=payload["files"], data=payload["data"], headers=_auth_header())
+
+    assert {"decode", "card", "vision"} <= set(_server_timing(detect))
+    assert set(detect.json()) == {"card_detected", "confidence", "timings"}
+    assert {"dxf_convert", "dxf_write", "png_decode", "png_card", "png_encode"} <= set(_server_timing(submit))
+
+
+def test_server_timing_disabled(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    """SERVER_TIMING_ENABLED=false → ni header ni collecte."""
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "server_timing_enabled", False)
+    response = client.post(
+        "/api/v1/scan/process",
+        files={"file": ("photo.jpg", io.BytesIO(_make_jpeg_with_card()), "image/jpeg")},
+        headers=_auth_header(),
+    )
+
+    assert response.status_code == 200
+    assert "Server-Timing" not in response.headers
+
+
+def test_listen_stages_reports_stage_ends_and_milestones() -> None:
+    """Fins d'étape et milestone() signalées dans le bloc, même sans collect_timings()."""
+    from app.core.timing import listen_stages, milestone, stage
+
+    seen: list[str] = []
+    with listen_stages(seen.append):
+        with stage("decode"):
+            pass
+        milestone("pdf_vector_geometry")
+    with stage("card"):
+        pass
+
+    assert seen == ["decode", "pdf_vector_geometry"]
@@ -0,0 +1,128 @@
+"""Tests réception des uploads — core.uploads (limite de corps, spool, vue mappée)."""
+
+import io
+import os
+import pickle
+
+import cv2
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from tests.test_scan import _auth_header
+
+
+def _large_jpeg() -> bytes:
+    """JPEG de bruit > 1 Mo (au-delà du seuil de spool)."""
+    rng = np.random.default_rng(0)
+    img = rng.integers(0, 256, (1200, 1200, 3), dtype=np.uint8)
+    _, encoded = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 95])
+    return encoded.tobytes()
+
+
+def _limit_process(monkeypatch: pytest.MonkeyPatch, limit: int) -> None:
+    from app.routers.scan import UPLOAD_BODY_LIMITS
+
+    monkeypatch.setitem(UPLOAD_BODY_LIMITS, "/api/v1/scan/process", limit)
+
+
+def test_content_length_over_limit_is_rejected_before_reading(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Content-Length annoncé au-delà de la limite → 413 sans lire le corps (ni authentifier)."""
+    _limit_process(monkeypatch, 1024)
+
+    response = client.post(
+        "/api/v1/scan/process",
+        files={"file": ("joint.jpg", io.BytesIO(b"\xff" * 4096), "image/jpeg")},
+    )
+
+    assert response.status_code == 413
+    assert "trop volumineux" in response.json()["detail"]
+
+
+def test_chunked_body_over_limit_is_rejected_while_streaming(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Corps chunked (sans Content-Length) → 413 dès que les octets reçus dépassent la limite."""
+    _limit_process(monkeypatch, 64 * 1024)
+    boundary = "b0undary"
+
+    def body():
+        yield (
+            f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"joint.jpg\"\r\n"
+            "Content-Type: image/jpeg\r\n\r\n"
+        ).encode()
+        for _ in range(16):
+            yield b"\xff" * 16 * 1024
+        yield f"\r\n--{boundary}--\r\n".encode()
+
+    response = client.post(
+        "/api/v1/scan/process",
+        content=body(),
+        headers={**_auth_header(), "Content-Type": f"multipart/form-data; boundary={boundary}"},
+    )
+
+    assert response.status_code == 413
+
+
+def test_read_upload_spools_large_files_and_pickles_the_path(tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """> 1 Mo → fichier temporaire ; pickle = chemin seul ; vue mappée identique ; supprimé par release."""
+    import asyncio
+
+    from fastapi import UploadFile
+
+    from app.core.config import settings
+    from app.core.uploads import SpooledUpload, read_upload, release_upload, upload_buffer
+
+    monkeypatch.setattr(settings, "upload_spool_dir", str(tmp_path))
+    data = _large_jpeg()
+    small = asyncio.run(read_upload(UploadFile(io.BytesIO(b"petit")), len(data)))
+    spooled = asyncio.run(read_upload(UploadFile(io.BytesIO(data)), len(data)))
+
+    assert small == b"petit"
+    assert isinstance(spooled, SpooledUpload)
+    assert len(spooled) == len(data)
+    assert len(pickle.dumps(spooled)) < 1024
+    with upload_buffer(pickle.loads(pickle.dumps(spooled))) as view:
+        assert view == data
+        assert cv2.imdecode(np.frombuffer(view, np.uint8), cv2.IMREAD_COLOR).shape == (1200, 1200, 3)
+
+    release_upload(spooled)
+    assert os.listdir(tmp_path) == []
+
+
+def test_read_upload_rejects_oversized_file_and_removes_spool(tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+    import asyncio
+
+    from fastapi import HTTPException, UploadFile
+
+    from app.core.config import settings
+    from app.core.uploads import read_upload
+
+    monkeypatch.setattr(settings, "upload_spool_dir", str(tmp_path))
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(read_upload(UploadFile(io.BytesIO(b"\0" * (3 * 1024 * 1024))), 2 * 1024 * 1024))
+
+    assert exc.value.status_code == 413
+    assert os.listdir(tmp_path) == []
+
+
+def test_process_endpoint_accepts_spooled_upload(
+    client: TestClient, tmp_path, monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Upload > 1 Mo → analysé depuis le fichier mappé, spool supprimé après la réponse."""
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "upload_spool_dir", str(tmp_path))
+
+    response = client.post(
+        "/api/v1/scan/process",
+        files={"file": ("joint.jpg", io.BytesIO(_large_jpeg()), "image/jpeg")},
+        headers=_auth_header(),
+    )
+
+    assert response.status_code == 200
+    assert "contour_points" in response.json()
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,76 @@
+"""Tests buffers de travail vision (vision_context) et médiane par histogramme."""
+
+import threading
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from tests.test_scan import _card_frame
+
+
+def test_histogram_median_matches_numpy() -> None:
+    from app.services.vision_service import _median_u8
+
+    rng = np.random.default_rng(3)
+    for shape in ((1, 1), (2, 3), (7, 5), (480, 640)):
+        img = rng.integers(0, 256, shape, dtype=np.uint8)
+        assert _median_u8(img) == float(np.median(img))
+    # Sous-vue non contiguë (fenêtre de recherche)
+    img = rng.integers(0, 256, (300, 400), dtype=np.uint8)
+    assert _median_u8(img[10:201, 33:250]) == float(np.median(img[10:201, 33:250]))
+
+
+def test_buffer_grows_and_returns_sub_views() -> None:
+    from app.services.vision_context import VisionContext
+
+    context = VisionContext()
+    large = context.buffer("edges", (480, 640))
+    small = context.buffer("edges", (100, 200))
+    wider = context.buffer("edges", (100, 800))
+
+    assert small.shape == (100, 200) and np.shares_memory(small, large)
+    assert wider.shape == (100, 800)
+    assert context.buffer("edges", (480, 640)).base is wider.base  # agrandi à 480 × 800, conservé
+    assert context.buffer("bgr", (4, 4, 3)).shape == (4, 4, 3)
+
+
+def test_context_is_per_thread() -> None:
+    from app.services.vision_context import get_vision_context
+
+    contexts = []
+    thread = threading.Thread(target=lambda: contexts.append(get_vision_context()))
+    thread.start()
+    thread.join()
+
+    assert get_vision_context() is get_vision_context()
+    assert contexts[0] is not get_vision_context()
+
+
+def test_steady_state_pipeline_reuses_buffers() -> None:
+    """Second appel sur une image de même taille : plus d'images intermédiaires allouées."""
+    from app.services.vision_service import _detect_joint_contour, _find_card_corners
+
+    bgr, _ = _card_frame()
+    img = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
+    warped = np.ascontiguousarray(img[:539, :856])
+
+    def run() -> int:
+        tracemalloc.start()
+        corners, _ = _find_card_corners(img)
+        _detect_joint_contour(warped)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        assert corners is not None
+        return peak
+
+    # Thread neuf : contexte vide, quels que soient les tests précédents
+    peaks = []
+    thread = threading.Thread(target=lambda: peaks.extend((run(), run())))
+    thread.start()
+    thread.join()
+    first, steady = peaks
+
+    # Au premier appel : flou, Canny, pyramide, CLAHE, dilatation (plusieurs Mo)
+    assert first > img.size
+    assert steady < img.size // 8
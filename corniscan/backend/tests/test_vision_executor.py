@@ -0,0 +1,156 @@
+"""Tests pool vision — vision_executor.VisionExecutor + 503 Retry-After sur les endpoints scan."""
+
+import asyncio
+import io
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from tests.test_scan import _auth_header, _make_jpeg, _make_jpeg_with_card, _submit_payload
+
+
+def _blocking_task(event: threading.Event) -> str:
+    event.wait(5)
+    return "done"
+
+
+def _raise_value_error() -> None:
+    raise ValueError("boom")
+
+
+def _broken_after(event: threading.Event) -> None:
+    from concurrent.futures.process import BrokenProcessPool
+
+    event.wait(5)
+    raise BrokenProcessPool("worker tué")
+
+
+async def test_stale_broken_pool_future_keeps_restarted_pool() -> None:
+    """Future de l'ancien pool cassé arrivée après redémarrage → le nouveau pool reste en service."""
+    from app.services.vision_executor import VisionBusyError, VisionExecutor
+
+    executor = VisionExecutor(workers=0, queue_size=1)
+    release = threading.Event()
+    try:
+        stale = asyncio.ensure_future(executor.run(_broken_after, release))
+        await asyncio.sleep(0.05)
+        executor.shutdown()  # redémarrage par une autre requête
+        executor.start()
+        restarted = executor._pool
+
+        release.set()
+        with pytest.raises(VisionBusyError):
+            await stale
+
+        assert executor._pool is restarted
+        assert await executor.run(_blocking_task, release) == "done"
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+async def test_broken_pool_is_restarted() -> None:
+    """BrokenProcessPool du pool courant → pool libéré, recréé à la requête suivante."""
+    from app.services.vision_executor import VisionBusyError, VisionExecutor
+
+    executor = VisionExecutor(workers=0, queue_size=0)
+    release = threading.Event()
+    release.set()
+    try:
+        with pytest.raises(VisionBusyError):
+            await executor.run(_broken_after, release)
+        assert executor._pool is None
+        assert await executor.run(_blocking_task, release) == "done"
+    finally:
+        executor.shutdown()
+
+
+async def test_process_pool_runs_task_in_worker() -> None:
+    """Mode processus : la tâche s'exécute dans un worker préchauffé et retourne son résultat."""
+    from app.services.scan_tasks import detect_card_task
+    from app.services.vision_executor import VisionExecutor
+
+    executor = VisionExecutor(workers=1, queue_size=0)
+    try:
+        result = await executor.run(detect_card_task, _make_jpeg_with_card())
+    finally:
+        executor.shutdown()
+
+    assert result["card_detected"] is True
+
+
+async def test_run_with_progress_relays_stages_from_worker_process() -> None:
+    """Mode processus : les fins d'étape du worker remontent dans l'ordre, avant le résultat."""
+    from app.services.scan_tasks import process_task
+    from app.services.vision_executor import VisionExecutor
+
+    executor = VisionExecutor(workers=1, queue_size=0)
+    stages: list[str] = []
+    try:
+        result = await executor.run_with_progress(stages.append, process_task, _make_jpeg_with_card(), False)
+    finally:
+        executor.shutdown()
+
+    assert "contour_points" in result
+    assert stages.index("decode") < stages.index("card") < stages.index("contour")
+
+
+async def test_executor_rejects_when_queue_full() -> None:
+    """Au-delà de workers + queue_size tâches → VisionBusyError avec retry_after."""
+    from app.services.vision_executor import VisionBusyError, VisionExecutor
+
+    executor = VisionExecutor(workers=0, queue_size=1, retry_after=7)
+    release = threading.Event()
+    try:
+        tasks = [asyncio.ensure_future(executor.run(_blocking_task, release)) for _ in range(executor.capacity)]
+        await asyncio.sleep(0.05)
+
+        assert executor.in_flight == executor.capacity - 1
+        assert executor.queue_depth == 1
+        with pytest.raises(VisionBusyError) as exc_info:
+            await executor.run(_blocking_task, release)
+        assert exc_info.value.retry_after == 7
+
+        release.set()
+        assert await asyncio.gather(*tasks) == ["done"] * executor.capacity
+        assert executor.queue_depth == 0
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+async def test_executor_propagates_task_errors() -> None:
+    """Une ValueError levée par la tâche remonte telle quelle."""
+    from app.services.vision_executor import VisionExecutor
+
+    executor = VisionExecutor(workers=0, queue_size=0)
+    try:
+        with pytest.raises(ValueError, match="boom"):
+            await executor.run(_raise_value_error)
+        assert executor.queue_depth == 0
+    finally:
+        executor.shutdown()
+
+
+@pytest.mark.parametrize("endpoint", ["/api/v1/scan/detect-card", "/api/v1/scan/process", "/api/v1/scan/submit"])
+def test_scan_endpoints_return_503_when_saturated(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch, endpoint: str,
+) -> None:
+    """File vision pleine → 503 immédiat avec Retry-After."""
+    from app.services.result_cache import vision_cache
+    from app.services.vision_executor import vision_executor
+
+    monkeypatch.setattr(vision_cache, "enabled", False)
+    monkeypatch.setattr(vision_executor, "_pending", vision_executor.capacity)
+    payload = _submit_payload(_make_jpeg())
+
+    response = client.post(
+        endpoint,
+        files={"file": ("photo.jpg", io.BytesIO(_make_jpeg()), "image/jpeg")},
+        data=payload["data"] if endpoint.endswith("submit") else None,
+        headers=_auth_header(),
+    )
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(vision_executor.retry_after)
@@ -75,6 +75,29 @@ describe('useCardDetection — Story 3.2', () => {
     )
   })
 
+  it('envoie un X-Scan-Session propre à chaque session de détection', async () => {
+    mockApiCall.mockResolvedValue({ card_detected: false })
+
+    vi.spyOn(HTMLCanvasElement.prototype, 'getContext').mockReturnValue({
+      drawImage: vi.fn(),
+    } as unknown as CanvasRenderingContext2D)
+    const mockBlob = new Blob(['fake'], { type: 'image/jpeg' })
+    vi.spyOn(HTMLCanvasElement.prototype, 'toBlob').mockImplementation((cb) => cb(mockBlob))
+
+    makeWrapper(makeMockVideo())
+    makeWrapper(makeMockVideo())
+
+    vi.advanceTimersByTime(500)
+    await flushPromises()
+
+    const sessions = mockApiCall.mock.calls.map(
+      ([, options]) => (options?.headers as Record<string, string>)['X-Scan-Session'],
+    )
+    expect(sessions).toHaveLength(2)
+    expect(sessions[0]).toMatch(/^[0-9a-f-]{36}$/)
+    expect(sessions[0]).not.toBe(sessions[1])
+  })
+
   it('AC#1 — cardDetected passe à true si backend détecte la carte', async () => {
     mockApiCall.mockResolvedValue({ card_detected: true })
 
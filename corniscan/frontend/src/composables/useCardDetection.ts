@@ -4,6 +4,8 @@
  * Détection périodique de la carte bancaire dans le flux caméra.
  * Toutes les 500ms : capture une frame via canvas.toBlob() → POST /scan/detect-card.
  * Les erreurs réseau sont silencieuses (non-bloquantes — NFR-P4).
+ * Header X-Scan-Session : identifiant propre à chaque démarrage, pour que le
+ * suivi de la carte côté serveur ne soit pas partagé entre appareils.
  *
  * Usage :
  *   const { cardDetected, startDetection, stopDetection } = useCardDetection(videoRef)
@@ -18,6 +20,7 @@ export function useCardDetection(videoRef: Ref<HTMLVideoElement | null>) {
   const cardDetected = ref(false)
   let intervalId: ReturnType<typeof setInterval> | null = null
   let detecting = false // garde contre les appels concurrents
+  let scanSession = crypto.randomUUID()
 
   async function captureAndDetect(): Promise<void> {
     const video = videoRef.value
@@ -46,6 +49,7 @@ export function useCardDetection(videoRef: Ref<HTMLVideoElement | null>) {
       const result = await apiCall<{ card_detected: boolean }>('/api/v1/scan/detect-card', {
         method: 'POST',
         body: formData,
+        headers: { 'X-Scan-Session': scanSession },
       })
       cardDetected.value = result.card_detected
     } catch {
@@ -58,6 +62,7 @@ export function useCardDetection(videoRef: Ref<HTMLVideoElement | null>) {
   /** Démarre l'intervalle de détection (500ms). */
   function startDetection(): void {
     if (intervalId !== null) return
+    scanSession = crypto.randomUUID()
     intervalId = setInterval(captureAndDetect, DETECTION_INTERVAL_MS)
   }
 
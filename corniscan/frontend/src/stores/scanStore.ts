@@ -6,6 +6,8 @@
  * Story 4.1 : contour (points normalisés), dimensions (mm), calibrationWarning
  *             setResult() + clearResult()
  * Story 4.3 : thickness (mm saisi manuellement) + setThickness()
+ * Géométrie carte (cardQuad + homography) renvoyée par /process et retransmise
+ * à /submit pour éviter une nouvelle détection côté serveur
  *
  * CONVENTION ARCHITECTURE : hasPhoto est le guard utilisé par requirePhoto (Vue Router)
  */
@@ -28,6 +30,8 @@ export interface ProcessResult {
   dimensions: ScanDimensions
   calibration_warning: boolean
   holes: HoleDimensions[]
+  card_quad?: number[][] | null
+  homography?: number[][] | null
 }
 
 export const useScanStore = defineStore('scan', () => {
@@ -45,6 +49,10 @@ export const useScanStore = defineStore('scan', () => {
   // Trous internes détectés
   const holes = ref<HoleDimensions[]>([])
 
+  // Géométrie carte (coordonnées normalisées) — réutilisée par /submit
+  const cardQuad = ref<number[][] | null>(null)
+  const homography = ref<number[][] | null>(null)
+
   // Image résultat annotée (JPEG base64) générée par /submit
   const resultImageB64 = ref<string | null>(null)
 
@@ -70,6 +78,8 @@ export const useScanStore = defineStore('scan', () => {
     dimensions.value = result.dimensions
     calibrationWarning.value = result.calibration_warning
     holes.value = result.holes ?? []
+    cardQuad.value = result.card_quad ?? null
+    homography.value = result.homography ?? null
   }
 
   function setThickness(value: number | null): void {
@@ -90,6 +100,8 @@ export const useScanStore = defineStore('scan', () => {
     calibrationWarning.value = false
     thickness.value = null
     holes.value = []
+    cardQuad.value = null
+    homography.value = null
     resultImageB64.value = null
     resultDxfB64.value = null
   }
@@ -106,6 +118,8 @@ export const useScanStore = defineStore('scan', () => {
     calibrationWarning,
     thickness,
     holes,
+    cardQuad,
+    homography,
     resultImageB64,
     resultDxfB64,
     setResult,